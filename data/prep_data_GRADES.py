@@ -38,4 +38,8 @@ GRADES = {
 
 # Save the data to a JSON file
 with open('grades.json', 'w') as json_file:
-    json.dump(GRADES, json_file, indent=4)
\ No newline at end of file
+    json.dump(GRADES, json_file, indent=4)
+
+# Rebuild the compiled snapshot of the data files
+from prep_data_SNAPSHOT import compile_snapshot
+compile_snapshot()
\ No newline at end of file
@@ -0,0 +1,27 @@
+# This code precomputes the gear score distributions of new gears enhanced to +15 (score_distributions.json)
+# For every gear type, grade, tier and mainstat, the file holds the probability of every gear score
+# before and after reforge when the substats are left open (see get_gear_score_distribution() in
+# src/distributions.py), so that these queries do not need to be calculated. This takes a few minutes.
+# The file stores a digest of the json data files it was calculated from, and the simulator calculates
+# the distributions instead if the data files have changed since, so run this script again after
+# editing TYPES, TIERS, GRADES or STATS.
+
+import os
+import sys
+
+# Folder of this script (the data folder) and the root folder of the package
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(DATA_DIR))
+
+from src.registry import set_data_dir
+from src.distributions import write_score_distributions
+
+
+def compile_score_distributions():
+    """Write the score distributions calculated from the json files in the data folder"""
+    set_data_dir(DATA_DIR)
+    return write_score_distributions(DATA_DIR)
+
+
+if __name__ == '__main__':
+    compile_score_distributions()
@@ -0,0 +1,25 @@
+# This code compiles the json data files into a single binary snapshot (data.pickle)
+# The snapshot holds the parsed TYPES, SETS, TIERS, GRADES and STATS tables along with
+# the lookup structures that are built from them (see build_lookups() in src/registry.py),
+# so that the simulator can load all of its data with one fast read.
+# Every prep_data_*.py script rebuilds the snapshot after saving its json file.
+# The simulator ignores the snapshot and parses the json files if the snapshot is missing
+# or older than any of the json files.
+
+import os
+import sys
+
+# Folder of this script (the data folder) and the root folder of the package
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(DATA_DIR))
+
+from src.registry import write_snapshot
+
+
+def compile_snapshot():
+    """Write the compiled snapshot of all json files in the data folder"""
+    return write_snapshot(DATA_DIR)
+
+
+if __name__ == '__main__':
+    compile_snapshot()
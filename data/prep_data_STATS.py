@@ -832,4 +832,8 @@ for stat_id in STATS.keys():
         
 # Save the data to a JSON file
 with open('stats.json', 'w') as json_file:
-    json.dump(STATS, json_file, indent=4)
\ No newline at end of file
+    json.dump(STATS, json_file, indent=4)
+
+# Rebuild the compiled snapshot of the data files
+from prep_data_SNAPSHOT import compile_snapshot
+compile_snapshot()
\ No newline at end of file
@@ -37,4 +37,8 @@ TYPES = {
 
 # Save the data to a JSON file
 with open('types.json', 'w') as json_file:
-    json.dump(TYPES, json_file, indent=4)
\ No newline at end of file
+    json.dump(TYPES, json_file, indent=4)
+
+# Rebuild the compiled snapshot of the data files
+from prep_data_SNAPSHOT import compile_snapshot
+compile_snapshot()
\ No newline at end of file
@@ -0,0 +1,561 @@
+import numpy as np
+from src.validation_utils import *
+from src.utilities import *
+from src.registry import TYPES, SETS, GRADES, STATS, TIERS, LOOKUPS, on_reset
+from src.stats import MAINSTAT_MULTIPLIERS
+from src.samplers import get_alias_tables
+
+# Stat id used for the empty substat slots of a gear
+EMPTY_STAT = -1
+
+# Maximum number of substats on a gear
+MAX_SUBSTATS = 4
+
+# Cached lookup arrays built from the data tables (see get_tables()), dropped when the registry
+# drops its data
+_tables = None
+
+
+def get_tables():
+    """
+    Returns the lookup arrays used by the batch functions, built from the data tables.
+    The arrays are built once and rebuilt only after the registry drops its data.
+
+    Returns:
+        dict with keys -
+            'gear_types', 'gear_grades', 'gear_sets': names behind the int codes used in a GearBatch
+            'mainstat_pool', 'substat_pool': (types x stats) bool arrays of allowed stats per gear type
+            'starting_substats', 'grade_weights': per grade arrays from grades.json
+            'tier_index': gear tier - 5 of every gear level (-1 for invalid levels)
+            'mainstat_values': (stats x grades x tiers) array of base mainstat values
+            'substat_start', 'substat_size': (stats x grades x tiers) arrays locating the alias table of
+                every substat roll in the flat 'substat_prob' / 'substat_alias' / 'substat_values' arrays
+            'gscore': gear score multiplier of every stat id
+            'reforge_increase': (stats x 6) array of substat reforge increases by rolled count
+                ('gscore' and 'reforge_increase' have an extra zero entry at the end, so that
+                EMPTY_STAT slots index it)
+            'substat_prob', 'substat_alias', 'substat_values': flat arrays holding the alias tables
+                (see samplers.py) of every substat roll, with aliases as indexes into the flat arrays
+    """
+    global _tables
+
+    if _tables is not None:
+        return _tables
+
+    alias_tables = get_alias_tables()
+
+    gear_types = list(TYPES.keys())
+    gear_grades = list(GRADES.keys())
+    gear_sets = list(SETS.keys())
+    stat_ids = sorted(int(s) for s in STATS.keys())
+    n_stats = stat_ids[-1] + 1
+    tiers = sorted(tier['gear_tier'] for tier in TIERS.values())
+    n_tiers = len(tiers)
+
+    tier_by_level = LOOKUPS['tier_by_level']
+    tier_index = np.full(max(tier_by_level) + 1, -1, dtype=np.int8)
+    for level, tier in tier_by_level.items():
+        tier_index[level] = tier - 5
+
+    # Allowed stats per gear type
+    mainstat_pool = np.zeros((len(gear_types), n_stats), dtype=bool)
+    substat_pool = np.zeros((len(gear_types), n_stats), dtype=bool)
+    for t, gear_type in enumerate(gear_types):
+        mainstat_pool[t, TYPES[gear_type]['mainstat']] = True
+        substat_pool[t, TYPES[gear_type]['substat']] = True
+
+    starting_substats = np.array([GRADES[g]['starting_substats'] for g in gear_grades], dtype=np.int8)
+    grade_weights = np.array([GRADES[g]['weight'] for g in gear_grades], dtype=float)
+
+    # Base mainstat values and substat roll values. Grades without values in stats.json
+    # ('normal', 'good') are left at 0.
+    mainstat_values = np.zeros((n_stats, len(gear_grades), n_tiers), dtype=np.int32)
+    substat_start = np.zeros((n_stats, len(gear_grades), n_tiers), dtype=np.int32)
+    substat_size = np.ones((n_stats, len(gear_grades), n_tiers), dtype=np.int32)
+    substat_prob = []
+    substat_alias = []
+    substat_values = []
+    for s in stat_ids:
+        main_var = STATS[str(s)]['vars']['mainstat']
+        sub_var = STATS[str(s)]['vars']['substat']
+        for g, gear_grade in enumerate(gear_grades):
+            for t in range(n_tiers):
+                if gear_grade in main_var['values']:
+                    mainstat_values[s, g, t] = main_var['values'][gear_grade][t]
+
+                start = len(substat_values)
+                substat_start[s, g, t] = start
+                if gear_grade in sub_var['values']:
+                    table = alias_tables[(str(s), 'substat', gear_grade, tiers[t])]
+                    substat_size[s, g, t] = len(table)
+                    substat_prob.extend(table.prob)
+                    substat_alias.extend(start + a for a in table.alias)
+                    substat_values.extend(table.values)
+                else:
+                    substat_prob.append(1.0)
+                    substat_alias.append(start)
+                    substat_values.append(0)
+
+    # Gear score and reforge lookups, with a zero entry at index -1 for empty slots
+    gscore = np.zeros(n_stats + 1)
+    reforge_increase = np.zeros((n_stats + 1, 6), dtype=np.int32)
+    for s in stat_ids:
+        gscore[s] = STATS[str(s)]['gscore']
+        reforge_increase[s] = STATS[str(s)]['reforge']['substat']
+
+    _tables = {
+        'gear_types': gear_types,
+        'gear_grades': gear_grades,
+        'gear_sets': gear_sets,
+        'tiers': tiers,
+        'tier_index': tier_index,
+        'n_stats': n_stats,
+        'mainstat_pool': mainstat_pool,
+        'substat_pool': substat_pool,
+        'starting_substats': starting_substats,
+        'grade_weights': grade_weights,
+        'mainstat_values': mainstat_values,
+        'gscore': gscore,
+        'reforge_increase': reforge_increase,
+        'substat_start': substat_start,
+        'substat_size': substat_size,
+        'substat_prob': np.array(substat_prob),
+        'substat_alias': np.array(substat_alias, dtype=np.int64),
+        'substat_values': np.array(substat_values, dtype=np.int32),
+    }
+    return _tables
+
+
+def _clear_tables():
+    """Drops the cached lookup arrays, called when the registry drops its data."""
+    global _tables
+
+    _tables = None
+
+
+on_reset(_clear_tables)
+
+
+def sample_substat_values(stat_ids, grade_codes, tier_index, rng):
+    """
+    Draws substat roll values for arrays of stats, with the same rates as get_stat_value().
+
+    Args:
+        stat_ids (np.ndarray): int stat ids
+        grade_codes (np.ndarray): int gear grade codes (same shape as stat_ids)
+        tier_index (int or np.ndarray): gear tier - 5
+        rng (np.random.Generator): random generator
+
+    Returns:
+        np.ndarray of int32 values (same shape as stat_ids)
+    """
+    tables = get_tables()
+    start = tables['substat_start'][stat_ids, grade_codes, tier_index]
+    size = tables['substat_size'][stat_ids, grade_codes, tier_index]
+
+    # One random number per draw picks both the column of the alias table and the side of it
+    u = rng.random(start.shape) * size
+    column = np.minimum(u.astype(np.int64), size - 1)
+    index = start + column
+    index = np.where(u - column < tables['substat_prob'][index], index, tables['substat_alias'][index])
+    return tables['substat_values'][index]
+
+
+def get_gear_scores(substat_ids, substat_values, substat_rolled):
+    """
+    Calculates the gear score of many gears at once, the same way as Gear.get_gear_score().
+
+    Args:
+        substat_ids (np.ndarray): (gears x substats) stat ids, EMPTY_STAT for empty slots
+        substat_values (np.ndarray): (gears x substats) substat values
+        substat_rolled (np.ndarray): (gears x substats) rolled counts of the substats
+
+    Returns:
+        (gears x 2) int array -
+            first column is gear score before reforge
+            second column is gear score after reforge
+    """
+    tables = get_tables()
+    substat_ids = np.asarray(substat_ids)
+    substat_values = np.asarray(substat_values)
+    substat_rolled = np.asarray(substat_rolled)
+
+    gscore = tables['gscore'][substat_ids]
+    reforge_increase = tables['reforge_increase'][substat_ids, substat_rolled]
+
+    # Add up the substats in order, like the scalar method, so that the results match exactly
+    gear_score = np.zeros(len(substat_ids))
+    reforged_score = np.zeros(len(substat_ids))
+    for slot in range(substat_ids.shape[1]):
+        gear_score += substat_values[:, slot] * gscore[:, slot]
+        reforged_score += (substat_values[:, slot] + reforge_increase[:, slot]) * gscore[:, slot]
+
+    return np.stack([np.round(gear_score), np.round(reforged_score)], axis=1).astype(np.int64)
+
+
+def _random_pick(mask, rng):
+    """
+    Picks one True column uniformly at random in every row of a bool array.
+    Rows without any True column get EMPTY_STAT.
+    """
+    keys = rng.random(mask.shape)
+    keys[~mask] = -1.0
+    picks = keys.argmax(axis=1)
+    picks[~mask.any(axis=1)] = EMPTY_STAT
+    return picks
+
+
+class GearBatch():
+    """
+    Many gears stored as struct-of-arrays NumPy columns, so that they can be created and
+    processed at once instead of one Gear object at a time.
+
+    Gear type, grade and set are stored as int codes indexing the names in get_tables()
+    ('gear_types', 'gear_grades', 'gear_sets'). Substat columns have MAX_SUBSTATS slots per
+    gear; unused slots hold EMPTY_STAT as id and 0 as value.
+    """
+
+    def __init__(self, size=0):
+        """
+        Initializes the GearBatch object with `size` empty gears.
+        Args:
+            gear_type (np.ndarray): gear type codes
+            gear_grade (np.ndarray): gear grade codes
+            gear_set (np.ndarray): gear set codes
+            gear_level (np.ndarray): gear levels
+            gear_tier (np.ndarray): gear tiers (a reforged gear keeps the tier of its level before reforge)
+            enhance_level (np.ndarray): enhance levels (0 to 15)
+            is_reforged (np.ndarray): reforged flags
+            mainstat_id (np.ndarray): mainstat ids
+            mainstat_value (np.ndarray): mainstat values
+            substat_ids (np.ndarray): (size x 4) substat ids
+            substat_values (np.ndarray): (size x 4) substat values
+            substat_rolled (np.ndarray): (size x 4) rolled counts of the substats
+            substat_modded (np.ndarray): (size x 4) modded flags of the substats
+        """
+        self.gear_type = np.zeros(size, dtype=np.int8)
+        self.gear_grade = np.zeros(size, dtype=np.int8)
+        self.gear_set = np.zeros(size, dtype=np.int8)
+        self.gear_level = np.full(size, 85, dtype=np.int16)
+        self.gear_tier = np.full(size, get_gear_tier(85), dtype=np.int8)
+        self.enhance_level = np.zeros(size, dtype=np.int8)
+        self.is_reforged = np.zeros(size, dtype=bool)
+        self.mainstat_id = np.zeros(size, dtype=np.int8)
+        self.mainstat_value = np.zeros(size, dtype=np.int32)
+        self.substat_ids = np.full((size, MAX_SUBSTATS), EMPTY_STAT, dtype=np.int8)
+        self.substat_values = np.zeros((size, MAX_SUBSTATS), dtype=np.int32)
+        self.substat_rolled = np.zeros((size, MAX_SUBSTATS), dtype=np.int8)
+        self.substat_modded = np.zeros((size, MAX_SUBSTATS), dtype=bool)
+
+
+    def __len__(self):
+        return len(self.gear_type)
+
+
+    def __str__(self):
+        """Str representation of class"""
+        return f"GearBatch of {len(self)} gears"
+
+
+    @classmethod
+    def create(cls, size, gear_type=None, gear_grade=None, gear_set=None, gear_level=85,
+               mainstat_id=None, substat_ids=None, rng=None):
+        """
+        Creates `size` new gears at once. Takes the same arguments as Gear.create_gear() (applied
+        to every gear in the batch) and draws every attribute that is not provided with the same
+        distribution as Gear.create_gear().
+
+        Args:
+            size (int): number of gears to create
+            gear_type (str): 'weapon', 'helm', 'armor', 'necklace', 'ring', or 'boots' (default: random)
+            gear_grade (str): 'rare', 'heroic', or 'epic' (default: random)
+            gear_set (str): valid gear set from sets.json (default: random)
+            gear_level (int): level of the gears, between 58 and 100 (default: 85)
+            mainstat_id (int or str): valid stat id (default: random)
+            substat_ids (int/str or list of int/str): up to 4 valid stat ids (default: random)
+            rng (np.random.Generator or int): random generator or seed (default: None, fresh generator)
+
+        Returns:
+            GearBatch
+        """
+        if not isinstance(size, int) or size < 0:
+            raise ValueError("Size must be a non-negative int.")
+
+        rng = np.random.default_rng(rng)
+        tables = get_tables()
+        n_stats = tables['n_stats']
+
+        # Validate Inputs
+        gear_level = validate_gear_level(gear_level)
+        tier_index = get_gear_tier(gear_level) - 5
+        mainstat_id = validate_mainstat_id(mainstat_id, substat_ids)
+        substat_ids = validate_substat_ids(substat_ids, mainstat_id)
+        given_subs = [int(s) for s in substat_ids]
+        if gear_grade is not None:
+            gear_grade = validate_gear_grade(gear_grade, mainstat_id, substat_ids)
+        if gear_set is not None:
+            gear_set = validate_gear_set(gear_set)
+        gear_type = validate_gear_type(gear_type)
+
+        # Gear types that allow the provided mainstat and substats
+        feasible = tables['substat_pool'][:, given_subs].all(axis=1)
+        if mainstat_id is not None:
+            feasible &= tables['mainstat_pool'][:, int(mainstat_id)]
+
+        batch = cls(size)
+        batch.gear_level[:] = gear_level
+        batch.gear_tier[:] = tier_index + 5
+
+        # Gear type
+        if gear_type is not None:
+            type_code = tables['gear_types'].index(gear_type)
+            if not feasible[type_code]:
+                raise ValueError(f"{gear_type} cannot have one or more of the provided stats.")
+            batch.gear_type[:] = type_code
+        else:
+            feasible_types = np.flatnonzero(feasible)
+            if len(feasible_types) == 0:
+                raise ValueError("No gear type can have the provided mainstat and substats.")
+            batch.gear_type[:] = rng.choice(feasible_types, size=size)
+
+        # Gear grade, drawn from the grades that can start with the provided substats
+        if gear_grade is not None:
+            batch.gear_grade[:] = tables['gear_grades'].index(gear_grade)
+        else:
+            weights = np.where(tables['starting_substats'] >= len(given_subs), tables['grade_weights'], 0)
+            batch.gear_grade[:] = rng.choice(len(weights), size=size, p=weights / weights.sum())
+
+        # Gear set
+        if gear_set is not None:
+            batch.gear_set[:] = tables['gear_sets'].index(gear_set)
+        else:
+            batch.gear_set[:] = rng.integers(len(tables['gear_sets']), size=size)
+
+        # Mainstat, drawn from the mainstat pool of each gear type without the provided substats
+        given_mask = np.zeros(n_stats, dtype=bool)
+        given_mask[given_subs] = True
+        if mainstat_id is not None:
+            batch.mainstat_id[:] = int(mainstat_id)
+        else:
+            pool = tables['mainstat_pool'][batch.gear_type] & ~given_mask
+            batch.mainstat_id[:] = _random_pick(pool, rng)
+
+        # Substats: provided ones first, then distinct random ones from the substat pool of each
+        # gear type until the number of starting substats of the grade is reached
+        n_given = len(given_subs)
+        batch.substat_ids[:, :n_given] = given_subs
+        pool = tables['substat_pool'][batch.gear_type] & ~given_mask
+        pool[np.arange(size), batch.mainstat_id] = False
+        # Sorting random keys gives a uniformly random order of the available stats,
+        # the same as drawing them one at a time without repeats
+        keys = rng.random(pool.shape)
+        keys[~pool] = np.inf
+        order = np.argsort(keys, axis=1)[:, :MAX_SUBSTATS - n_given]
+        n_starting = tables['starting_substats'][batch.gear_grade]
+        for slot in range(n_given, MAX_SUBSTATS):
+            fill = slot < n_starting
+            batch.substat_ids[fill, slot] = order[fill, slot - n_given]
+
+        # Values
+        batch.mainstat_value[:] = tables['mainstat_values'][batch.mainstat_id, batch.gear_grade, tier_index]
+        filled = batch.substat_ids != EMPTY_STAT
+        rows = np.nonzero(filled)[0]
+        batch.substat_values[filled] = sample_substat_values(
+            batch.substat_ids[filled], batch.gear_grade[rows], tier_index, rng)
+
+        return batch
+
+
+    def enhance_gear_max(self, rng=None):
+        """
+        Enhances every gear in the batch to +15, applying the remaining enhance steps of
+        Gear.enhance_gear() to all gears at once. Gears that are already at +15 are left as is.
+
+        At every +3 a random substat of the gear is rolled, except that Rare gear gets a new
+        substat at +9 and +12 and Heroic gear gets a new substat at +12. The mainstat ends at
+        its base value times the +15 multiplier.
+
+        Args:
+            rng (np.random.Generator or int): random generator or seed (default: None, fresh generator)
+
+        Returns:
+            self
+        """
+        rng = np.random.default_rng(rng)
+        tables = get_tables()
+        size = len(self)
+        rows = np.arange(size)
+        tier_index = self.gear_tier.astype(np.intp) - 5
+        grades = tables['gear_grades']
+        rare = grades.index('rare') if 'rare' in grades else EMPTY_STAT
+        heroic = grades.index('heroic') if 'heroic' in grades else EMPTY_STAT
+
+        enhanced = self.enhance_level < 15
+
+        for enhance_level in range(15):
+            active = self.enhance_level == enhance_level
+            if not active.any():
+                continue
+
+            # New substats for Rare gear at +9 and +12, and for Heroic gear at +12
+            add = np.zeros(size, dtype=bool)
+            if enhance_level in (8, 11):
+                add = active & (self.gear_grade == rare)
+            if enhance_level == 11:
+                add |= active & (self.gear_grade == heroic)
+
+            if add.any():
+                self._add_substats(np.flatnonzero(add), tier_index, rng)
+
+            # Enhance a random substat at every +3
+            if (enhance_level + 1) % 3 == 0:
+                roll = np.flatnonzero(active & ~add)
+                n_substats = (self.substat_ids[roll] != EMPTY_STAT).sum(axis=1)
+                slots = (rng.random(len(roll)) * n_substats).astype(np.intp)
+                slots = np.minimum(slots, np.maximum(n_substats - 1, 0))
+                roll, slots = roll[n_substats > 0], slots[n_substats > 0]
+                self.substat_values[roll, slots] += sample_substat_values(
+                    self.substat_ids[roll, slots], self.gear_grade[roll], tier_index[roll], rng)
+                self.substat_rolled[roll, slots] += 1
+
+            self.enhance_level[active] = enhance_level + 1
+
+        # Mainstat at +15
+        base = tables['mainstat_values'][self.mainstat_id, self.gear_grade, tier_index]
+        enhanced_value = np.round(base * MAINSTAT_MULTIPLIERS[14]).astype(np.int32)
+        self.mainstat_value[enhanced] = enhanced_value[enhanced]
+
+        return self
+
+
+    def _add_substats(self, rows, tier_index, rng):
+        """
+        Adds a new random substat to the given gears, that isn't already in their mainstat or substats.
+        """
+        tables = get_tables()
+        ids = self.substat_ids[rows]
+        slots = (ids != EMPTY_STAT).sum(axis=1)
+        if (slots == MAX_SUBSTATS).any():
+            raise ValueError("Gear already has maximum number of allowed substats.")
+
+        # Available pool without the stats already on the gear
+        pool = tables['substat_pool'][self.gear_type[rows]]
+        pool[np.arange(len(rows)), self.mainstat_id[rows]] = False
+        for slot in range(MAX_SUBSTATS):
+            filled = ids[:, slot] != EMPTY_STAT
+            pool[np.flatnonzero(filled), ids[filled, slot]] = False
+
+        new_ids = _random_pick(pool, rng)
+        self.substat_ids[rows, slots] = new_ids
+        self.substat_values[rows, slots] = sample_substat_values(
+            new_ids, self.gear_grade[rows], tier_index[rows], rng)
+        self.substat_rolled[rows, slots] = 0
+        self.substat_modded[rows, slots] = False
+
+
+    def get_gear_scores(self):
+        """
+        Calculate the standardized gear score of every gear in the batch (see get_gear_scores()).
+
+        Returns:
+            (gears x 2) int array of gear scores before and after reforge
+        """
+        return get_gear_scores(self.substat_ids, self.substat_values, self.substat_rolled)
+
+
+    def get_gear_types(self):
+        """Returns the gear type names of the gears"""
+        return [get_tables()['gear_types'][t] for t in self.gear_type]
+
+
+    def get_gear_grades(self):
+        """Returns the gear grade names of the gears"""
+        return [get_tables()['gear_grades'][g] for g in self.gear_grade]
+
+
+    def get_gear_sets(self):
+        """Returns the gear set names of the gears"""
+        return [get_tables()['gear_sets'][s] for s in self.gear_set]
+
+
+    @classmethod
+    def from_gears(cls, gears):
+        """
+        Creates a batch holding the attributes of a list of Gear objects.
+
+        Args:
+            gears (list of Gear): gears that have been created
+
+        Returns:
+            GearBatch
+        """
+        tables = get_tables()
+        batch = cls(len(gears))
+        for i, gear in enumerate(gears):
+            batch.gear_type[i] = tables['gear_types'].index(gear.gear_type)
+            batch.gear_grade[i] = tables['gear_grades'].index(gear.gear_grade)
+            batch.gear_set[i] = tables['gear_sets'].index(gear.gear_set)
+            batch.gear_level[i] = gear.gear_level
+            batch.gear_tier[i] = gear.gear_tier
+            batch.enhance_level[i] = gear.enhance_level
+            batch.is_reforged[i] = gear.is_reforged
+            batch.mainstat_id[i] = int(gear.mainstat.stat_id)
+            batch.mainstat_value[i] = gear.mainstat.value
+            for j, stat in enumerate(gear.substats):
+                batch.substat_ids[i, j] = int(stat.stat_id)
+                batch.substat_values[i, j] = stat.value
+                batch.substat_rolled[i, j] = stat.rolled
+                batch.substat_modded[i, j] = stat.modded
+
+        return batch
+
+
+    def to_gears(self):
+        """
+        Converts the batch into a list of Gear objects.
+
+        Returns:
+            list of Gear
+        """
+        from src.gear import Gear
+
+        tables = get_tables()
+        gears = []
+        for i in range(len(self)):
+            gear = Gear()
+            gear.gear_type = tables['gear_types'][self.gear_type[i]]
+            gear.gear_grade = tables['gear_grades'][self.gear_grade[i]]
+            gear.gear_set = tables['gear_sets'][self.gear_set[i]]
+            gear.gear_level = int(self.gear_level[i])
+            gear.gear_tier = int(self.gear_tier[i])
+            gear.enhance_level = int(self.enhance_level[i])
+            gear.is_reforged = bool(self.is_reforged[i])
+            gear.mainstat_id = str(self.mainstat_id[i])
+            gear.substat_ids = [str(s) for s in self.substat_ids[i] if s != EMPTY_STAT]
+
+            gear.mainstat = _make_stat(gear, gear.mainstat_id, 'mainstat', int(self.mainstat_value[i]), 0)
+            gear.substats = [
+                _make_stat(gear, gear.substat_ids[j], 'substat', int(self.substat_values[i, j]),
+                           int(self.substat_rolled[i, j]), bool(self.substat_modded[i, j]))
+                for j in range(len(gear.substat_ids))]
+            gears.append(gear)
+
+        return gears
+
+
+def _make_stat(gear, stat_id, stat_type, value, rolled, modded=False):
+    """Builds a Stat object of a gear with a known value, rolled count and modded flag."""
+    from src.stats import Stat, get_stat_info
+
+    stat = Stat()
+    stat._set_stat_by_id(stat_id, stat_type, gear.gear_type)
+    stat.info = get_stat_info(stat_id, stat_type)
+    stat.gear_grade = gear.gear_grade
+    stat.gear_level = gear.gear_level
+    stat.gear_tier = gear.gear_tier
+    stat.rolled = rolled
+    stat.value = value
+    stat.modded = modded
+    stat.reforge_increase = get_reforge_increase(stat_id, stat_type, rolled)
+    stat._clear_format(show_reforged=not gear.is_reforged)
+    return stat
@@ -0,0 +1,528 @@
+import hashlib
+import json
+import os
+import numpy as np
+from fractions import Fraction
+from src import registry
+from src.validation_utils import *
+from src.utilities import *
+from src.registry import TYPES, GRADES, TIERS, STATS, LOOKUPS, on_reset
+
+# Number of lattice points per gear score point used when adding up score contributions.
+# Contributions of stats with gscore 1, 2, 1.6 and 8/7 fall exactly on this lattice; flat stat
+# contributions are rounded to the nearest point, so the sum of a gear with 3 flat substats can be
+# up to 3/2800 of a point off. Gears whose score is that close to a .5 boundary (about 4 in 10,000)
+# can be counted 1 point away from Gear.get_gear_score().
+SCORE_RESOLUTION = 1400
+
+# Largest denominator of the gscore multipliers of stats.json written as fractions (e.g. 103/5800 for
+# health_flat)
+GSCORE_MAX_DENOMINATOR = 10 ** 6
+
+# File of the data folder holding the score distributions of new gears with open substats for every
+# gear type, grade, tier and mainstat (see write_score_distributions())
+SCORE_DISTRIBUTIONS_FILE = 'score_distributions.json'
+
+# Distributions with fewer than 1/MERGE_DENSITY keys per lattice point of their range are merged
+# by sorting their keys rather than with a dense array over the range
+MERGE_DENSITY = 16
+
+# Caches of the outcomes of _get_outcomes(), of the _ScoreEngine of every (grade, tier), of the
+# results of get_gear_score_distribution() and of the loaded SCORE_DISTRIBUTIONS_FILE, see
+# clear_cache(). Outcomes take a lot of memory, so only the last OUTCOMES_CACHE_SIZE are kept
+OUTCOMES_CACHE_SIZE = 16
+_outcomes_cache = {}
+_engine_cache = {}
+_score_cache = {}
+_precomputed = None
+
+
+def clear_cache():
+    """
+    Empties the caches of get_gear_score_distribution() and get_substat_distribution(). This is
+    called whenever the registry drops its data (see registry.on_reset()).
+    """
+    global _precomputed
+
+    _outcomes_cache.clear()
+    _engine_cache.clear()
+    _score_cache.clear()
+    _precomputed = None
+
+
+on_reset(clear_cache)
+
+
+def get_roll_distribution(stat_id, gear_grade, gear_level=85):
+    """
+    Get the probability of every value a substat can roll, as used by get_stat_value()
+    both for new substats and for enhancing a substat.
+
+    Args:
+        stat_id (int or str): valid stat id
+        gear_grade (str): grade of the gear - 'rare', 'heroic', 'epic'
+        gear_level (int): level of gear, between 58 and 100 (default: 85)
+
+    Returns:
+        dict: {value: probability}
+    """
+    stat_id = validate_stat_id(stat_id)
+    gear_grade = validate_gear_grade_input(gear_grade)
+    gear_tier = get_gear_tier(validate_gear_level(gear_level))
+
+    var = STATS[stat_id]['vars']['substat']
+    values = var['values'][gear_grade][gear_tier - 5]
+    rates = var['rates'][gear_grade][gear_tier - 5]
+
+    # Rates are normalized in the same way random.choices() does it
+    total = sum(rates)
+    distribution = {}
+    for value, rate in zip(values, rates):
+        distribution[value] = distribution.get(value, 0) + rate / total
+
+    return distribution
+
+
+def get_enhance_schedule(gear_grade, enhance_level=0):
+    """
+    Get the substat events of Gear.enhance_gear() between the given enhance level and +15.
+
+    Args:
+        gear_grade (str): grade of the gear - 'rare', 'heroic', 'epic'
+        enhance_level (int): current enhance level of the gear (default: 0)
+
+    Returns:
+        list of str: 'add' (a new substat is added) or 'roll' (a random substat is enhanced)
+    """
+    gear_grade = validate_gear_grade_input(gear_grade)
+    enhance_level = validate_enhance_level(enhance_level)
+
+    schedule = []
+    for level in range(enhance_level, 15):
+        if gear_grade == 'rare' and (level == 8 or level == 11):
+            schedule.append('add')
+        elif gear_grade == 'heroic' and level == 11:
+            schedule.append('add')
+        elif ((level + 1) % 3) == 0:
+            schedule.append('roll')
+
+    return schedule
+
+
+def _convolve_values(dist_1, dist_2):
+    """Distribution of the sum of two independent int values, as {value: probability} dicts."""
+    result = {}
+    for value_1, p_1 in dist_1.items():
+        for value_2, p_2 in dist_2.items():
+            result[value_1 + value_2] = result.get(value_1 + value_2, 0) + p_1 * p_2
+    return result
+
+
+def _sort_substats(state):
+    """Sorts the substats of an outcome by their (unique) stat ids."""
+    return tuple(sorted(state))
+
+
+def _get_outcomes(gear_type, mainstat_id, substats, schedule):
+    """
+    Enumerates how the substats of a gear end up after the given enhance schedule.
+    New substats and rolls are picked with equal chance, so outcomes that only differ in the
+    order of their substats are merged. Results are cached, and must not be changed.
+
+    Args:
+        gear_type (str): valid gear type
+        mainstat_id (str): valid mainstat id
+        substats (list of tuples): (stat_id, start) of the substats on the gear, where start is
+            either a known (value, rolled) tuple or None for a new substat with a random value
+        schedule (list of str): events from get_enhance_schedule()
+
+    Returns:
+        dict: maps a sorted tuple of (stat_id, start, new rolls) for every final substat
+            to its probability
+    """
+    key = (gear_type, mainstat_id, tuple(substats), tuple(schedule))
+    if key in _outcomes_cache:
+        # Move the outcomes to the end, as the most recently used
+        _outcomes_cache[key] = _outcomes_cache.pop(key)
+    else:
+        _outcomes_cache[key] = _enumerate_outcomes(gear_type, mainstat_id, substats, schedule)
+        while len(_outcomes_cache) > OUTCOMES_CACHE_SIZE:
+            del _outcomes_cache[next(iter(_outcomes_cache))]
+    return _outcomes_cache[key]
+
+
+def _enumerate_outcomes(gear_type, mainstat_id, substats, schedule):
+    """Enumerates the outcomes of _get_outcomes()."""
+    pool = LOOKUPS['pools'][gear_type]['substat']
+
+    states = {_sort_substats((stat_id, start, 0) for stat_id, start in substats): 1.0}
+    for event in schedule:
+        new_states = {}
+        for state, p in states.items():
+            if event == 'add':
+                taken = [s[0] for s in state] + [mainstat_id]
+                choices = [s for s in pool if s not in taken]
+                if not choices:
+                    raise ValueError("No substat is left to add to the gear.")
+                for stat_id in choices:
+                    new_state = _sort_substats(state + ((stat_id, None, 0),))
+                    new_states[new_state] = new_states.get(new_state, 0) + p / len(choices)
+            elif state:
+                for i in range(len(state)):
+                    stat_id, start, rolls = state[i]
+                    new_state = _sort_substats(state[:i] + ((stat_id, start, rolls + 1),) + state[i + 1:])
+                    new_states[new_state] = new_states.get(new_state, 0) + p / len(state)
+            else:
+                new_states[state] = new_states.get(state, 0) + p
+        states = new_states
+
+    return states
+
+
+def _get_engine(gear_grade, gear_level):
+    """Get the cached _ScoreEngine of a gear grade and the tier of a gear level."""
+    key = (gear_grade, get_gear_tier(gear_level))
+    if key not in _engine_cache:
+        _engine_cache[key] = _ScoreEngine(gear_grade, gear_level)
+    return _engine_cache[key]
+
+
+class _ScoreEngine():
+    """
+    Adds up the gear score distributions of the outcomes from _get_outcomes().
+
+    Outcomes are arranged in a tree by their substats in order, and each node of the tree is
+    evaluated once: the distribution below a node is the mixture of (substat distribution
+    convolved with the distribution below the child) over its children.
+
+    The distributions of the substat values and score contributions only depend on the gear grade
+    and tier, and are kept for all the outcomes scored by the engine (see _get_engine()).
+
+    Scores are added up as ints, in 1/resolution of a gear score point (see SCORE_RESOLUTION). With a
+    resolution that every gscore denominator divides, the scores are exact, but much slower to add up.
+    """
+
+    def __init__(self, gear_grade, gear_level, resolution=SCORE_RESOLUTION):
+        self.gear_grade = gear_grade
+        self.gear_level = gear_level
+        self.resolution = resolution
+        self.gscores = {stat_id: Fraction(stat['gscore']).limit_denominator(GSCORE_MAX_DENOMINATOR)
+                        for stat_id, stat in STATS.items()}
+        self.roll_dists = {}
+        self.value_dists = {}
+        self.edge_dists = {}
+
+    def roll_dist(self, stat_id):
+        if stat_id not in self.roll_dists:
+            self.roll_dists[stat_id] = get_roll_distribution(stat_id, self.gear_grade, self.gear_level)
+        return self.roll_dists[stat_id]
+
+    def value_dist(self, stat_id, start, rolls):
+        """Distribution of the final (value, rolled) of a substat."""
+        key = (stat_id, start, rolls)
+        if key not in self.value_dists:
+            if start is None:
+                values, rolled = self.roll_dist(stat_id), 0
+            else:
+                values, rolled = {start[0]: 1.0}, start[1]
+            for _ in range(rolls):
+                values = _convolve_values(values, self.roll_dist(stat_id))
+            self.value_dists[key] = (values, rolled + rolls)
+        return self.value_dists[key]
+
+    def edge_dist(self, edge, reforged):
+        """Distribution of the score contribution of a substat, as lattice (keys, probs) arrays."""
+        key = (edge, reforged)
+        if key not in self.edge_dists:
+            stat_id = edge[0]
+            values, rolled = self.value_dist(*edge)
+            gscore = self.gscores[stat_id] * self.resolution
+            increase = STATS[stat_id]['reforge']['substat'][rolled] if reforged else 0
+            points = {}
+            for value, p in values.items():
+                point = round((value + increase) * gscore)
+                points[point] = points.get(point, 0) + p
+            self.edge_dists[key] = (np.array(list(points.keys()), dtype=np.int64),
+                                    np.array(list(points.values())))
+        return self.edge_dists[key]
+
+    @staticmethod
+    def get_tree(outcomes):
+        """
+        Arranges outcomes from _get_outcomes() in a tree: {substat: subtree}, with the probability of the
+        outcomes ending at a node under the key None.
+        """
+        tree = {}
+        for state, p in outcomes.items():
+            node = tree
+            for edge in state:
+                node = node.setdefault(edge, {})
+            node[None] = node.get(None, 0) + p
+        return tree
+
+    def score_distribution(self, tree, reforged=False):
+        """
+        Args:
+            tree (dict): outcomes arranged with get_tree()
+            reforged (bool): whether to score the substats after reforge
+
+        Returns:
+            dict: {gear score: probability}
+        """
+        keys, probs = self._evaluate(tree, reforged)
+
+        # Round the scores half to even, the same way as round() in get_gear_score()
+        scores, remainders = np.divmod(keys, self.resolution)
+        scores += (2 * remainders > self.resolution) | ((2 * remainders == self.resolution) & (scores % 2 == 1))
+
+        distribution = {}
+        for score, p in zip(scores.tolist(), probs.tolist()):
+            distribution[score] = distribution.get(score, 0) + p
+        return distribution
+
+    def _evaluate(self, node, reforged):
+        parts = []
+        if None in node:
+            parts.append((np.zeros(1, dtype=np.int64), np.array([node[None]])))
+        for edge, child in node.items():
+            if edge is None:
+                continue
+            edge_keys, edge_probs = self.edge_dist(edge, reforged)
+            if len(child) == 1 and None in child:
+                # Last substat of an outcome
+                parts.append((edge_keys, edge_probs * child[None]))
+            else:
+                child_keys, child_probs = self._evaluate(child, reforged)
+                parts.append(((edge_keys[:, None] + child_keys[None, :]).ravel(),
+                              (edge_probs[:, None] * child_probs[None, :]).ravel()))
+
+        # A single last substat needs no merging
+        if len(node) == 1 and None not in node and list(node.values())[0].keys() == {None}:
+            return parts[0]
+
+        # Merge the parts into one distribution
+        keys = np.concatenate([part[0] for part in parts])
+        probs = np.concatenate([part[1] for part in parts])
+        offset = keys.min()
+        span = keys.max() - offset + 1
+        if len(keys) * MERGE_DENSITY < span:
+            points, inverse = np.unique(keys, return_inverse=True)
+            return points, np.bincount(inverse, weights=probs, minlength=len(points))
+        merged = np.bincount(keys - offset, weights=probs, minlength=span)
+        points = np.flatnonzero(merged)
+        return points + offset, merged[points]
+
+
+def get_gear_score_distribution(gear_type=None, gear_grade=None, gear_level=85,
+                                mainstat_id=None, substat_ids=None):
+    """
+    Calculates the probability of every gear score a new gear can reach once it is enhanced
+    to +15, following the same rules as Gear.create_gear() and Gear.enhance_gear().
+    Substats that are not provided are added at random, like in create_gear().
+
+    The probability of every outcome of the enhance steps is exact, and the score contributions
+    of flat stats are rounded to 1/SCORE_RESOLUTION of a point, so about 4 in 10,000 gears
+    (whose score ends very close to .5) are counted 1 point away from Gear.get_gear_score().
+
+    Queries without starting substats are read from the precomputed SCORE_DISTRIBUTIONS_FILE and
+    take under a millisecond, after about 30 ms to load the file on the first query. Queries with
+    starting substats are calculated, which takes up to about 1 second the first time (e.g. 0.9 s
+    for Epic boots with 1 given substat, less with more substats). Results are cached, so repeating a query takes microseconds (see clear_cache()).
+
+    Args:
+        gear_type (str): 'weapon', 'helm', 'armor', 'necklace', 'ring', or 'boots'
+        gear_grade (str): 'rare', 'heroic', or 'epic'
+        gear_level (int): level of gear, between 58 and 100 (default: 85)
+        mainstat_id (int or str): valid stat id (default: None, any allowed mainstat with equal chance)
+        substat_ids (int/str or list of int/str): starting substat ids (default: None)
+
+    Returns:
+        list of two dicts ({gear score: probability}) -
+            first dict is the gear score before reforge
+            second dict is the gear score after reforge
+    """
+    # Validate inputs
+    if gear_type is None:
+        raise ValueError(
+            "Please provide a valid gear type: 'weapon', 'helm', 'armor', 'necklace', 'ring', or 'boots'.")
+    gear_type = validate_gear_type(gear_type)
+    if gear_grade is None:
+        raise ValueError("Please provide a valid gear grade: 'rare', 'heroic', or 'epic'.")
+    gear_grade = validate_gear_grade(gear_grade, mainstat_id, substat_ids)
+    gear_level = validate_gear_level(gear_level)
+    mainstat_id = validate_mainstat_id(mainstat_id, substat_ids, gear_type)
+    substat_ids = validate_substat_ids(substat_ids, mainstat_id, gear_type)
+
+    # Mainstats to average over
+    if mainstat_id is not None:
+        mainstat_ids = [mainstat_id]
+    else:
+        mainstat_ids = [s for s in LOOKUPS['pools'][gear_type]['mainstat'] if s not in substat_ids]
+        if not mainstat_ids:
+            raise ValueError(f"{gear_type} cannot have a mainstat that is not in the substats.")
+
+    gear_tier = get_gear_tier(gear_level)
+    key = (gear_type, gear_grade, gear_tier, tuple(mainstat_ids), tuple(substat_ids))
+    if key not in _score_cache:
+        precomputed = _get_precomputed().get((gear_type, gear_grade, gear_tier))
+        if not substat_ids and precomputed is not None:
+            # Average of the distributions of each mainstat
+            _score_cache[key] = [{}, {}]
+            for m in mainstat_ids:
+                for cached, distribution in zip(_score_cache[key], precomputed[m]):
+                    for score, p in distribution.items():
+                        cached[score] = cached.get(score, 0) + p / len(mainstat_ids)
+        else:
+            _score_cache[key] = _calculate_score_distribution(gear_type, gear_grade, gear_level,
+                                                              mainstat_ids, substat_ids)
+
+    # Copies, so that changing the returned dicts does not change the cache
+    return [dict(distribution) for distribution in _score_cache[key]]
+
+
+def _calculate_score_distribution(gear_type, gear_grade, gear_level, mainstat_ids, substat_ids):
+    """
+    Calculates the result of get_gear_score_distribution() for validated inputs.
+
+    Args:
+        gear_type (str): valid gear type
+        gear_grade (str): valid gear grade
+        gear_level (int): valid gear level
+        mainstat_ids (list of str): mainstat ids to average over, with equal chance
+        substat_ids (list of str): starting substat ids
+
+    Returns:
+        list of two dicts ({gear score: probability}), before and after reforge
+    """
+    # Missing starting substats are added at random before enhancing
+    missing = GRADES[gear_grade]['starting_substats'] - len(substat_ids)
+    schedule = ['add'] * missing + get_enhance_schedule(gear_grade)
+    substats = [(s, None) for s in substat_ids]
+
+    outcomes = {}
+    for m in mainstat_ids:
+        for state, p in _get_outcomes(gear_type, m, substats, schedule).items():
+            outcomes[state] = outcomes.get(state, 0) + p / len(mainstat_ids)
+
+    engine = _get_engine(gear_grade, gear_level)
+    tree = engine.get_tree(outcomes)
+    return [engine.score_distribution(tree), engine.score_distribution(tree, reforged=True)]
+
+
+def _get_data_digest():
+    """
+    Digest of the data tables (and SCORE_RESOLUTION) that the score distributions are calculated from,
+    stored in SCORE_DISTRIBUTIONS_FILE so that a file built from other data is not used.
+    """
+    data = [SCORE_RESOLUTION] + [dict(table) for table in [TYPES, GRADES, TIERS, STATS]]
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+
+def _get_precomputed():
+    """
+    Loads the distributions of SCORE_DISTRIBUTIONS_FILE from the data folder, once.
+
+    Returns:
+        dict: maps (gear_type, gear_grade, gear_tier) to {mainstat_id: [pmf, reforged_pmf]}, or is empty
+            if the file is missing or was built from other data tables
+    """
+    global _precomputed
+
+    if _precomputed is None:
+        _precomputed = {}
+        try:
+            with open(os.path.join(registry.DATA_DIR, SCORE_DISTRIBUTIONS_FILE), 'r') as json_file:
+                stored = json.load(json_file)
+        except (OSError, ValueError):
+            return _precomputed
+        if stored.get('digest') != _get_data_digest():
+            return _precomputed
+
+        for gear_type, grades in stored['distributions'].items():
+            for gear_grade, tiers in grades.items():
+                for gear_tier, mainstats in tiers.items():
+                    _precomputed[(gear_type, gear_grade, int(gear_tier))] = {
+                        mainstat_id: [{int(score): p for score, p in distribution.items()}
+                                      for distribution in distributions]
+                        for mainstat_id, distributions in mainstats.items()}
+    return _precomputed
+
+
+def write_score_distributions(data_dir=None):
+    """
+    Calculates the score distributions of new gears without starting substats for every gear type,
+    grade, tier and mainstat, and writes them to SCORE_DISTRIBUTIONS_FILE in the data folder, so that
+    get_gear_score_distribution() can answer these queries without calculating them. This takes a few
+    minutes, and must be run again whenever the data tables change.
+
+    Args:
+        data_dir (str): data folder to write to (default: the data folder of the registry)
+
+    Returns:
+        str: path of the written file
+    """
+    if data_dir is None:
+        data_dir = registry.DATA_DIR
+
+    # Grades with substat values in stats.json
+    gear_grades = [g for g in GRADES.keys() if all(g in stat['vars']['substat']['values'] for stat in STATS.values())]
+
+    distributions = {}
+    for gear_type in TYPES.keys():
+        for gear_grade in gear_grades:
+            for tier in TIERS.values():
+                gear_level = tier['level_range'][0]
+                distributions.setdefault(gear_type, {}).setdefault(gear_grade, {})[tier['gear_tier']] = {
+                    m: _calculate_score_distribution(gear_type, gear_grade, gear_level, [m], [])
+                    for m in LOOKUPS['pools'][gear_type]['mainstat']}
+
+    path = os.path.join(data_dir, SCORE_DISTRIBUTIONS_FILE)
+    with open(path, 'w') as json_file:
+        json.dump({'digest': _get_data_digest(), 'distributions': distributions}, json_file)
+    return path
+
+
+def get_substat_distribution(gear, stat_id, reforged=False):
+    """
+    Calculates the exact probability of every value a substat can have once the given gear is
+    enhanced to +15, following the same rules as Gear.enhance_gear(). The current substats of the
+    gear keep their values and rolled counts, and new substats are added at random.
+
+    Args:
+        gear (Gear): a created gear
+        stat_id (int or str): valid stat id of the substat
+        reforged (bool): whether to return the value after reforge (default: False)
+
+    Returns:
+        dict: {value: probability}, where a value of 0 means the gear does not have the substat
+    """
+    # Validate inputs
+    if gear.gear_type is None or gear.mainstat is None:
+        raise ValueError("Please create the gear first.")
+    stat_id = validate_stat_id(stat_id)
+    check_valid_pool(gear.gear_type, 'substat', [stat_id])
+
+    mainstat_id = str(gear.mainstat.stat_id)
+    if stat_id == mainstat_id:
+        return {0: 1.0}
+
+    substats = [(str(s.stat_id), (s.value, s.rolled)) for s in gear.substats]
+    schedule = get_enhance_schedule(gear.gear_grade, gear.enhance_level)
+    outcomes = _get_outcomes(gear.gear_type, mainstat_id, substats, schedule)
+
+    # Reforge does not apply twice
+    reforged = reforged and not gear.is_reforged
+
+    engine = _get_engine(gear.gear_grade, gear.gear_level)
+    distribution = {}
+    for state, p in outcomes.items():
+        edge = next((edge for edge in state if edge[0] == stat_id), None)
+        if edge is None:
+            distribution[0] = distribution.get(0, 0) + p
+            continue
+        values, rolled = engine.value_dist(*edge)
+        increase = STATS[stat_id]['reforge']['substat'][rolled] if reforged else 0
+        for value, value_p in values.items():
+            distribution[value + increase] = distribution.get(value + increase, 0) + p * value_p
+
+    return dict(sorted(distribution.items()))
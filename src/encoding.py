@@ -0,0 +1,229 @@
+import numpy as np
+from src.utilities import *
+from src.batch import GearBatch, EMPTY_STAT, MAX_SUBSTATS, get_tables, _make_stat
+
+# Code of an empty substat slot in the encoded substat id field
+EMPTY_CODE = 15
+
+# Widths (in bits) of the gear fields and of the fields of each substat slot.
+# Field names are the GearBatch columns they are read from. The gear tier is stored as an index
+# into the tiers, since a reforged gear keeps the tier it had before reforging.
+GEAR_FIELDS = [('gear_type', 3), ('gear_grade', 3), ('gear_set', 5), ('gear_level', 7), ('gear_tier', 2),
+               ('enhance_level', 4), ('is_reforged', 1), ('mainstat_id', 4), ('mainstat_value', 12)]
+SUBSTAT_FIELDS = [('substat_ids', 4), ('substat_values', 12), ('substat_rolled', 3), ('substat_modded', 1)]
+
+
+def get_layout():
+    """
+    Returns the bit layout of an encoded gear. The gear fields and the first substat are
+    stored in the first 64-bit word, and the other three substats in the second word, so that no
+    field crosses a word boundary.
+
+    Returns:
+        list of (name (str), slot (int or None), word (int), shift (int), bits (int)), where slot
+        is the substat index of a substat field and None for a gear field
+    """
+    layout = []
+    word, shift = 0, 0
+    fields = [(name, None, bits) for name, bits in GEAR_FIELDS]
+    for slot in range(MAX_SUBSTATS):
+        fields += [(name, slot, bits) for name, bits in SUBSTAT_FIELDS]
+        # Start a new word after the first substat
+        if slot == 0:
+            fields.append(None)
+
+    for field in fields:
+        if field is None:
+            word, shift = word + 1, 0
+            continue
+        name, slot, bits = field
+        layout.append((name, slot, word, shift, bits))
+        shift += bits
+
+    return layout
+
+
+LAYOUT = get_layout()
+
+# Mask of the lower 64-bit word of an encoded gear
+WORD_MASK = (1 << 64) - 1
+
+
+def _get_fields(gear):
+    """Collects the field values of a Gear object as the ints that are encoded."""
+    tables = get_tables()
+    if gear.mainstat is None:
+        raise ValueError("Cannot encode a gear that has not been created.")
+
+    substats = gear.substats
+    empty = [0] * (MAX_SUBSTATS - len(substats))
+    return {
+        'gear_type': tables['gear_types'].index(gear.gear_type),
+        'gear_grade': tables['gear_grades'].index(gear.gear_grade),
+        'gear_set': tables['gear_sets'].index(gear.gear_set),
+        'gear_level': gear.gear_level,
+        'gear_tier': tables['tiers'].index(gear.gear_tier),
+        'enhance_level': gear.enhance_level,
+        'is_reforged': int(gear.is_reforged),
+        'mainstat_id': int(gear.mainstat.stat_id),
+        'mainstat_value': gear.mainstat.value,
+        'substat_ids': [int(s.stat_id) for s in substats] + [EMPTY_CODE] * len(empty),
+        'substat_values': [s.value for s in substats] + empty,
+        'substat_rolled': [s.rolled for s in substats] + empty,
+        'substat_modded': [int(s.modded) for s in substats] + empty,
+    }
+
+
+def encode_gear(gear):
+    """
+    Encodes a gear into a single int of 128 bits (see get_layout()).
+
+    Args:
+        gear (Gear): gear that has been created
+
+    Returns:
+        int
+    """
+    fields = _get_fields(gear)
+
+    code = 0
+    for name, slot, word, shift, bits in LAYOUT:
+        value = fields[name] if slot is None else fields[name][slot]
+        if not 0 <= value < (1 << bits):
+            raise ValueError(f"Value {value} of {name} does not fit in {bits} bits.")
+        code |= value << (64 * word + shift)
+
+    return code
+
+
+def decode_gear(code):
+    """
+    Decodes an int made by encode_gear() back into a Gear object. The substat ids of the gear
+    are those of its decoded substats.
+
+    Args:
+        code (int): encoded gear
+
+    Returns:
+        Gear
+    """
+    from src.gear import Gear
+
+    fields = {name: [] for name, bits in SUBSTAT_FIELDS}
+    for name, slot, word, shift, bits in LAYOUT:
+        value = (code >> (64 * word + shift)) & ((1 << bits) - 1)
+        if slot is None:
+            fields[name] = value
+        else:
+            fields[name].append(value)
+
+    tables = get_tables()
+    gear = Gear()
+    gear.gear_type = tables['gear_types'][fields['gear_type']]
+    gear.gear_grade = tables['gear_grades'][fields['gear_grade']]
+    gear.gear_set = tables['gear_sets'][fields['gear_set']]
+    gear.gear_level = fields['gear_level']
+    gear.gear_tier = tables['tiers'][fields['gear_tier']]
+    gear.enhance_level = fields['enhance_level']
+    gear.is_reforged = bool(fields['is_reforged'])
+    gear.mainstat_id = str(fields['mainstat_id'])
+    gear.substat_ids = [str(s) for s in fields['substat_ids'] if s != EMPTY_CODE]
+
+    gear.mainstat = _make_stat(gear, gear.mainstat_id, 'mainstat', fields['mainstat_value'], 0)
+    gear.substats = [
+        _make_stat(gear, stat_id, 'substat', fields['substat_values'][j], fields['substat_rolled'][j],
+                   bool(fields['substat_modded'][j]))
+        for j, stat_id in enumerate(gear.substat_ids)]
+
+    return gear
+
+
+def encode_gears(gears):
+    """
+    Encodes a list of gears into a NumPy array, with the two 64-bit words of each gear in a row.
+    Identical gears have identical rows, so the array can be hashed, compared or deduplicated
+    (e.g. with np.unique(codes, axis=0)) directly.
+
+    Args:
+        gears (list of Gear): gears that have been created
+
+    Returns:
+        np.ndarray of shape (len(gears), 2) and dtype uint64
+    """
+    codes = np.zeros((len(gears), 2), dtype=np.uint64)
+    for i, gear in enumerate(gears):
+        code = encode_gear(gear)
+        codes[i] = (code & WORD_MASK, code >> 64)
+
+    return codes
+
+
+def decode_gears(codes):
+    """
+    Decodes an array made by encode_gears() back into Gear objects.
+
+    Args:
+        codes (np.ndarray): (n x 2) array of encoded gears
+
+    Returns:
+        list of Gear
+    """
+    return [decode_gear(int(low) | (int(high) << 64)) for low, high in np.asarray(codes, dtype=np.uint64)]
+
+
+def encode_batch(batch):
+    """
+    Encodes all gears of a GearBatch at once, with the same layout as encode_gears(), so that
+    encode_batch(GearBatch.from_gears(gears)) equals encode_gears(gears).
+
+    Args:
+        batch (GearBatch): batch of gears
+
+    Returns:
+        np.ndarray of shape (len(batch), 2) and dtype uint64
+    """
+    tiers = np.array(get_tables()['tiers'])
+    codes = np.zeros((len(batch), 2), dtype=np.uint64)
+    for name, slot, word, shift, bits in LAYOUT:
+        column = getattr(batch, name)
+        if name == 'gear_tier':
+            column = np.searchsorted(tiers, column)
+        if slot is not None:
+            column = column[:, slot]
+        column = column.astype(np.int64)
+        if name == 'substat_ids':
+            column = np.where(column == EMPTY_STAT, EMPTY_CODE, column)
+        if np.any((column < 0) | (column >= (1 << bits))):
+            raise ValueError(f"Values of {name} do not fit in {bits} bits.")
+        codes[:, word] |= column.astype(np.uint64) << np.uint64(shift)
+
+    return codes
+
+
+def decode_batch(codes):
+    """
+    Decodes an array made by encode_batch() or encode_gears() into a GearBatch.
+
+    Args:
+        codes (np.ndarray): (n x 2) array of encoded gears
+
+    Returns:
+        GearBatch
+    """
+    tiers = np.array(get_tables()['tiers'])
+    codes = np.asarray(codes, dtype=np.uint64)
+    batch = GearBatch(len(codes))
+    for name, slot, word, shift, bits in LAYOUT:
+        column = getattr(batch, name)
+        values = (codes[:, word] >> np.uint64(shift)) & np.uint64((1 << bits) - 1)
+        values = values.astype(np.int64)
+        if name == 'substat_ids':
+            values = np.where(values == EMPTY_CODE, EMPTY_STAT, values)
+        if name == 'gear_tier':
+            values = tiers[values]
+        if slot is None:
+            column[:] = values
+        else:
+            column[:, slot] = values
+
+    return batch
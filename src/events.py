@@ -0,0 +1,25 @@
+from collections import namedtuple
+
+# Compact record of one change made to a gear (or of an operation that was refused), appended to
+# the `events` list passed to the Gear methods:
+#   op (str): 'enhance' (mainstat increase), 'add' (new substat), 'roll' (substat increase),
+#       'reforge' or 'modify' (for a refused operation, the operation that was refused)
+#   stat_index (int): index of the stat in gear.substats (None for the mainstat or the whole gear)
+#   stat_id (str): id of the stat that changed (None if refused)
+#   delta (int): change in the value of the stat (None if refused)
+#   rolled (int): rolled count of the stat after the change (None for the mainstat or if refused)
+#   reason (str): why the operation was refused (None otherwise)
+GearEvent = namedtuple('GearEvent', ['op', 'stat_index', 'stat_id', 'delta', 'rolled', 'reason'])
+
+
+def get_refusals(events):
+    """
+    Get the events of the operations that were refused.
+
+    Args:
+        events (list of GearEvent): events appended by the Gear methods
+
+    Returns:
+        list of GearEvent
+    """
+    return [event for event in events if event.reason is not None]
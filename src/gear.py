@@ -1,26 +1,38 @@
-import json
 import random
 from src.validation_utils import *
 from src.utilities import *
 from src.stats import Stat
+from src.registry import TYPES, SETS, TIERS, GRADES, STATS, LOOKUPS
+from src.utilities import _get_non_overlapping_stat_id
+from src.validation_utils import _validate_gear_grade
+from src.events import GearEvent
+
+# Whether Gear methods print their status messages by default (see set_quiet())
+_quiet = False
+
+
+def set_quiet(quiet=True):
+    """
+    Turns the status messages printed by enhance_gear(), enhance_gear_max(), reforge_gear() and
+    modify_gear() off (or back on) for all gears, e.g. for headless simulations. Each of these
+    methods also takes a `quiet` argument that overrides this setting for one call.
+
+    Args:
+        quiet (bool): True to stop printing status messages, False to print them again (default: True)
+    """
+    global _quiet
+    _quiet = bool(quiet)
+
+
 
-# Import Data 
-with open('data/types.json', 'r') as types_file:
-    TYPES = json.load(types_file)
-with open('data/sets.json', 'r') as sets_file:
-    SETS = json.load(sets_file)
-with open('data/tiers.json', 'r') as tiers_file:
-    TIERS = json.load(tiers_file)
-with open('data/grades.json', 'r') as grades_file:
-    GRADES = json.load(grades_file)
-with open('data/stats.json', 'r') as stats_file:
-    STATS = json.load(stats_file)
-    
 class Gear():
     """
     Gear class that holds mainstats and substats with enhance, reforge, and modify methods
     """
 
+    __slots__ = ('gear_type', 'gear_grade', 'gear_set', 'gear_level', 'gear_tier', 'enhance_level',
+                 'is_reforged', 'mainstat', 'substats', 'mainstat_id', 'substat_ids')
+
     def __init__(self):
         """
         Initializes the Gear object.
@@ -56,18 +68,76 @@ class Gear():
             f"Substat IDs: {self.substat_ids}"
         )
 
+
+    def clone(self):
+        """
+        Returns an independent copy of the gear, e.g. to try different enhance or modify
+        outcomes on the same gear. Stats are copied with Stat.clone() and the substat id list is
+        copied, so changing the copy does not change the original. Much faster than copy.deepcopy().
+
+        Returns:
+            Gear
+        """
+        gear = type(self).__new__(type(self))
+        for attr in Gear.__slots__:
+            setattr(gear, attr, getattr(self, attr))
+        if self.mainstat is not None:
+            gear.mainstat = self.mainstat.clone()
+        gear.substats = [s.clone() for s in self.substats]
+        if self.substat_ids is not None:
+            gear.substat_ids = list(self.substat_ids)
+        # Other attributes set on the gear, e.g. by a subclass
+        attributes = getattr(self, '__dict__', None)
+        if attributes:
+            gear.__dict__.update(attributes)
+
+        return gear
+
+
+    def _report(self, message, quiet=None):
+        """
+        Prints the status message of an operation unless quiet.
+
+        Args:
+            message (str): status message
+            quiet (bool): True to not print the message (default: None = module setting, see set_quiet())
+        """
+        if not (_quiet if quiet is None else quiet):
+            print(message)
+
+
+    def _refuse(self, op, reason, quiet=None, events=None, stat_index=None):
+        """
+        Reports an operation that was refused, as a status message and as a GearEvent with a reason.
+
+        Args:
+            op (str): operation that was refused ('enhance', 'reforge' or 'modify')
+            reason (str): why the operation was refused
+            quiet (bool): True to not print the message (default: None = module setting, see set_quiet())
+            events (list): list to append the GearEvent to (default: None = no events)
+            stat_index (int): index of the substat the operation was on (default: None)
+        """
+        if events is not None:
+            events.append(GearEvent(op, stat_index, None, None, None, reason))
+        self._report(reason, quiet)
+
         
     def create_gear(self, gear_type=None, gear_grade=None, gear_set=None, gear_level=85,
-                    mainstat_id=None, substat_ids=None):
+                    mainstat_id=None, substat_ids=None, rng=random):
         """
         Method to create a new gear. If arguments are set to None, a completely random gear of
         level 85 is created.
+        Inputs are validated once here, and the gear is then built with the trusted (underscore)
+        methods that do not validate them again.
+        All random draws are made with `rng` (a random.Random instance, see src/rng.py, or the
+        random module by default), so a seeded rng creates the same gear every time.
         """
 
         # Validate Inputs
-        self.gear_set = validate_gear_set(gear_set)
+        self.gear_set = validate_gear_set(gear_set, rng)
         self.gear_level = validate_gear_level(gear_level)
         self.gear_tier = get_gear_tier(self.gear_level)
+        gear_type = validate_gear_type(gear_type)
 
         self.mainstat_id = validate_mainstat_id(
             mainstat_id, substat_ids)
@@ -78,45 +148,41 @@ class Gear():
         # Get an appropriate gear_grade, if no substats or mainstats provided,
         # should be completely random, otherwise get a gear_type based on provided
         # mainstats and/or substats
-        self.gear_grade = validate_gear_grade(
-            gear_grade,
-            mainstat_id=self.mainstat_id,
-            substat_ids=self.substat_ids)
-        starting_substats = GRADES[self.gear_grade]['starting_substats']
+        self.gear_grade = _validate_gear_grade(gear_grade, len(self.substat_ids), rng)
 
         # Get an appropriate gear_type, if no mainstats or substats provided,
         # should be completely random, otherwise get a gear_type based on provided
         # mainstats and/or substats
-        self.gear_type = self.get_gear_type(
-            gear_type, self.mainstat_id, self.substat_ids)
+        self.gear_type = self._get_gear_type(
+            gear_type, self.mainstat_id, self.substat_ids, rng)
         
         # Get an appropriate mainstat_id based on gear_type. If no mainstat or substats
         # are provided, get a random mainstat that is in the available pool for given gear type.
         # If substats are provided, non duplicate mainstat is chosen
-        self.mainstat_id = self.get_mainstat_id(
-            self.mainstat_id, self.substat_ids, self.gear_type)
+        self.mainstat_id = self._get_mainstat_id(
+            self.mainstat_id, self.substat_ids, self.gear_type, rng)
         
         # Get substats based on gear_type, mainstat_id, and other substat_ids. If no mainstat or substats
         # are provided, get n random non-overlapping substats that is in the available pool for given gear type.
         # If substats are provided, non duplicate mainstat is chosen
-        self.substat_ids = self.get_substat_ids(
+        self.substat_ids = self._get_substat_ids(
             self.mainstat_id,
             self.substat_ids,
             self.gear_type,
-            self.gear_grade)
+            self.gear_grade,
+            rng)
         
-        self.mainstat = self.get_stat(self.mainstat_id, 'mainstat', self.gear_type, self.gear_grade,
-                                     self.gear_level)
+        self.mainstat = self._get_stat(self.mainstat_id, 'mainstat', self.gear_type, self.gear_grade,
+                                       self.gear_level, rng=rng)
         
-        if len(self.substat_ids) > 0:
-            for i in self.substat_ids:
-                self.substats.append(self.get_stat(i, 'substat', self.gear_type, self.gear_grade,
-                                     self.gear_level))
+        for i in self.substat_ids:
+            self.substats.append(self._get_stat(i, 'substat', self.gear_type, self.gear_grade,
+                                                self.gear_level, rng=rng))
             
         return self    
     
     
-    def get_gear_type(self, gear_type=None, mainstat_id=None, substat_ids=None):
+    def get_gear_type(self, gear_type=None, mainstat_id=None, substat_ids=None, rng=random):
         """
         Retrieves a random gear type based on provided mainstat_id and substat_id.
         Used in the create_gear() method in Gear() class.
@@ -125,6 +191,7 @@ class Gear():
             gear_type (str): Type of gear
             mainstat_id (int or str): Valid stat id [0, 10]
             substat_id (int or list of int): List of valid substat id's, can take up to 4 substat_id's
+            rng: random.Random instance or the random module (default: random)
             
         Returns:
            gear_type (str)
@@ -138,58 +205,40 @@ class Gear():
         if substat_ids is not None:
             substat_ids = validate_substat_ids(substat_ids, mainstat_id)
 
+        return self._get_gear_type(gear_type, mainstat_id, substat_ids, rng)
+
+
+    def _get_gear_type(self, gear_type=None, mainstat_id=None, substat_ids=None, rng=random):
+        """
+        Trusted version of get_gear_type() for internal use: expects validated inputs.
+        """
         # If no args provided, get a random gear type
-        if mainstat_id is None and substat_ids is None and gear_type is None:
-            gear_type = get_random_gear_type()
+        if mainstat_id is None and not substat_ids and gear_type is None:
+            gear_type = get_random_gear_type(rng=rng)
             return gear_type
 
-        # If mainstat_id is provided
-        if mainstat_id is not None:
-            # If gear_type is not provided
-            if gear_type is None:
-                # Get a random gear_type
-                gear_type = get_random_gear_type()
-                # Ensure that mainstat is in the allowed pool of mainstats for gear_type
-                while int(mainstat_id) not in TYPES[gear_type]['mainstat']:
-                    gear_type = get_random_gear_type()
-                    # If substat_id's are provided, ensure that the substat_id's
-                    # are in the allowed pool of substats for gear_type
-                    if substat_ids is not None:
-                        gear_type = get_gear_type_from_subs(gear_type, substat_ids)
-
-            # If gear_type is provided
-            else:
-                # Check if provided mainstat is allowed in provided gear_type
-                if int(mainstat_id) not in TYPES[gear_type]['mainstat']:
-                    raise ValueError(f"{gear_type} cannot have {mainstat_id} as mainstat.")
-                # If substat_id's are provided, ensure that the substat_id's are
-                # in the allowed pool of substats for gear_type
-                if substat_ids is not None and any(s not in convert_int_to_str(
-                    TYPES[gear_type]['substat']) for s in substat_ids):
-                    raise ValueError(f"{gear_type} cannot have one or more of these substats")
-
-        # If mainstat_id is not provided    
-        else: 
-            # If gear_type is not provided
-            if gear_type is None:
-                gear_type = get_random_gear_type()
-                # If substat_id's are provided, ensure that the substat_id's
-                # are in the allowed pool of substats for gear_type
-                if substat_ids is not None:
-                    gear_type = get_gear_type_from_subs(gear_type, substat_ids)
-
-            # If gear_type is provided
-            else:
-                # If substat_id's are provided, ensure that the substat_id's are
-                # in the allowed pool of substats for gear_type
-                if substat_ids is not None and any(s not in convert_int_to_str(
-                    TYPES[gear_type]['substat']) for s in substat_ids):
-                    raise ValueError(f"{gear_type} cannot have one or more of these substats")
+        # If gear_type is provided
+        if gear_type is not None:
+            # Check if provided mainstat is allowed in provided gear_type
+            if mainstat_id is not None and not LOOKUPS['stat_bits'][mainstat_id] & LOOKUPS['masks'][gear_type]['mainstat']:
+                raise ValueError(f"{gear_type} cannot have {mainstat_id} as mainstat.")
+            # If substat_id's are provided, ensure that the substat_id's are
+            # in the allowed pool of substats for gear_type
+            if substat_ids is not None and get_stat_mask(substat_ids) & ~LOOKUPS['masks'][gear_type]['substat']:
+                raise ValueError(f"{gear_type} cannot have one or more of these substats")
+
+        # If gear_type is not provided, choose among the gear types that allow
+        # the mainstat and all of the substats
+        else:
+            feasible = get_feasible_gear_types(mainstat_id, substat_ids)
+            if not feasible:
+                raise ValueError("No gear type can have this combination of mainstat and substats.")
+            gear_type = get_random_gear_type(feasible, rng)
 
         return gear_type
     
     
-    def get_mainstat_id(self, mainstat_id=None, substat_ids=None, gear_type=None):
+    def get_mainstat_id(self, mainstat_id=None, substat_ids=None, gear_type=None, rng=random):
         """
         Get a mainstat_id based on provided substat_ids and gear_type.
         Gear_type cannot be none. If no substat_ids or mainstat_ids are provided, an appropriate random
@@ -199,6 +248,7 @@ class Gear():
             mainstat_id (int or st): valid mainstat id from range(0, 11)
             substat_ids (int/str or list of int/str): valid list of substat id(s) from range(0,11)
             gear_type (str): valid gear type from types.json: 'weapon', 'helm', 'armor', 'necklace', 'ring', or 'boots'
+            rng: random.Random instance or the random module (default: random)
         """
         # gear_type cannot be none for this function
         if gear_type is None:
@@ -208,15 +258,15 @@ class Gear():
             gear_type = validate_gear_type(gear_type)
 
         # Available pool of id's for given gear_type (convert to str)
-        mainstat_pool = convert_int_to_str(list(TYPES[gear_type]['mainstat']))
-        substats_pool = convert_int_to_str(list(TYPES[gear_type]['substat']))
+        mainstat_pool = list(LOOKUPS['pools'][gear_type]['mainstat'])
+        substats_pool = list(LOOKUPS['pools'][gear_type]['substat'])
 
         # If no substat_ids provided
         if substat_ids is None:
             # If no mainstat id provided
             if mainstat_id is None:
                 # Pick a random mainstat
-                mainstat_id = random.choice(mainstat_pool)
+                mainstat_id = rng.choice(mainstat_pool)
             # If mainstat id is provided
             else:
                 mainstat_id = validate_mainstat_id(mainstat_id)
@@ -232,12 +282,8 @@ class Gear():
                     "One or more of the substats cannot be added to this gear_type.")
             # If no mainstat id provided
             if mainstat_id is None:
-                # Pick a random mainstat
-                mainstat_id = random.choice(mainstat_pool)
-                # If randomly chosen mainstat is already in provided substats
-                # get a new random mainstat
-                while mainstat_id in substat_ids:
-                    mainstat_id = random.choice(mainstat_pool)
+                # Pick a random mainstat that is not in the provided substats
+                mainstat_id = self._get_mainstat_id(None, substat_ids, gear_type, rng)
             # If mainstat id is provided
             else:
                 mainstat_id = validate_mainstat_id(mainstat_id)
@@ -249,9 +295,21 @@ class Gear():
                         f"{gear_type} cannot have stat with id {mainstat_id}.")
 
         return mainstat_id    
+
+
+    def _get_mainstat_id(self, mainstat_id, substat_ids, gear_type, rng=random):
+        """
+        Trusted version of get_mainstat_id() for internal use: expects validated inputs, with
+        a gear_type that allows the mainstat (if provided) and the substats.
+        """
+        if mainstat_id is not None:
+            return mainstat_id
+
+        # Pick a random mainstat among the ones that are not in the substats
+        return _get_non_overlapping_stat_id(substat_ids or [], gear_type, 'mainstat', rng)
     
     
-    def get_substat_ids(self, mainstat_id=None, substat_ids=None, gear_type=None, gear_grade=None):
+    def get_substat_ids(self, mainstat_id=None, substat_ids=None, gear_type=None, gear_grade=None, rng=random):
         """
         Get substat_ids based on provided gear_type, gear_grade, mainstat_id, and potential other provided substat_ids.
         Gear_type, gear_grade, and mainstat_id cannot be none. Substat_id's are optional.
@@ -265,6 +323,7 @@ class Gear():
             substat_ids (int/str or list of int/str): valid list of substat id(s) from range(0,11)
             gear_type (str): valid gear type from types.json: 'weapon', 'helm', 'armor', 'necklace', 'ring', or 'boots'
             gear_grade (str): valid gear grade from grades.json: 'normal', 'good', 'rare', 'heroic', 'epic'
+            rng: random.Random instance or the random module (default: random)
         """
         # gear_type cannot be none for this function
         if gear_type is None:
@@ -290,8 +349,14 @@ class Gear():
         # Validate substat_ids:
         substat_ids = validate_substat_ids(substat_ids, mainstat_id, gear_type)
 
-        # Available pool of id's for given gear_type (convert to str)
-        substats_pool = convert_int_to_str(list(TYPES[gear_type]['substat']))
+        return self._get_substat_ids(mainstat_id, substat_ids, gear_type, gear_grade, rng)
+
+
+    def _get_substat_ids(self, mainstat_id, substat_ids, gear_type, gear_grade, rng=random):
+        """
+        Trusted version of get_substat_ids() for internal use: expects validated inputs.
+        """
+        substat_ids = list(substat_ids)
 
         # Number of starting substats allowed on gear
         starting_substats = GRADES[gear_grade]['starting_substats']
@@ -305,7 +370,7 @@ class Gear():
         # Add new non-overlapping substats until we have the appropriate number of 
         # starting substats
         for i in range(subs_remaining):
-            new_substat_id = get_non_overlapping_stat_id(gear_pool, gear_type=gear_type, stat_type='substat')
+            new_substat_id = _get_non_overlapping_stat_id(gear_pool, gear_type, 'substat', rng)
             substat_ids.append(new_substat_id)
             gear_pool.append(new_substat_id)
 
@@ -313,7 +378,7 @@ class Gear():
     
     
     def get_stat(self, stat_id=None, stat_type='mainstat', gear_type=None, gear_grade=None, 
-             gear_level=85, mod=False, rolled=None, mod_type='greater', show_reforged=False):
+             gear_level=85, mod=False, rolled=None, mod_type='greater', show_reforged=False, rng=random):
         """
         get_stat method for Gear() class to retrieve stat information based on given attributes. All attributes must be provided.
         
@@ -328,6 +393,7 @@ class Gear():
             rolled (int): number of times a stat has been rolled when enhancing (default: None = 0)
             mod_type (str): type of modification - 'greater' or 'lower' (default: 'greater')
             show_reforged (bool): whether to show the reforged value for formatted text (default: False)
+            rng: random.Random instance or the random module (default: random)
 
         """
         # Initialize an empty stat class object
@@ -336,9 +402,22 @@ class Gear():
         stat.get_stat_by_id(stat_id, stat_type, gear_type)
         # Parse the stat (get a specific value)
         stat.parse_stat(stat_type, gear_type, gear_grade, 
-                       gear_level, mod, rolled, mod_type)
-        # Get formatted text
-        stat.format_stat(show_reforged=show_reforged)
+                       gear_level, mod, rolled, mod_type, rng)
+        # Formatted text is made when it is first read
+        stat._clear_format(show_reforged)
+
+        return stat
+
+
+    def _get_stat(self, stat_id, stat_type, gear_type, gear_grade, gear_level=85, mod=False,
+                  rolled=0, mod_type='greater', show_reforged=False, rng=random):
+        """
+        Trusted version of get_stat() for internal use: expects validated inputs.
+        """
+        stat = Stat()
+        stat._set_stat_by_id(stat_id, stat_type, gear_type)
+        stat._parse_stat(gear_grade, gear_level, mod, rolled, mod_type, rng)
+        stat._clear_format(show_reforged)
 
         return stat
     
@@ -413,9 +492,14 @@ class Gear():
             print(f'GEAR SCORE: {gear_score[0]} ({gear_score[1]})')
             
             
-    def add_substat(self, verbose = False):
+    def add_substat(self, verbose = False, events = None, rng = random):
         """
         Adds a new substat to the gear that isn't already in the mainstat or substats.
+
+        Args:
+            verbose (bool): whether to print the substat that was added (default: False)
+            events (list): list to append an 'add' GearEvent to (default: None = no events)
+            rng: random.Random instance or the random module (default: random)
         """
         # Current number of substats on gear
         no_of_substats = len(self.substat_ids)
@@ -423,55 +507,70 @@ class Gear():
         if no_of_substats == 4:
             raise ValueError("Gear already has maximum number of allowed substats.")
 
-        # Available pool of id's for given gear_type (convert to str)
-        substats_pool = convert_int_to_str(list(TYPES[self.gear_type]['substat']))
-
         # Initialize gear pool list which will hold both mainstat and substat ids:
         gear_pool = self.substat_ids + [self.mainstat_id]
 
         # Get a new non-overlapping substat 
-        new_substat_id = get_non_overlapping_stat_id(gear_pool, gear_type=self.gear_type, stat_type='substat')
+        new_substat_id = _get_non_overlapping_stat_id(gear_pool, self.gear_type, 'substat', rng)
         self.substat_ids.append(new_substat_id)
-        new_substat = self.get_stat(new_substat_id, 'substat', self.gear_type, self.gear_grade,
-                                         self.gear_level)
+        new_substat = self._get_stat(new_substat_id, 'substat', self.gear_type, self.gear_grade,
+                                     self.gear_level, rng=rng)
         self.substats.append(new_substat)
 
+        if events is not None:
+            events.append(GearEvent('add', no_of_substats, new_substat_id, new_substat.value, 0, None))
+
         if verbose:
             print(f'New Substat Added: {new_substat.text_formatted}!')
 
         return self
     
     
-    def enhance_gear(self, verbose = False):
+    def enhance_gear(self, verbose = False, quiet = None, events = None, rng = random):
         """
         Method to enhance a gear.
+
+        Args:
+            verbose (bool): whether to print the substat that was added or increased (default: False)
+            quiet (bool): True to not print status messages (default: None = module setting, see set_quiet())
+            events (list): list to append GearEvents of the changes to (default: None = no events)
+            rng: random.Random instance or the random module (default: random)
         """
         # Current enhance level:
         enhance_level = self.enhance_level
 
         # Check if gear is already at max enhance level
         if enhance_level == 15:
-            print("Gear is already at maximum enhancement level!")
+            self._refuse('enhance', "Gear is already at maximum enhancement level!", quiet, events)
 
         else:
             # Enhance mainstat
-            self.mainstat.enhance_stat(enhance_level)
+            mainstat_value_before = self.mainstat.value
+            self.mainstat._enhance_stat(enhance_level, rng)
+            if events is not None:
+                events.append(GearEvent('enhance', None, self.mainstat_id,
+                                        self.mainstat.value - mainstat_value_before, None, None))
 
             # Enhance Substat Conditions
             # Rare Gear
             if self.gear_grade == 'rare' and (enhance_level == 8 or enhance_level == 11):
-                self.add_substat(verbose = verbose)
+                self.add_substat(verbose = verbose, events = events, rng = rng)
 
             elif self.gear_grade == 'heroic' and (enhance_level == 11):
-                self.add_substat(verbose = verbose)
+                self.add_substat(verbose = verbose, events = events, rng = rng)
 
             elif ((enhance_level + 1) % 3) == 0:  # Enhance only at 3 level increments
-                random_substat = random.choice(self.substats)
+                random_substat = rng.choice(self.substats)
                 random_substat_value_before = random_substat.value
                 # Enhance
-                random_substat.enhance_stat(enhance_level)
+                random_substat._enhance_stat(enhance_level, rng)
                 random_substat_value_after = random_substat.value            
 
+                if events is not None:
+                    events.append(GearEvent('roll', self.substats.index(random_substat), random_substat.stat_id,
+                                            random_substat_value_after - random_substat_value_before,
+                                            random_substat.rolled, None))
+
                 if verbose:
                     # Difference in value
                     enhanced_value = random_substat_value_after - random_substat_value_before
@@ -486,38 +585,49 @@ class Gear():
             self.enhance_level += 1
             # If gear is at +15
             if self.enhance_level == 15:
-                print("Gear has been fully enhanced to +15!")
+                self._report("Gear has been fully enhanced to +15!", quiet)
 
         return self
     
     
-    def reforge_gear(self):
+    def reforge_gear(self, quiet = None, events = None):
         """
         Reforges a Lv 85 gear into Lv 90. Only Lv 85 gear that has been fully enhanced to +15 may be reforged. 
         A gear may be reforged only once.
+
+        Args:
+            quiet (bool): True to not print status messages (default: None = module setting, see set_quiet())
+            events (list): list to append GearEvents of the changes to (default: None = no events)
         """
         # Check if gear is already reforged:
         if self.is_reforged:
-            print("Cannot reforge a gear that has already been reforged.")
+            self._refuse('reforge', "Cannot reforge a gear that has already been reforged.", quiet, events)
             return self
 
         # Check if gear is level 85 or not
         elif self.gear_level != 85:
-            print("Cannot reforge a gear that is not Level 85.")
+            self._refuse('reforge', "Cannot reforge a gear that is not Level 85.", quiet, events)
             return self
 
         # Check if gear hasn't been fully enhanced yet
         elif self.enhance_level < 15:
-            print("Cannot reforge a gear that has not been enhanced to +15 yet.")
+            self._refuse('reforge', "Cannot reforge a gear that has not been enhanced to +15 yet.", quiet, events)
             return self
 
         else:
             # Reforge mainstat
+            mainstat_value_before = self.mainstat.value
             self.mainstat.reforge_stat()
+            if events is not None:
+                events.append(GearEvent('reforge', None, self.mainstat_id,
+                                        self.mainstat.value - mainstat_value_before, None, None))
 
             # Reforge the substats
-            for i in self.substats:
+            for index, i in enumerate(self.substats):
+                value_before = i.value
                 i.reforge_stat()
+                if events is not None:
+                    events.append(GearEvent('reforge', index, i.stat_id, i.value - value_before, i.rolled, None))
 
             # Update reforged status
             self.is_reforged = True
@@ -525,26 +635,30 @@ class Gear():
             # Update gear level
             self.gear_level = 90
 
-            # Print confirmation
-            print("Gear has been reforged!")
+            # Report confirmation
+            self._report("Gear has been reforged!", quiet)
 
         return self
     
     
-    def modify_gear(self, stat_index=None, mod_stat_id=None, mod_type='greater'):
+    def modify_gear(self, stat_index=None, mod_stat_id=None, mod_type='greater', quiet=None, events=None,
+                    rng=random):
         """
         Method to modify an gear object.
         Args:
             stat_index (int): The index of the stat to be modified (1 to 4)
             mod_stat_id (int/str): valid stat id of the stat that will replace the stat on the gear
             mod_type (str): modification gem type, either 'greater' or 'lesser'
+            quiet (bool): True to not print status messages (default: None = module setting, see set_quiet())
+            events (list): list to append a GearEvent of the change to (default: None = no events)
+            rng: random.Random instance or the random module (default: random)
 
         Returns:
             gear
         """
         # Check if gear has been fully enhanced
         if self.enhance_level < 15:
-            print("Cannot modify a gear that has not been enhanced to +15 yet.")
+            self._refuse('modify', "Cannot modify a gear that has not been enhanced to +15 yet.", quiet, events)
             return self
 
         # Validate inputs
@@ -558,7 +672,8 @@ class Gear():
         # allowed on one substat per gear
         for i, substat in enumerate(self.substats):
             if i != stat_index and substat.modded:
-                print("Cannot modify substat when another substat has been modified already.")
+                self._refuse('modify', "Cannot modify substat when another substat has been modified already.",
+                             quiet, events, stat_index)
                 return self
 
         # Check if the provided mod_stat_id is in the valid pool of subs
@@ -569,33 +684,42 @@ class Gear():
         current_stats = self.substat_ids + [self.mainstat_id]
         if any(stat_id == mod_stat_id for i,
                stat_id in enumerate(current_stats) if i != stat_index):
-            print("Cannot add a substat that already exists on the gear.")
+            self._refuse('modify', "Cannot add a substat that already exists on the gear.", quiet, events,
+                         stat_index)
             return self
 
         rolled = self.substats[stat_index].rolled
-        new_stat = self.get_stat(stat_id=mod_stat_id, stat_type='substat', gear_type=self.gear_type, 
-                                 gear_grade=self.gear_grade, gear_level=self.gear_level, mod=True, 
-                                 rolled=rolled, mod_type=mod_type, show_reforged=not self.is_reforged)
+        new_stat = self._get_stat(mod_stat_id, 'substat', self.gear_type, self.gear_grade,
+                                  gear_level=self.gear_level, mod=True, rolled=rolled,
+                                  mod_type=mod_type, show_reforged=not self.is_reforged, rng=rng)
+        if events is not None:
+            events.append(GearEvent('modify', stat_index, mod_stat_id,
+                                    new_stat.value - self.substats[stat_index].value, rolled, None))
         # Replace old stat with modded:
         self.substats[stat_index] = new_stat
 
-        # Print confirmation
-        print("Gear has been modded with a new substat.")
+        # Report confirmation
+        self._report("Gear has been modded with a new substat.", quiet)
 
         return self
     
     
-    def enhance_gear_max(self):
+    def enhance_gear_max(self, quiet = None, events = None, rng = random):
         """
         Max enhance a gear to +15
+
+        Args:
+            quiet (bool): True to not print status messages (default: None = module setting, see set_quiet())
+            events (list): list to append GearEvents of the changes to (default: None = no events)
+            rng: random.Random instance or the random module (default: random)
         """
         if self.enhance_level != 0:
-            print("You can only use this method on +0 gear.")
+            self._refuse('enhance', "You can only use this method on +0 gear.", quiet, events)
 
             return self
 
         else:
             for i in range(15):
-                self.enhance_gear()
+                self.enhance_gear(quiet=quiet, events=events, rng=rng)
 
         return self
\ No newline at end of file
@@ -0,0 +1,386 @@
+import numpy as np
+from src.validation_utils import *
+from src.batch import get_tables
+
+# Columns indexed with a hash index: {column: {value: set of gear ids}}
+INDEXED_COLUMNS = ['gear_set', 'gear_type', 'mainstat_id']
+
+
+class Inventory():
+    """
+    Container of Gear objects for fast filter queries. The attributes that are queried are copied
+    into NumPy columns (one row per gear, the row number being the gear id), with:
+        - hash indexes on gear set, gear type and mainstat id, and on the presence of each substat
+        - a sorted index on gear score, for score ranges
+    so that a query intersects the index entries and only compares the columns of the matching
+    rows, instead of looping over Gear objects.
+
+    The columns are copied when a gear is added; call update() after changing a gear that is in
+    the inventory.
+    """
+
+    def __init__(self, capacity=1024):
+        """
+        Initializes an empty Inventory object.
+        Args:
+            capacity (int): number of rows allocated up front, grown as needed (default: 1024)
+            gears (list): Gear objects by gear id (None once removed)
+            gear_score (np.ndarray): gear score of each row
+            reforged_score (np.ndarray): gear score after reforge of each row
+            substat_values (np.ndarray): (rows x stats) values of the substats of each row (0 if absent)
+            alive (np.ndarray): False for rows of removed gears
+        """
+        self.gears = []
+        self.gear_score = np.zeros(capacity, dtype=np.int32)
+        self.reforged_score = np.zeros(capacity, dtype=np.int32)
+        self.substat_values = np.zeros((capacity, get_tables()['n_stats']), dtype=np.int32)
+        self.alive = np.zeros(capacity, dtype=bool)
+
+        self._indexes = {column: {} for column in INDEXED_COLUMNS}
+        self._substat_index = {}
+        # Gear ids sorted by gear score, and by the value of each substat ({stat: ids}), rebuilt
+        # when the columns changed since the last query
+        self._score_order = None
+        self._stat_orders = {}
+        self._size = 0
+
+
+    def __len__(self):
+        return self._size
+
+
+    def __str__(self):
+        """Str representation of class"""
+        return f"Inventory of {len(self)} gears"
+
+
+    def __iter__(self):
+        return (gear for gear in self.gears if gear is not None)
+
+
+    def _grow(self):
+        """Doubles the number of allocated rows."""
+        capacity = max(2 * len(self.alive), 1)
+        for name in ['gear_score', 'reforged_score', 'substat_values', 'alive']:
+            column = getattr(self, name)
+            grown = np.zeros((capacity,) + column.shape[1:], dtype=column.dtype)
+            grown[:len(column)] = column
+            setattr(self, name, grown)
+
+
+    def _index(self, gear_id, gear):
+        """Writes the columns and index entries of a gear."""
+        self.gear_score[gear_id], self.reforged_score[gear_id] = gear.get_gear_score()
+        self.substat_values[gear_id] = 0
+        for stat in gear.substats:
+            self.substat_values[gear_id, int(stat.stat_id)] = stat.value
+            self._substat_index.setdefault(stat.stat_id, set()).add(gear_id)
+        for column in INDEXED_COLUMNS:
+            self._indexes[column].setdefault(getattr(gear, column), set()).add(gear_id)
+        self._score_order = None
+        self._stat_orders = {}
+
+
+    def _unindex(self, gear_id):
+        """Removes the index entries of a gear."""
+        for ids in self._substat_index.values():
+            ids.discard(gear_id)
+        for column in INDEXED_COLUMNS:
+            for ids in self._indexes[column].values():
+                ids.discard(gear_id)
+        self._score_order = None
+        self._stat_orders = {}
+
+
+    def add(self, gear):
+        """
+        Adds a gear to the inventory.
+
+        Args:
+            gear (Gear): gear that has been created
+
+        Returns:
+            int: id of the gear in the inventory
+        """
+        if gear.mainstat is None:
+            raise ValueError("Cannot add a gear that has not been created.")
+
+        gear_id = len(self.gears)
+        if gear_id == len(self.alive):
+            self._grow()
+
+        self.gears.append(gear)
+        self.alive[gear_id] = True
+        self._index(gear_id, gear)
+        self._size += 1
+        return gear_id
+
+
+    def add_gears(self, gears):
+        """
+        Adds many gears to the inventory.
+
+        Args:
+            gears (iterable of Gear): gears that have been created
+
+        Returns:
+            list of int: ids of the gears in the inventory
+        """
+        return [self.add(gear) for gear in gears]
+
+
+    def get(self, gear_id):
+        """
+        Get a gear by its id.
+
+        Args:
+            gear_id (int): id returned by add()
+
+        Returns:
+            Gear
+        """
+        self._check_id(gear_id)
+        return self.gears[gear_id]
+
+
+    def remove(self, gear_id):
+        """
+        Removes a gear from the inventory. Ids of the other gears do not change.
+
+        Args:
+            gear_id (int): id returned by add()
+
+        Returns:
+            Gear: the removed gear
+        """
+        self._check_id(gear_id)
+        gear = self.gears[gear_id]
+        self._unindex(gear_id)
+        self.gears[gear_id] = None
+        self.alive[gear_id] = False
+        self._size -= 1
+        return gear
+
+
+    def update(self, gear_id):
+        """
+        Updates the columns and indexes of a gear after it was changed (enhanced, reforged, modified...).
+
+        Args:
+            gear_id (int): id returned by add()
+        """
+        self._check_id(gear_id)
+        gear = self.gears[gear_id]
+        self._unindex(gear_id)
+        self._index(gear_id, gear)
+
+
+    def _check_id(self, gear_id):
+        """Raises ValueError if no gear in the inventory has this id."""
+        if not isinstance(gear_id, (int, np.integer)) or not 0 <= gear_id < len(self.gears) \
+                or self.gears[gear_id] is None:
+            raise ValueError(f"No gear with id {gear_id} in the inventory.")
+
+
+    def _get_score_range(self, min_score=None, max_score=None):
+        """Ids of the gears with a gear score in the range, found with the sorted score index."""
+        if self._score_order is None:
+            ids = np.flatnonzero(self.alive[:len(self.gears)])
+            self._score_order = ids[np.argsort(self.gear_score[ids], kind='stable')]
+        scores = self.gear_score[self._score_order]
+        start = 0 if min_score is None else np.searchsorted(scores, min_score, side='left')
+        end = len(scores) if max_score is None else np.searchsorted(scores, max_score, side='right')
+        return self._score_order[start:end]
+
+
+    def filter_ids(self, gear_set=None, gear_type=None, mainstat_id=None, substats=None,
+                   min_score=None, max_score=None, min_reforged_score=None):
+        """
+        Get the ids of the gears matching all the given conditions (None = no condition).
+
+        Args:
+            gear_set (str): set of the gear
+            gear_type (str): type of the gear
+            mainstat_id (int or str): stat id of the mainstat
+            substats (dict): {stat_id (int or str): minimum value} of substats the gear must have,
+                e.g. {6: 12} for at least 12% crit chance (use a minimum of 0 to only require the substat)
+            min_score (int), max_score (int): range of gear score (see Gear.get_gear_score())
+            min_reforged_score (int): minimum gear score after reforge
+
+        Returns:
+            np.ndarray of gear ids, in increasing order
+        """
+        # Equality conditions, looked up in the hash indexes
+        candidates = []
+        if gear_set is not None:
+            candidates.append(self._indexes['gear_set'].get(validate_gear_set(gear_set), set()))
+        if gear_type is not None:
+            candidates.append(self._indexes['gear_type'].get(validate_gear_type(gear_type), set()))
+        if mainstat_id is not None:
+            candidates.append(self._indexes['mainstat_id'].get(validate_stat_id(mainstat_id), set()))
+
+        # Substats the gear must have
+        minimums = {}
+        for stat_id, minimum in (substats or {}).items():
+            stat_id = validate_stat_id(stat_id)
+            minimums[int(stat_id)] = minimum
+            candidates.append(self._substat_index.get(stat_id, set()))
+
+        if candidates:
+            candidates.sort(key=len)
+            ids = set(candidates[0]).intersection(*candidates[1:])
+            ids = np.fromiter(sorted(ids), dtype=np.int64, count=len(ids))
+            if min_score is not None:
+                ids = ids[self.gear_score[ids] >= min_score]
+            if max_score is not None:
+                ids = ids[self.gear_score[ids] <= max_score]
+        elif min_score is not None or max_score is not None:
+            ids = np.sort(self._get_score_range(min_score, max_score))
+        else:
+            ids = np.flatnonzero(self.alive[:len(self.gears)])
+
+        # Range conditions, compared on the columns of the remaining rows only
+        for stat, minimum in minimums.items():
+            ids = ids[self.substat_values[ids, stat] >= minimum]
+        if min_reforged_score is not None:
+            ids = ids[self.reforged_score[ids] >= min_reforged_score]
+
+        return ids
+
+
+    def filter(self, **conditions):
+        """
+        Get the gears matching all the given conditions, e.g. speed boots with at least 12% crit
+        chance and a gear score of at least 60:
+        `inventory.filter(gear_set='speed', gear_type='boots', substats={6: 12}, min_score=60)`
+
+        Args:
+            **conditions: see filter_ids()
+
+        Returns:
+            list of Gear
+        """
+        return [self.gears[i] for i in self.filter_ids(**conditions)]
+
+
+    def _get_stat_order(self, stat):
+        """Ids of all the gears sorted by decreasing value of a substat (0 if absent)."""
+        if stat not in self._stat_orders:
+            ids = np.flatnonzero(self.alive[:len(self.gears)])
+            self._stat_orders[stat] = ids[np.argsort(-self.substat_values[ids, stat], kind='stable')]
+        return self._stat_orders[stat]
+
+
+    def _get_weighted_scores(self, ids, stats, w):
+        """
+        Weighted sums of the substats of the given gears. The terms are always added in the order of
+        the weights, so that equal sums are equal floats whichever gears are scored together.
+        """
+        scores = np.zeros(len(ids))
+        for stat, weight in zip(stats, w):
+            scores += weight * self.substat_values[ids, stat]
+        return scores
+
+
+    def top_k_ids(self, weights, k=10, **conditions):
+        """
+        Get the ids of the k gears with the highest weighted sum of substats, sum(weight * value),
+        among the gears matching the conditions. With weights {stat_id: STATS[stat_id]['gscore']}
+        the score is the gear score (unrounded).
+
+        Instead of scoring every gear, the gears are read in blocks from the lists of gear ids sorted
+        by each weighted substat, best values first. The gears not read yet cannot score more than the
+        sum of the weighted values at the current position of the lists, so the search stops as soon
+        as the k-th best score found is above that bound (threshold algorithm). Every gear with a score
+        equal to the k-th best score has then been scored, so ties are broken by increasing id, as in
+        a full sort of all the gears. The terms of the scores are added in the order of the weights.
+
+        Args:
+            weights (dict): {stat_id (int or str): weight (int or float)}, weights can be negative
+            k (int): number of gears to return
+            **conditions: see filter_ids()
+
+        Returns:
+            tuple of two np.ndarray - gear ids and their scores, by decreasing score (ties by increasing id)
+        """
+        if not isinstance(k, int) or k < 1:
+            raise ValueError("k must be a positive int.")
+        columns = {}
+        for stat_id, weight in weights.items():
+            if not isinstance(weight, (int, float)):
+                raise ValueError(f"Weight of stat {stat_id} must be a number.")
+            if weight:
+                columns[int(validate_stat_id(stat_id))] = weight
+        stats = np.array(list(columns), dtype=np.int64)
+        w = np.array(list(columns.values()), dtype=np.float64)
+
+        allowed = self.alive[:len(self.gears)].copy()
+        if conditions:
+            allowed[:] = False
+            allowed[self.filter_ids(**conditions)] = True
+        n = int(allowed.sum())
+
+        # Few gears left to rank (or nothing to rank them by): score them all
+        if n <= 4 * k or not len(stats):
+            ids = np.flatnonzero(allowed)
+            scores = self._get_weighted_scores(ids, stats, w)
+            order = np.lexsort((ids, -scores))[:k]
+            return ids[order], scores[order]
+
+        # Lists of ids sorted by weighted value, best first (a negative weight reads the list backwards)
+        orders = [self._get_stat_order(s) if weight > 0 else self._get_stat_order(s)[::-1]
+                  for s, weight in zip(stats, w)]
+        total = len(orders[0])
+        seen = ~allowed
+        best_ids = np.zeros(0, dtype=np.int64)
+        best_scores = np.zeros(0, dtype=np.float64)
+        depth = 0
+        block = max(k, 256)
+        unseen = n
+        while depth < total:
+            end = min(depth + block, total)
+            if (end - depth) * len(stats) >= unseen:
+                # The next block would read about as many gears as are left: score them all and stop
+                ids = np.flatnonzero(~seen)
+                end = total
+            else:
+                ids = np.unique(np.concatenate([order[depth:end] for order in orders]))
+                ids = ids[~seen[ids]]
+            seen[ids] = True
+            unseen -= len(ids)
+            best_ids = np.concatenate([best_ids, ids])
+            best_scores = np.concatenate([best_scores, self._get_weighted_scores(ids, stats, w)])
+            keep = np.lexsort((best_ids, -best_scores))[:k]
+            best_ids, best_scores = best_ids[keep], best_scores[keep]
+            if end == total:
+                break
+
+            # Upper bound of the score of the gears not read yet, added up in the same order as the
+            # scores (float addition never decreases when a term increases, so the bound is exact)
+            threshold = 0.0
+            for s, weight, order in zip(stats, w, orders):
+                threshold += weight * self.substat_values[order[end - 1], s]
+            if len(best_ids) == k and best_scores[-1] > threshold:
+                break
+            depth = end
+            block *= 2
+
+        return best_ids, best_scores
+
+
+    def top_k(self, weights, k=10, **conditions):
+        """
+        Get the k gears with the highest weighted sum of substats, e.g. the 5 speed boots with the most
+        Speed and Crit Chance, Speed counting twice:
+        `inventory.top_k({10: 2, 6: 1}, 5, gear_set='speed', gear_type='boots')`
+
+        Args:
+            weights (dict): {stat_id (int or str): weight}
+            k (int): number of gears to return
+            **conditions: see filter_ids()
+
+        Returns:
+            list of (Gear, score) tuples, by decreasing score
+        """
+        ids, scores = self.top_k_ids(weights, k, **conditions)
+        return [(self.gears[i], score) for i, score in zip(ids.tolist(), scores.tolist())]
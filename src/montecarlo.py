@@ -0,0 +1,186 @@
+import os
+import random
+import multiprocessing
+from collections import Counter
+from src.gear import Gear
+from src.registry import STATS, load_all
+from src.rng import get_rng, spawn_seeds
+
+# Gear methods that can be used as steps of a recipe, with the arguments set by the runner
+STEPS = {
+    'enhance_gear': ['quiet', 'rng'],
+    'enhance_gear_max': ['quiet', 'rng'],
+    'add_substat': ['rng'],
+    'reforge_gear': ['quiet'],
+    'modify_gear': ['quiet', 'rng'],
+}
+
+# Default number of shards of simulate(). It does not depend on the machine, so that a seed gives
+# the same results everywhere
+DEFAULT_SHARDS = 16
+
+
+def validate_steps(steps=None):
+    """
+    Validates the steps of a recipe and returns them as (method name, kwargs) tuples.
+
+    Args:
+        steps (list): method names (str) or (method name, kwargs (dict)) tuples, e.g.
+            ['enhance_gear_max', 'reforge_gear', ('modify_gear', {'stat_index': 1, 'mod_stat_id': 10})]
+
+    Returns:
+        list of (str, dict)
+    """
+    validated = []
+    for step in steps or []:
+        if isinstance(step, str):
+            name, kwargs = step, {}
+        elif isinstance(step, (tuple, list)) and len(step) == 2 and isinstance(step[1], dict):
+            name, kwargs = step
+        else:
+            raise ValueError(f"Invalid step {step!r}, expected a method name or a (method name, kwargs) tuple.")
+
+        if name not in STEPS:
+            raise ValueError(f"Invalid step {name!r}, must be one of {list(STEPS)}.")
+        if 'rng' in kwargs or 'quiet' in kwargs:
+            raise ValueError("Steps cannot set 'rng' or 'quiet', these are set by the runner.")
+        validated.append((name, dict(kwargs)))
+
+    return validated
+
+
+def run_trials(trials, create_args=None, steps=None, rng=None):
+    """
+    Runs a recipe on `trials` new gears in this process and counts the results.
+
+    Args:
+        trials (int): number of gears to simulate
+        create_args (dict): arguments of Gear.create_gear() (default: None = random gears)
+        steps (list): steps applied to every gear after it is created (see validate_steps())
+        rng: random.Random instance, or a seed for get_rng() (default: None = fresh entropy)
+
+    Returns:
+        dict with keys -
+            'trials': number of gears simulated
+            'gear_score', 'reforged_score': {score: count} of the final gear scores before and
+                after reforge (see Gear.get_gear_score())
+            'substats': {stat_id (str): {value: count}} of the final substat values, where 0
+                counts the gears that do not have the substat
+    """
+    create_args = create_args or {}
+    steps = validate_steps(steps)
+    rng = get_rng(rng)
+
+    # Arguments added to the steps by the runner
+    runner_args = {'quiet': True, 'rng': rng}
+    steps = [(name, {**kwargs, **{arg: runner_args[arg] for arg in STEPS[name]}}) for name, kwargs in steps]
+
+    gear_score = Counter()
+    reforged_score = Counter()
+    substats = {stat_id: Counter() for stat_id in STATS.keys()}
+
+    for _ in range(trials):
+        gear = Gear().create_gear(**create_args, rng=rng)
+        for name, kwargs in steps:
+            getattr(gear, name)(**kwargs)
+
+        score, reforged = gear.get_gear_score()
+        gear_score[score] += 1
+        reforged_score[reforged] += 1
+        for stat in gear.substats:
+            substats[stat.stat_id][stat.value] += 1
+
+    # Gears without the substat
+    for stat_id, counts in substats.items():
+        absent = trials - sum(counts.values())
+        if absent:
+            counts[0] += absent
+
+    return {
+        'trials': trials,
+        'gear_score': gear_score,
+        'reforged_score': reforged_score,
+        'substats': substats,
+    }
+
+
+def _run_shard(args):
+    """Runs one shard of simulate() in a worker process."""
+    trials, create_args, steps, seed = args
+    return run_trials(trials, create_args, steps, seed)
+
+
+def merge_results(results):
+    """
+    Adds up the counts of several results of run_trials().
+
+    Args:
+        results (list of dict): results of run_trials()
+
+    Returns:
+        dict with the same keys as run_trials(), with counts as plain dicts sorted by value
+    """
+    merged = {'trials': 0, 'gear_score': Counter(), 'reforged_score': Counter(),
+              'substats': {stat_id: Counter() for stat_id in STATS.keys()}}
+    for result in results:
+        merged['trials'] += result['trials']
+        merged['gear_score'].update(result['gear_score'])
+        merged['reforged_score'].update(result['reforged_score'])
+        for stat_id, counts in result['substats'].items():
+            merged['substats'][stat_id].update(counts)
+
+    return {
+        'trials': merged['trials'],
+        'gear_score': dict(sorted(merged['gear_score'].items())),
+        'reforged_score': dict(sorted(merged['reforged_score'].items())),
+        'substats': {stat_id: dict(sorted(counts.items())) for stat_id, counts in merged['substats'].items()},
+    }
+
+
+def simulate(trials, create_args=None, steps=None, seed=None, processes=None, shards=None):
+    """
+    Monte Carlo simulation of a gear recipe: creates `trials` gears with Gear.create_gear(**create_args),
+    applies the steps to each of them, and counts the final gear scores and substat values.
+
+    The trials are split into shards, each with its own child seed of `seed` (see src/rng.py), and the
+    shards are run on a pool of worker processes. Each worker counts the results of its shard before
+    returning them, so only the counts are sent back. The same seed and number of shards always give
+    the same results, whatever the number of processes and the machine, and the global random state
+    is neither used nor changed.
+
+    Args:
+        trials (int): number of gears to simulate
+        create_args (dict): arguments of Gear.create_gear() (default: None = random gears)
+        steps (list): method names or (method name, kwargs) tuples of the Gear methods applied to every gear,
+            e.g. ['enhance_gear_max', 'reforge_gear'] (see validate_steps())
+        seed (int or np.random.SeedSequence): root seed (default: None = fresh entropy)
+        processes (int): number of worker processes (default: None = number of CPUs);
+            1 runs every shard in this process
+        shards (int): number of shards (default: None = DEFAULT_SHARDS), at most `trials`
+
+    Returns:
+        dict, see run_trials()
+    """
+    if not isinstance(trials, int) or trials < 0:
+        raise ValueError("Number of trials must be a non-negative int.")
+    steps = validate_steps(steps)
+    create_args = dict(create_args or {})
+    # Check the create_gear arguments once here rather than in every worker, with a generator of
+    # its own so that the global random state is left as it is
+    Gear().create_gear(**create_args, rng=random.Random(0))
+
+    processes = processes or os.cpu_count() or 1
+    shards = max(1, min(shards or DEFAULT_SHARDS, trials or 1))
+
+    seeds = spawn_seeds(seed, shards)
+    jobs = [(trials // shards + (i < trials % shards), create_args, steps, seeds[i]) for i in range(shards)]
+
+    if processes == 1 or shards == 1:
+        results = [_run_shard(job) for job in jobs]
+    else:
+        # Load the data once, so that forked workers share it
+        load_all()
+        with multiprocessing.Pool(min(processes, shards)) as pool:
+            results = pool.map(_run_shard, jobs)
+
+    return merge_results(results)
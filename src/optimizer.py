@@ -0,0 +1,218 @@
+import numpy as np
+from src.validation_utils import *
+from src.registry import SETS
+from src.batch import get_tables
+
+
+def validate_set_requirements(sets=None):
+    """
+    Validates the set requirements of a build.
+
+    Args:
+        sets (dict): {gear_set (str): number of pieces}, e.g. {'speed': 4, 'critical': 2}; the number of
+            pieces must be a multiple of the pieces required by the set bonus (items_req in sets.json)
+
+    Returns:
+        dict: {gear_set (str): number of pieces}
+    """
+    validated = {}
+    for gear_set, pieces in (sets or {}).items():
+        if gear_set is None:
+            raise ValueError("Gear set must be a str and one of the values from sets.json")
+        gear_set = validate_gear_set(gear_set)
+        items_req = SETS[gear_set]['items_req']
+        if not isinstance(pieces, int) or pieces < 1 or pieces % items_req:
+            raise ValueError(f"Number of {gear_set} pieces must be a positive multiple of {items_req}.")
+        validated[gear_set] = validated.get(gear_set, 0) + pieces
+
+    if sum(validated.values()) > len(TYPES):
+        raise ValueError(f"Set requirements cannot add up to more than {len(TYPES)} pieces.")
+    return validated
+
+
+def get_gear_stats(inventory, gear_ids):
+    """
+    Get the total stat values of gears in an inventory: the substat values, plus the mainstat value.
+
+    Args:
+        inventory (Inventory): inventory holding the gears
+        gear_ids (np.ndarray): gear ids
+
+    Returns:
+        np.ndarray: (gears x stats) stat values
+    """
+    values = inventory.substat_values[gear_ids].astype(np.float64)
+    for row, gear_id in enumerate(gear_ids.tolist()):
+        mainstat = inventory.gears[gear_id].mainstat
+        values[row, int(mainstat.stat_id)] += mainstat.value
+    return values
+
+
+def _get_pareto_front(values):
+    """
+    Rows of `values` that are not dominated by another row (at least as high in every column, and
+    higher in one column or earlier). Rows must be sorted by decreasing first column.
+    """
+    front = []
+    for row in range(len(values)):
+        if not front or not np.any(np.all(values[front] >= values[row], axis=1)):
+            front.append(row)
+    return front
+
+
+def optimize_build(inventory, weights, sets=None, floors=None, mainstats=None, max_nodes=None, gap=0):
+    """
+    Picks one gear of each gear type (weapon, helm, armor, necklace, ring, boots) from an inventory,
+    to maximize a weighted sum of the stats of the build, sum(weight * total stat value), where the
+    total stat values add up the mainstats and substats of the 6 gears. Set bonuses are only used as
+    constraints, they are not added to the stats (they depend on the base stats of the hero).
+
+    The search is a depth-first branch and bound:
+        - in each gear type and gear set (sets that are not required are grouped together), gears that
+          are beaten by another gear on the score and on every stat with a floor are dropped
+        - gear types are searched from the fewest to the most gears, and the gears of a type from the
+          highest to the lowest score
+        - a branch is cut when its score plus the best scores of the gear types left cannot beat the best
+          build found yet (by more than `gap`), or when the stat floors or set requirements can no
+          longer be met
+
+    Args:
+        inventory (Inventory): inventory holding the gears (see src/inventory.py)
+        weights (dict): {stat_id (int or str): weight (int or float)}
+        sets (dict): {gear_set (str): minimum number of pieces}, e.g. {'speed': 4, 'critical': 2}
+            (default: None = any sets)
+        floors (dict): {stat_id (int or str): minimum total value of the build}, e.g. {10: 40}
+            (default: None = no floors)
+        mainstats (dict): {gear_type (str): mainstat id (int or str)}, e.g. {'boots': 10}
+            (default: None = any mainstats)
+        max_nodes (int): stop the search after trying this many gears and return the best build found so far
+            (default: None = search until the best build is found)
+        gap (float): also cut the branches that cannot beat the best build found yet by more than this
+            fraction of its score, e.g. 0.01 returns a build within 1% of the best score, faster
+            (default: 0 = exact)
+
+    Returns:
+        dict with keys -
+            'gear_ids': {gear_type: gear id} of the best build, or None if no build meets the constraints
+            'gears': {gear_type: Gear} of the best build, or None
+            'score': weighted sum of the stats of the best build, or None
+            'stats': {stat_id (str): total value} of the best build, or None
+            'nodes': number of gears tried during the search
+            'complete': False if the search was stopped by max_nodes
+    """
+    sets = validate_set_requirements(sets)
+    stat_weights = {}
+    for stat_id, weight in weights.items():
+        if not isinstance(weight, (int, float)):
+            raise ValueError(f"Weight of stat {stat_id} must be a number.")
+        stat_weights[int(validate_stat_id(stat_id))] = weight
+    floors = {int(validate_stat_id(stat_id)): minimum for stat_id, minimum in (floors or {}).items()}
+    mainstats = {validate_gear_type(gear_type): validate_stat_id(stat_id)
+                 for gear_type, stat_id in (mainstats or {}).items()}
+    if max_nodes is not None and (not isinstance(max_nodes, int) or max_nodes < 1):
+        raise ValueError("max_nodes must be a positive int.")
+    if not isinstance(gap, (int, float)) or gap < 0:
+        raise ValueError("gap must be a non-negative number.")
+
+    w = np.zeros(get_tables()['n_stats'])
+    for stat, weight in stat_weights.items():
+        w[stat] = weight
+    floor_stats = list(floors)
+    floor_values = [floors[stat] for stat in floor_stats]
+    required_sets = list(sets)
+    required_pieces = [sets[gear_set] for gear_set in required_sets]
+
+    # Candidates of each gear type: (score, floor stat values, index of the required set or -1, gear id)
+    slots = []
+    for gear_type in TYPES.keys():
+        conditions = {'gear_type': gear_type}
+        if gear_type in mainstats:
+            conditions['mainstat_id'] = mainstats[gear_type]
+        ids = inventory.filter_ids(**conditions)
+        values = get_gear_stats(inventory, ids)
+        scores = values @ w
+        groups = np.array([required_sets.index(inventory.gears[i].gear_set)
+                           if inventory.gears[i].gear_set in sets else -1 for i in ids.tolist()], dtype=np.int64)
+        if sum(required_pieces) == len(TYPES):
+            # Every piece must belong to a required set
+            keep = groups >= 0
+            ids, values, scores, groups = ids[keep], values[keep], scores[keep], groups[keep]
+
+        candidates = []
+        for group in np.unique(groups).tolist():
+            rows = np.flatnonzero(groups == group)
+            rows = rows[np.lexsort((ids[rows], -scores[rows]))]
+            columns = np.column_stack([scores[rows], values[rows][:, floor_stats]])
+            candidates += [(float(scores[rows[i]]), tuple(values[rows[i], floor_stats].tolist()), group, int(ids[rows[i]]))
+                           for i in _get_pareto_front(columns)]
+        candidates.sort(key=lambda candidate: (-candidate[0], candidate[3]))
+        slots.append((gear_type, candidates))
+
+    result = {'gear_ids': None, 'gears': None, 'score': None, 'stats': None, 'nodes': 0, 'complete': True}
+    if any(not candidates for _, candidates in slots):
+        return result
+    slots.sort(key=lambda slot: len(slot[1]))
+    n_slots = len(slots)
+
+    # Best score and best value of each floor stat, over the gear types left after each depth
+    best_left = [0.0] * (n_slots + 1)
+    floor_left = [[0.0] * len(floor_stats) for _ in range(n_slots + 1)]
+    # Number of gear types left after each depth with gears of each required set
+    sets_left = [[0] * len(required_sets) for _ in range(n_slots + 1)]
+    for depth in range(n_slots - 1, -1, -1):
+        candidates = slots[depth][1]
+        best_left[depth] = best_left[depth + 1] + candidates[0][0]
+        floor_left[depth] = [floor_left[depth + 1][f] + max(c[1][f] for c in candidates)
+                             for f in range(len(floor_stats))]
+        sets_left[depth] = [sets_left[depth + 1][s] + any(c[2] == s for c in candidates)
+                            for s in range(len(required_sets))]
+
+    best = {'score': -np.inf, 'build': None, 'cutoff': 0}
+    build = [None] * n_slots
+    pieces = [0] * len(required_sets)
+
+    def search(depth, score, totals):
+        """Tries every gear of the gear type at `depth`, given the gears picked before."""
+        slots_left = n_slots - depth
+        # Set requirements that can no longer be met
+        missing = [max(0, required_pieces[s] - pieces[s]) for s in range(len(required_sets))]
+        if sum(missing) > slots_left:
+            return
+        if any(missing[s] > sets_left[depth][s] for s in range(len(required_sets))):
+            return
+        if depth == n_slots:
+            if score > best['score']:
+                best['score'], best['build'] = score, list(build)
+                best['cutoff'] = gap * abs(score)
+            return
+
+        for candidate_score, candidate_floors, group, gear_id in slots[depth][1]:
+            # Candidates are sorted by score, so no later candidate can beat the best build either
+            if score + candidate_score + best_left[depth + 1] <= best['score'] + best['cutoff']:
+                return
+            if max_nodes is not None and result['nodes'] >= max_nodes:
+                result['complete'] = False
+                return
+            result['nodes'] += 1
+
+            new_totals = [totals[f] + candidate_floors[f] for f in range(len(floor_stats))]
+            if any(new_totals[f] + floor_left[depth + 1][f] < floor_values[f] for f in range(len(floor_stats))):
+                continue
+            build[depth] = gear_id
+            if group >= 0:
+                pieces[group] += 1
+            search(depth + 1, score + candidate_score, new_totals)
+            if group >= 0:
+                pieces[group] -= 1
+
+    search(0, 0.0, [0.0] * len(floor_stats))
+
+    if best['build'] is not None:
+        gear_ids = {slots[depth][0]: best['build'][depth] for depth in range(n_slots)}
+        gear_ids = {gear_type: gear_ids[gear_type] for gear_type in TYPES.keys()}
+        totals = get_gear_stats(inventory, np.array(list(gear_ids.values()), dtype=np.int64)).sum(axis=0)
+        result['gear_ids'] = gear_ids
+        result['gears'] = {gear_type: inventory.gears[gear_id] for gear_type, gear_id in gear_ids.items()}
+        result['score'] = float(totals @ w)
+        result['stats'] = {str(stat): float(value) for stat, value in enumerate(totals.tolist()) if value}
+    return result
@@ -0,0 +1,331 @@
+import json
+import os
+import pickle
+from collections.abc import Mapping
+
+# Environment variable that may point to an alternate data folder
+DATA_DIR_ENV = 'E7_DATA_DIR'
+
+# Data folder shipped with the package (/data next to /src)
+PACKAGE_DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data')
+
+# Folder holding the json tables and the compiled snapshot (a relative E7_DATA_DIR is resolved once,
+# against the working directory at import)
+DATA_DIR = os.path.abspath(os.environ.get(DATA_DIR_ENV) or PACKAGE_DATA_DIR)
+
+# Name and format version of the compiled snapshot written by the prep_data scripts
+SNAPSHOT_FILE = 'data.pickle'
+SNAPSHOT_VERSION = 2
+
+# Whether we already tried to load the snapshot
+_snapshot_checked = False
+
+# Functions called by reset(), to drop caches built from the loaded data (see on_reset())
+_reset_callbacks = []
+
+
+class DataTable(Mapping):
+    """
+    Read-only view of one of the json tables stored in the /data folder.
+    The table is only loaded the first time it is accessed, and the loaded data is then
+    shared by every module that imports the table. If an up to date compiled snapshot is
+    available all tables are filled from it at once, otherwise the json file is parsed.
+    """
+
+    def __init__(self, name):
+        """
+        Initializes the DataTable object.
+        Args:
+            name (str): name of the json file in the /data folder, without extension
+        """
+        self.name = name
+        self._data = None
+
+    def load(self):
+        """
+        Loads the table if it has not been loaded yet.
+
+        Returns:
+            dict: the loaded table
+        """
+        if self._data is None:
+            _load_snapshot()
+        if self._data is None:
+            self._data = self._parse()
+        return self._data
+
+    def _parse(self):
+        """Parses the json file of the table."""
+        with open(os.path.join(DATA_DIR, f'{self.name}.json'), 'r') as json_file:
+            return json.load(json_file)
+
+    def __getitem__(self, key):
+        data = self._data
+        if data is None:
+            data = self.load()
+        return data[key]
+
+    def __contains__(self, key):
+        data = self._data
+        if data is None:
+            data = self.load()
+        return key in data
+
+    def __iter__(self):
+        return iter(self.load())
+
+    def __len__(self):
+        return len(self.load())
+
+    def keys(self):
+        return self.load().keys()
+
+    def values(self):
+        return self.load().values()
+
+    def items(self):
+        return self.load().items()
+
+    def __repr__(self):
+        state = 'loaded' if self._data is not None else 'not loaded'
+        return f"<DataTable '{self.name}' ({state})>"
+
+
+class LookupTable(DataTable):
+    """
+    Lookup structures derived from the json tables (see build_lookups()).
+    They are stored in the compiled snapshot, or built from the tables otherwise.
+    """
+
+    def _parse(self):
+        return build_lookups(TABLES)
+
+
+# Shared game data tables
+TYPES = DataTable('types')
+SETS = DataTable('sets')
+TIERS = DataTable('tiers')
+GRADES = DataTable('grades')
+STATS = DataTable('stats')
+
+TABLES = {
+    'TYPES': TYPES,
+    'SETS': SETS,
+    'TIERS': TIERS,
+    'GRADES': GRADES,
+    'STATS': STATS,
+}
+
+# Derived lookup structures
+LOOKUPS = LookupTable('lookups')
+
+
+def build_lookups(tables):
+    """
+    Builds the lookup structures that are derived from the data tables.
+
+    Args:
+        tables (dict): maps table names ('TYPES', 'STATS', ...) to the parsed tables
+
+    Returns:
+        dict with keys -
+            'tier_by_level': maps each gear level to its gear tier
+            'pools': maps each gear type to its 'mainstat' and 'substat' pools of stat ids (as str)
+            'stat_bits': maps each stat id (as str) to its bit (1 << stat id)
+            'masks': maps each gear type to the bitmasks of its 'mainstat' and 'substat' pools, so
+                that checking stats against a pool is a single bitwise AND
+            'allowed_substats': maps each gear type and each of its mainstat ids to the bitmask of
+                the substats allowed next to that mainstat
+    """
+    tier_by_level = {}
+    for tier in tables['TIERS'].values():
+        for level in tier['level_range']:
+            tier_by_level[level] = tier['gear_tier']
+
+    pools = {}
+    for gear_type, type_data in tables['TYPES'].items():
+        pools[gear_type] = {
+            stat_type: [str(stat_id) for stat_id in type_data[stat_type]]
+            for stat_type in ['mainstat', 'substat']}
+
+    stat_bits = {str(stat_id): 1 << int(stat_id) for stat_id in tables['STATS'].keys()}
+
+    masks = {}
+    allowed_substats = {}
+    for gear_type, type_pools in pools.items():
+        masks[gear_type] = {stat_type: sum(stat_bits[s] for s in pool)
+                            for stat_type, pool in type_pools.items()}
+        allowed_substats[gear_type] = {s: masks[gear_type]['substat'] & ~stat_bits[s]
+                                       for s in type_pools['mainstat']}
+
+    return {
+        'tier_by_level': tier_by_level,
+        'pools': pools,
+        'stat_bits': stat_bits,
+        'masks': masks,
+        'allowed_substats': allowed_substats,
+    }
+
+
+def _json_files(data_dir):
+    """Paths of the json files of every table."""
+    return [os.path.join(data_dir, f'{table.name}.json') for table in TABLES.values()]
+
+
+def _load_snapshot():
+    """
+    Fills every table that has not been loaded yet from the compiled snapshot, if the snapshot
+    exists and is newer than all the json files. A snapshot that cannot be read (corrupt, or written
+    by another version of the code) is rebuilt from the json files and rewritten. This is only
+    attempted once.
+
+    Returns:
+        bool: whether the tables were filled from a snapshot
+    """
+    global _snapshot_checked
+
+    if _snapshot_checked:
+        return False
+    _snapshot_checked = True
+
+    snapshot_path = os.path.join(DATA_DIR, SNAPSHOT_FILE)
+    try:
+        snapshot_mtime = os.path.getmtime(snapshot_path)
+    except OSError:
+        return False
+
+    # Ignore the snapshot if any of the json files has been edited since it was compiled
+    for path in _json_files(DATA_DIR):
+        try:
+            if os.path.getmtime(path) > snapshot_mtime:
+                return False
+        except OSError:
+            pass
+
+    try:
+        with open(snapshot_path, 'rb') as snapshot_file:
+            snapshot = pickle.load(snapshot_file)
+        if snapshot['version'] != SNAPSHOT_VERSION:
+            raise ValueError(f"Snapshot version {snapshot['version']} is not {SNAPSHOT_VERSION}.")
+        tables = {name: snapshot['tables'][name] for name in TABLES}
+        lookups = snapshot['lookups']
+    except Exception:
+        # Unpickling a damaged or outdated snapshot can raise almost any error
+        try:
+            snapshot = _build_snapshot(DATA_DIR)
+        except (OSError, ValueError):
+            return False
+        try:
+            _write_snapshot(DATA_DIR, snapshot)
+        except OSError:
+            pass
+        tables, lookups = snapshot['tables'], snapshot['lookups']
+
+    for name, table in TABLES.items():
+        if table._data is None:
+            table._data = tables[name]
+    if LOOKUPS._data is None:
+        LOOKUPS._data = lookups
+
+    return True
+
+
+def _build_snapshot(data_dir):
+    """Parses the json files of a data folder into the snapshot written by write_snapshot()."""
+    tables = {}
+    for name, table in TABLES.items():
+        with open(os.path.join(data_dir, f'{table.name}.json'), 'r') as json_file:
+            tables[name] = json.load(json_file)
+
+    return {
+        'version': SNAPSHOT_VERSION,
+        'tables': tables,
+        'lookups': build_lookups(tables),
+    }
+
+
+def _write_snapshot(data_dir, snapshot):
+    """Writes a snapshot from _build_snapshot() into a data folder, and returns its path."""
+    snapshot_path = os.path.join(data_dir, SNAPSHOT_FILE)
+    with open(snapshot_path, 'wb') as snapshot_file:
+        pickle.dump(snapshot, snapshot_file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    return snapshot_path
+
+
+def write_snapshot(data_dir=None):
+    """
+    Parses the json files and writes them, along with the lookup structures built from them,
+    into a single compiled snapshot file in the data folder.
+
+    Args:
+        data_dir (str): folder holding the json files (default: DATA_DIR)
+
+    Returns:
+        str: path of the written snapshot
+    """
+    if data_dir is None:
+        data_dir = DATA_DIR
+
+    return _write_snapshot(data_dir, _build_snapshot(data_dir))
+
+
+def set_data_dir(data_dir=None):
+    """
+    Points the registry at another data folder. Any data already loaded is dropped, so the
+    tables are loaded from the new folder the next time they are accessed.
+
+    Args:
+        data_dir (str): folder holding the json files (default: None, which restores the
+            E7_DATA_DIR environment variable if set, or else the package data folder)
+    """
+    global DATA_DIR
+
+    if data_dir is None:
+        data_dir = os.environ.get(DATA_DIR_ENV) or PACKAGE_DATA_DIR
+    data_dir = os.path.abspath(data_dir)
+    if not os.path.isdir(data_dir):
+        raise ValueError(f"Data folder '{data_dir}' does not exist.")
+
+    DATA_DIR = data_dir
+    reset()
+
+
+def reset():
+    """
+    Forgets all loaded data, so that the next access loads the tables again.
+    """
+    global _snapshot_checked
+
+    _snapshot_checked = False
+    for table in TABLES.values():
+        table._data = None
+    LOOKUPS._data = None
+    for callback in _reset_callbacks:
+        callback()
+
+
+def on_reset(callback):
+    """
+    Registers a function to call whenever the loaded data is dropped by reset() or set_data_dir(),
+    so that structures built from the data can be cleared without checking the data on every use.
+
+    Args:
+        callback (function): function called without arguments
+    """
+    _reset_callbacks.append(callback)
+
+
+def load_all(data_dir=None):
+    """
+    Loads every table up front, e.g. before forking worker processes so that
+    the loaded data is shared by all of them.
+
+    Args:
+        data_dir (str): optional data folder to load from (see set_data_dir())
+    """
+    if data_dir is not None:
+        set_data_dir(data_dir)
+    for table in TABLES.values():
+        table.load()
+    LOOKUPS.load()
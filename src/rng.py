@@ -0,0 +1,73 @@
+import random
+import numpy as np
+
+# Every function that draws random values (Gear.create_gear(), Gear.enhance_gear(), the
+# utilities, ...) takes an `rng` argument: a random.Random instance, or the random module itself
+# by default. GearBatch methods take a NumPy generator or seed instead. The functions below make
+# both kinds of generators from one seed, and split a seed into independent streams (one per
+# worker, shard or gear) with NumPy's SeedSequence, so that parallel runs are reproducible.
+
+
+def spawn_seeds(seed=None, n=1):
+    """
+    Splits a seed into n independent child seeds. The same seed always gives the same children,
+    and the streams made from different children do not overlap.
+
+    Args:
+        seed (int or np.random.SeedSequence): root seed (default: None = fresh entropy)
+        n (int): number of child seeds
+
+    Returns:
+        list of np.random.SeedSequence
+    """
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    return seed.spawn(n)
+
+
+def get_rng(seed=None):
+    """
+    Get a random.Random generator to pass as `rng` to the Gear methods and utilities.
+
+    Args:
+        seed (int, np.random.SeedSequence, random.Random, or None): an int or SeedSequence seeds a
+            new generator, a random.Random instance (or the random module) is returned as is, and
+            None gives a generator seeded with fresh entropy
+
+    Returns:
+        random.Random
+    """
+    if isinstance(seed, random.Random) or seed is random:
+        return seed
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    # Seed the Mersenne Twister with 256 bits from the seed sequence
+    state = seed.generate_state(4, dtype=np.uint64)
+    return random.Random(sum(int(word) << (64 * i) for i, word in enumerate(state)))
+
+
+def get_np_rng(seed=None):
+    """
+    Get a NumPy generator to pass as `rng` to the GearBatch methods.
+
+    Args:
+        seed (int, np.random.SeedSequence, np.random.Generator, or None): seed or generator
+
+    Returns:
+        np.random.Generator
+    """
+    return np.random.default_rng(seed)
+
+
+def spawn_rngs(seed=None, n=1):
+    """
+    Get n independent, reproducible random.Random generators from one seed.
+
+    Args:
+        seed (int or np.random.SeedSequence): root seed (default: None = fresh entropy)
+        n (int): number of generators
+
+    Returns:
+        list of random.Random
+    """
+    return [get_rng(child) for child in spawn_seeds(seed, n)]
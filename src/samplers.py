@@ -0,0 +1,158 @@
+import random
+import numpy as np
+from src.registry import STATS, TIERS, on_reset
+
+# Cached alias tables built from stats.json (see get_alias_tables()). The dict is filled in place,
+# and emptied when the registry drops its data
+_alias_tables = {}
+
+
+class AliasTable():
+    """
+    Samples values with given rates in constant time, using the alias method (Vose's version of
+    Walker's method). The table is built once, and every draw then takes a single random number,
+    instead of the cumulative rates that random.choices() rebuilds on every call.
+    """
+
+    def __init__(self, values, rates):
+        """
+        Builds the AliasTable object.
+        Args:
+            values (list): values to sample
+            rates (list of float): rates of the values (they do not need to add up to 1)
+        """
+        if len(values) == 0 or len(values) != len(rates):
+            raise ValueError("Values and rates must be non-empty lists of the same length.")
+        total = float(sum(rates))
+        if total <= 0 or any(rate < 0 for rate in rates):
+            raise ValueError("Rates cannot be negative or all zero.")
+
+        n = len(values)
+        self.values = list(values)
+        self.size = n
+        # Chance of keeping column i, otherwise its alias is returned
+        self.prob = [1.0] * n
+        self.alias = list(range(n))
+
+        # Rates scaled so that the average column holds 1
+        scaled = [rate * n / total for rate in rates]
+        small = [i for i, p in enumerate(scaled) if p < 1]
+        large = [i for i, p in enumerate(scaled) if p >= 1]
+
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            self.prob[s] = scaled[s]
+            self.alias[s] = l
+            # The large column gives away what fills up the small column
+            scaled[l] = (scaled[l] + scaled[s]) - 1
+            if scaled[l] < 1:
+                small.append(l)
+            else:
+                large.append(l)
+
+        # Columns left over are full up to rounding errors
+        for i in small + large:
+            self.prob[i] = 1.0
+
+        # Arrays of the table for sample_array()
+        self._prob_array = np.array(self.prob)
+        self._alias_array = np.array(self.alias, dtype=np.int64)
+        self._values_array = np.array(self.values)
+
+
+    def __len__(self):
+        return self.size
+
+
+    def sample(self, rng=random):
+        """
+        Draws one value.
+
+        Args:
+            rng: random.Random instance or the random module (default: random)
+
+        Returns:
+            one of the values
+        """
+        u = rng.random() * self.size
+        i = min(int(u), self.size - 1)
+        if u - i < self.prob[i]:
+            return self.values[i]
+        return self.values[self.alias[i]]
+
+
+    def sample_array(self, size, rng=None):
+        """
+        Draws many values at once with NumPy.
+
+        Args:
+            size (int or tuple): shape of the returned array
+            rng (np.random.Generator or int): random generator or seed (default: None)
+
+        Returns:
+            np.ndarray of values
+        """
+        rng = np.random.default_rng(rng)
+        u = rng.random(size) * self.size
+        i = np.minimum(u.astype(np.int64), self.size - 1)
+        keep = (u - i) < self._prob_array[i]
+        index = np.where(keep, i, self._alias_array[i])
+        return self._values_array[index]
+
+
+def get_alias_tables():
+    """
+    Returns an AliasTable for every stat value with random rates in stats.json, keyed by
+    (stat_id, stat_type, gear_grade, gear_tier). The tables are built once, and rebuilt only
+    after the registry drops its data. The same dict is always returned.
+
+    Returns:
+        dict: {(stat_id (str), stat_type (str), gear_grade (str), gear_tier (int)): AliasTable}
+    """
+    if _alias_tables:
+        return _alias_tables
+
+    tiers = sorted(tier['gear_tier'] for tier in TIERS.values())
+    tables = {}
+    for stat_id, stat in STATS.items():
+        for stat_type, var in stat['vars'].items():
+            if var['type'] != 'rand':
+                continue
+            for gear_grade in var['values']:
+                for t, gear_tier in enumerate(tiers):
+                    tables[(stat_id, stat_type, gear_grade, gear_tier)] = AliasTable(
+                        var['values'][gear_grade][t], var['rates'][gear_grade][t])
+
+    _alias_tables.update(tables)
+    return _alias_tables
+
+
+def _clear_alias_tables():
+    """Empties the cached alias tables, called when the registry drops its data."""
+    _alias_tables.clear()
+
+
+on_reset(_clear_alias_tables)
+
+
+def get_alias_table(stat_id, stat_type, gear_grade, gear_tier):
+    """
+    Get the AliasTable of a stat value with random rates. This is called on every random stat
+    value, so the cached table is looked up directly, and the tables are only checked and built
+    when it is missing.
+
+    Args:
+        stat_id (str): valid stat id
+        stat_type (str): 'mainstat' or 'substat'
+        gear_grade (str): grade of the gear
+        gear_tier (int): tier of the gear (5, 6, 7)
+
+    Returns:
+        AliasTable
+    """
+    key = (stat_id, stat_type, gear_grade, gear_tier)
+    table = _alias_tables.get(key)
+    if table is None:
+        table = get_alias_tables()[key]
+    return table
@@ -1,24 +1,82 @@
-import json
 import random
 from src.validation_utils import *
 from src.utilities import *
+from src.registry import STATS, TYPES, GRADES, TIERS, LOOKUPS, on_reset
+from src.utilities import _get_stat_value, _get_mod_value, _get_reforge_increase
 
-# Import Data 
-STATS = json.loads(open('data/stats.json', 'r').read())
-TYPES = json.loads(open('data/types.json', 'r').read())
-GRADES = json.loads(open('data/grades.json', 'r').read())
-TIERS = json.loads(open('data/tiers.json', 'r').read())
+# Multiplier on the base mainstat value after each enhance level (+1 to +15)
+MAINSTAT_MULTIPLIERS = [1.2, 1.4, 1.6, 1.8, 2, 2.2, 2.4, 2.6, 2.8, 3, 3.3, 3.6, 3.9, 4.25, 5]
+
+
+# Cached StatInfo objects shared by all stats (see get_stat_info()), emptied when the registry
+# drops its data
+_stat_infos = {}
+
+
+class StatInfo:
+    """
+    Static data of a stat from stats.json, shared by every Stat object with the same stat id and
+    stat type (flyweight), so that the strings are not stored on each stat.
+    """
+
+    __slots__ = ('stat_id', 'stat_type', 'stat_key', 'text', 'value_key', 'gscore')
+
+    def __init__(self, stat_id, stat_type):
+        """
+        Initializes the StatInfo object.
+        Args:
+            stat_id (str): valid stat id
+            stat_type (str): 'mainstat' or 'substat'
+        """
+        stat = STATS[stat_id]
+        self.stat_id = stat_id
+        self.stat_type = stat_type
+        self.stat_key = str(stat['key_stat'])
+        self.text = stat['text']
+        self.value_key = stat['vars'][stat_type]['key']
+        self.gscore = stat['gscore']
+
+    def __repr__(self):
+        return f"StatInfo({self.stat_id!r}, {self.stat_type!r})"
+
+
+def get_stat_info(stat_id, stat_type):
+    """
+    Get the shared StatInfo of a stat, built once per stat id and stat type.
+
+    Args:
+        stat_id (str): valid stat id
+        stat_type (str): 'mainstat' or 'substat'
+
+    Returns:
+        StatInfo
+    """
+    info = _stat_infos.get((stat_id, stat_type))
+    if info is None:
+        info = _stat_infos[(stat_id, stat_type)] = StatInfo(stat_id, stat_type)
+    return info
+
+
+def _clear_stat_infos():
+    """Empties the cached StatInfo objects, called when the registry drops its data."""
+    _stat_infos.clear()
+
+
+on_reset(_clear_stat_infos)
 
 
 class Stat:
     """A class to represent the statistics that are added to a gear."""
 
+    __slots__ = ('stat_id', 'stat_type', 'gear_type', 'gear_grade', 'gear_level', 'gear_tier',
+                 'rolled', 'reforge_increase', 'value', 'modded', 'info', '_text_formatted', '_show_reforged')
+
     def __init__(self):
         """
         Initializes the Stat object.
         Args:
             stat_id (int or str): The id of the stat to retrieve (refer to STATS.json for id).
-            stat_key (str): The name of the stat
+            stat_key (str): The name of the stat (read from the shared StatInfo)
             stat_type (str): The type of stat - 'mainstat' or 'substat only'.
             gear_type (str): The type of gear - 'weapon', 'helm', 'armor', 'necklace',
                     'ring', or 'boots' only. (default: None)
@@ -27,14 +85,15 @@ class Stat:
             gear_tier (int): The tier of the gear (5, 6, 7)
             rolled (int): value between 0 and 5; how many times a stat rolled when enhancing
             reforge_increase (int) : The value by which a stat increases when reforging
-            text (str): Text description of the stat
-            value_key (str): The value key which is replaced in the text
+            text (str): Text description of the stat (read from the shared StatInfo)
+            value_key (str): The value key which is replaced in the text (read from the shared StatInfo)
             modded (bool): Boolean specifying whether the gear has been modded or not
-            text_formatted (str): Formatted text showing concise description of the stat
+            text_formatted (str): Formatted text showing concise description of the stat (formatted
+                when first read, and cached until the stat changes)
+            info (StatInfo): shared static data of the stat, set once the stat is parsed
 
         """
         self.stat_id = None
-        self.stat_key = None
         self.stat_type = 'mainstat'
         self.gear_type = None
         self.gear_grade = None
@@ -42,11 +101,54 @@ class Stat:
         self.gear_tier = None
         self.rolled = 0
         self.reforge_increase = None
-        self.text = None
         self.value = None
-        self.value_key = None
         self.modded = False
-        self.text_formatted = None
+        self.info = None
+        self._text_formatted = None
+        self._show_reforged = False
+
+
+    @property
+    def stat_key(self):
+        """Name of the stat"""
+        if self.stat_id is None:
+            return None
+        return get_stat_info(self.stat_id, self.stat_type).stat_key
+
+
+    @property
+    def text(self):
+        """Text description of the stat"""
+        return self.info.text if self.info is not None else None
+
+
+    @property
+    def value_key(self):
+        """The value key which is replaced in the text"""
+        return self.info.value_key if self.info is not None else None
+
+
+    @property
+    def text_formatted(self):
+        """Formatted text showing concise description of the stat, formatted on first read"""
+        if self._text_formatted is None and self.info is not None:
+            self.format_stat(show_reforged=self._show_reforged)
+        return self._text_formatted
+
+
+    @text_formatted.setter
+    def text_formatted(self, text):
+        self._text_formatted = text
+
+
+    def _clear_format(self, show_reforged=False):
+        """
+        Drops the cached formatted text after the stat has changed, so that it is formatted
+        again (with or without the reforged value) the next time it is read.
+        """
+        self._text_formatted = None
+        self._show_reforged = show_reforged
+
         
     def __str__(self):
         """Str representation of class"""
@@ -66,6 +168,21 @@ class Stat:
             f"Modded: {self.modded}\n"
             f"Formatted Text: {self.text_formatted}"
         )
+
+
+
+    def clone(self):
+        """
+        Returns a copy of the stat. All attributes are immutable values or shared StatInfo
+        objects, so copying the slots is enough and is much faster than copy.deepcopy().
+
+        Returns:
+            Stat
+        """
+        stat = Stat.__new__(Stat)
+        for attr in Stat.__slots__:
+            setattr(stat, attr, getattr(self, attr))
+        return stat
         
 
     def get_stat_by_id(self, stat_id, stat_type=None, gear_type=None):
@@ -86,7 +203,6 @@ class Stat:
             if str(stat_data['id']) == stat_id:
                 # Store the selected_stat_id value
                 self.stat_id = stat_id
-                self.stat_key = str(stat_data['key_stat'])
                 
                 # Assign class attributes if values are provided
                 if stat_type is not None:
@@ -100,8 +216,21 @@ class Stat:
         # Raise a ValueError if the provided ID doesn't match any stat
         raise ValueError(f"No stat found with ID {stat_id}")
 
+
+    def _set_stat_by_id(self, stat_id, stat_type, gear_type=None):
+        """
+        Trusted version of get_stat_by_id() for internal use: expects a valid stat id (str)
+        and stat type, and a gear type that allows the stat.
+        """
+        self.stat_id = stat_id
+        self.stat_type = stat_type
+        if gear_type is not None:
+            self.gear_type = gear_type
+
+        return STATS[stat_id]
+
     
-    def get_random_stat(self, stat_type='mainstat', gear_type=None):
+    def get_random_stat(self, stat_type='mainstat', gear_type=None, rng=random):
         """
         Retrieves data on a random stat chosen from the pool of available
         mainstats or substats from given gear_type.
@@ -110,6 +239,7 @@ class Stat:
             stat_type (str): The type of stat - 'mainstat' or 'substat only'.
             gear_type (str): The type of gear - 'weapon', 'helm', 'armor', 'necklace',
                 'ring', or 'boots' only.
+            rng: random.Random instance or the random module (default: random)
 
         Returns:
             dict: Stat data
@@ -135,11 +265,10 @@ class Stat:
             return None
 
         # Choose a random ID from the pool and fetch the associated stat
-        random_stat = self.get_stat_by_id(stat_id=random.choice(pool))
+        random_stat = self.get_stat_by_id(stat_id=rng.choice(pool))
 
         # Set the class attribute
         self.stat_id = str(random_stat['id'])
-        self.stat_key = str(random_stat['key_stat'])
         self.stat_type = stat_type
         self.gear_type = gear_type
 
@@ -147,7 +276,7 @@ class Stat:
 
 
     def get_non_overlapping_stat(
-        self, selected_stats=[], stat_type='substat', gear_type=None):
+        self, selected_stats=[], stat_type='substat', gear_type=None, rng=random):
         """
         Retrieves a new stat that is not already in the selected list of stats.
 
@@ -157,6 +286,7 @@ class Stat:
                 (in almost every case it will be 'substat' for this function, hence default)
             gear_type (str): The type of gear - 'weapon', 'helm', 'armor', 'necklace',
                     'ring', or 'boots' only. (default: None)
+            rng: random.Random instance or the random module (default: random)
 
         Returns:
             dict: Stat data
@@ -167,18 +297,14 @@ class Stat:
         stat_type = validate_stat_type(stat_type)
         gear_type = validate_gear_type(gear_type)
 
-        # Get a random stat
-        random_stat = self.get_random_stat(stat_type, gear_type)
-
-        # If the stat we got in the previous line exists in our selected stats,
-        # get a new random stat
-        while any(random_stat['id'] == int(a) for a in selected_stats):
-            # Get a new random stat as long as above condition is True
-            random_stat = self.get_random_stat(stat_type, gear_type)
+        # Draw a stat directly from the stats that are not selected yet
+        available = get_available_stat_ids(selected_stats, gear_type, stat_type)
+        if not available:
+            raise ValueError("No stat is left that is not already in the selected stats.")
+        random_stat = self.get_stat_by_id(stat_id=rng.choice(available))
 
         # Set the selected_stat_id attribute
         self.stat_id = str(random_stat['id'])
-        self.stat_key = str(random_stat['key_stat'])
         self.stat_type = stat_type
         self.gear_type = gear_type
 
@@ -205,7 +331,7 @@ class Stat:
         
 
     def parse_stat(self, stat_type=None, gear_type=None, gear_grade=None, 
-                   gear_level=85, mod=False, rolled=None, mod_type='greater'):
+                   gear_level=85, mod=False, rolled=None, mod_type='greater', rng=random):
         """
         Parses a stat based on its type ('substat' or 'mainstat') and given gear grade and level.
         Also checks whether modification is being applied and parses the appropriate mod value based on rolled count.
@@ -219,6 +345,7 @@ class Stat:
             mod (bool): boolean specifying whether this is a modded stat or not (default: False)
             rolled (int): number of times a stat has been rolled when enhancing (default: None = 0)
             mod_type (str): type of modification - 'greater' or 'lower' (default: 'greater')
+            rng: random.Random instance or the random module (default: random)
 
         Returns:
             dict: parsed Stat data
@@ -236,41 +363,42 @@ class Stat:
         if stat_type is not None:
             self.stat_type = validate_stat_type(stat_type, mod = mod, rolled = rolled)
             
-        # Get the corresponding stat from stats dict based on id
-        stat = STATS[self.stat_id]
-        
-        # Validate inputs and assign attributes:
-        self.text = stat['text']
-        self.gear_grade = validate_gear_grade(gear_grade)
-        self.gear_level = validate_gear_level(gear_level)
-        self.gear_tier = get_gear_tier(gear_level)
-        self.rolled = validate_rolled(rolled, self.stat_type)
+        # Validate inputs
+        gear_grade = validate_gear_grade(gear_grade)
+        gear_level = validate_gear_level(gear_level)
+        rolled = validate_rolled(rolled, self.stat_type)
         mod = validate_mod(mod, self.stat_type)
         mod_type = validate_mod_type(mod_type)
 
+        return self._parse_stat(gear_grade, gear_level, mod, rolled, mod_type, rng)
+
+
+    def _parse_stat(self, gear_grade, gear_level, mod=False, rolled=0, mod_type='greater', rng=random):
+        """
+        Trusted version of parse_stat() for internal use: expects validated inputs, with
+        stat_type and gear_type already set on the stat.
+        """
+        # Assign attributes, with the static data of the stat from the shared StatInfo
+        self.info = get_stat_info(self.stat_id, self.stat_type)
+        self.gear_grade = gear_grade
+        self.gear_level = gear_level
+        self.gear_tier = LOOKUPS['tier_by_level'][gear_level]
+        self.rolled = rolled
+
         # Parse modified stat
         if mod:
             self.modded = True
-            value = get_mod_value(
-                self.stat_id,
-                self.gear_level,
-                self.rolled,
-                mod_type)
+            value = _get_mod_value(self.stat_id, self.gear_level, self.rolled, mod_type, rng)
         # Parse non-modified stat
         else:
-            value = get_stat_value(
-                self.stat_id,
-                self.stat_type,
-                self.gear_level,
-                self.gear_grade)
+            value = _get_stat_value(self.stat_id, self.stat_type, self.gear_tier, self.gear_grade, rng)
 
         # Assign Parsed attributes
         self.value = value
-        self.value_key = stat['vars'][self.stat_type]['key']
 
         # Reforge increase value
-        self.reforge_increase = get_reforge_increase(
-            self.stat_id, self.stat_type, self.rolled)
+        self.reforge_increase = _get_reforge_increase(self.stat_id, self.stat_type, self.rolled)
+        self._clear_format(self._show_reforged)
 
         return self
     
@@ -309,19 +437,21 @@ class Stat:
         if self.modded:
             text = text + ' (modded)'
         
-        # Assign attribute
-        self.text_formatted = text
+        # Cache the formatted text
+        self._text_formatted = text
+        self._show_reforged = show_reforged
 
         # Return the formatted text representation of the parsed stat
         return text
     
     
-    def enhance_stat(self, enhance_level=0):
+    def enhance_stat(self, enhance_level=0, rng=random):
         """
         Method to enhance a stat.
 
         Args:
             enhance_level (int) : Current level of enhancement on the gear
+            rng: random.Random instance or the random module (default: random)
 
         Returns:
             self
@@ -329,55 +459,44 @@ class Stat:
         # Validate inputs
         enhance_level = validate_enhance_level(enhance_level)
 
+        return self._enhance_stat(enhance_level, rng)
+
+
+    def _enhance_stat(self, enhance_level, rng=random):
+        """
+        Trusted version of enhance_stat() for internal use: expects a validated enhance level.
+        """
         # Get stat attributes
         stat_type = self.stat_type
         stat_id = self.stat_id
-        gear_level = self.gear_level
-        gear_tier = get_gear_tier(gear_level)
+        gear_tier = LOOKUPS['tier_by_level'][self.gear_level]
         gear_grade = self.gear_grade
         
         # Enhancement for mainstat
         if stat_type == 'mainstat':
-            mainstat_multiplier = [
-                1.2,
-                1.4,
-                1.6,
-                1.8,
-                2,
-                2.2,
-                2.4,
-                2.6,
-                2.8,
-                3,
-                3.3,
-                3.6,
-                3.9,
-                4.25,
-                5]
             # Get the base value at enhance level 0
-            base_value = get_stat_value(stat_id, 'mainstat', gear_level, gear_grade)
+            base_value = _get_stat_value(stat_id, 'mainstat', gear_tier, gear_grade, rng)
             # Get enhanced value at new enhance level
-            enhanced_value = round(base_value * mainstat_multiplier[enhance_level])
+            enhanced_value = round(base_value * MAINSTAT_MULTIPLIERS[enhance_level])
 
             # Assign the new value
             self.value = enhanced_value
-            # Update formatted text
-            self.format_stat()
+            # Formatted text is updated when it is next read
+            self._clear_format()
 
         # Enhancement for substat
         else:
             # Get an enhanced stat value
-            enhanced_value = get_stat_value(stat_id, 'substat', gear_level, gear_grade)
+            enhanced_value = _get_stat_value(stat_id, 'substat', gear_tier, gear_grade, rng)
 
             # Add the enhanced value to current value:
             self.value += enhanced_value
             # Update rolled count:
             self.rolled += 1
             # Update reforge increase value
-            self.reforge_increase = get_reforge_increase(
-                stat_id, stat_type, self.rolled)
-            # Update formatted text
-            self.format_stat()
+            self.reforge_increase = _get_reforge_increase(stat_id, stat_type, self.rolled)
+            # Formatted text is updated when it is next read
+            self._clear_format()
 
         return self
     
@@ -398,5 +517,7 @@ class Stat:
 
         # Update the value
         self.value = reforged_value
+        # The reforged value is now the value of the stat
+        self._clear_format()
 
         return self
\ No newline at end of file
@@ -0,0 +1,59 @@
+import itertools
+import numpy as np
+from src.gear import Gear
+from src.batch import GearBatch
+from src.rng import get_rng
+
+
+def iter_gears(create_args=None, seed=None, count=None):
+    """
+    Yields new gears one at a time, created with Gear.create_gear(**create_args), without
+    keeping them in memory.
+
+    Args:
+        create_args (dict): arguments of Gear.create_gear() (default: None = random gears)
+        seed (int, np.random.SeedSequence or random.Random): seed of the stream (see get_rng() in
+            src/rng.py); the same seed always yields the same gears (default: None = fresh entropy)
+        count (int): number of gears to yield (default: None = no limit)
+
+    Yields:
+        Gear
+    """
+    create_args = dict(create_args or {})
+    rng = get_rng(seed)
+    counter = itertools.count() if count is None else range(count)
+    for _ in counter:
+        yield Gear().create_gear(**create_args, rng=rng)
+
+
+def iter_batches(chunk_size, create_args=None, seed=None, count=None):
+    """
+    Yields new gears in GearBatch chunks of `chunk_size` gears, created with
+    GearBatch.create(chunk_size, **create_args), so that only one chunk is in memory at a time.
+    Each chunk is drawn with its own child seed of `seed`, so the stream is reproducible.
+
+    Args:
+        chunk_size (int): number of gears per chunk
+        create_args (dict): arguments of GearBatch.create() / Gear.create_gear() (default: None = random gears)
+        seed (int or np.random.SeedSequence): seed of the stream (default: None = fresh entropy)
+        count (int): total number of gears to yield, the last chunk holding the remainder
+            (default: None = no limit)
+
+    Yields:
+        GearBatch
+    """
+    if not isinstance(chunk_size, int) or chunk_size < 1:
+        raise ValueError("Chunk size must be a positive int.")
+    create_args = dict(create_args or {})
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    # Spawn the chunk seeds from a copy, so that the seed passed in is left as it is
+    seed = np.random.SeedSequence(seed.entropy, spawn_key=seed.spawn_key,
+                                  n_children_spawned=seed.n_children_spawned)
+
+    remaining = count
+    while remaining is None or remaining > 0:
+        size = chunk_size if remaining is None else min(chunk_size, remaining)
+        yield GearBatch.create(size, **create_args, rng=seed.spawn(1)[0])
+        if remaining is not None:
+            remaining -= size
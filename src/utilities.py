@@ -1,33 +1,44 @@
-import json
 import random
-
-with open('data/types.json', 'r') as types_file:
-    TYPES = json.load(types_file)
-with open('data/sets.json', 'r') as sets_file:
-    SETS = json.load(sets_file)
-with open('data/tiers.json', 'r') as tiers_file:
-    TIERS = json.load(tiers_file)
-with open('data/grades.json', 'r') as grades_file:
-    GRADES = json.load(grades_file)
-with open('data/stats.json', 'r') as stats_file:
-    STATS = json.load(stats_file)
+from src.registry import TYPES, SETS, TIERS, GRADES, STATS, LOOKUPS
+from src.samplers import get_alias_table
     
-def get_random_grade():
+def get_random_grade(gear_grades=None, rng=random):
     """
     Returns a random gear grade ('rare', 'heroic', 'epic')
     Rates of choosing a particular grade can be edited in prep_data_GRADES.py
     
+    Args:
+        gear_grades (list of str): grades to choose from, with their rates (default: None, all grades)
+        rng: random.Random instance or the random module (default: random)
+
     Returns:
         str 
     """
-    grade = random.choices(
-        list(
-            GRADES.keys()),
-        weights=[
-            grade['weight'] for grade in GRADES.values()])[0]
+    if gear_grades is None:
+        gear_grades = list(GRADES.keys())
+
+    weights = [GRADES[g]['weight'] for g in gear_grades]
+    if not gear_grades or sum(weights) <= 0:
+        raise ValueError("No gear grade can be chosen from the given grades.")
+
+    grade = rng.choices(gear_grades, weights=weights)[0]
     return grade    
 
 
+def get_feasible_grades(no_of_subs=0):
+    """
+    Get the gear grades that can be chosen at random and can start with the given number of substats.
+
+    Args:
+        no_of_subs (int): number of starting substats provided (default: 0)
+
+    Returns:
+        list of gear grades (str)
+    """
+    return [g for g, grade in GRADES.items()
+            if grade['weight'] > 0 and grade['starting_substats'] >= no_of_subs]
+
+
 def get_gear_tier(gear_level):
     """
     Gets gear tier based on provided gear level. 
@@ -46,18 +57,49 @@ def get_gear_tier(gear_level):
     # Validate gear level
     gear_level = validate_gear_level(gear_level)
     
-    # Loop through tiers dictionary
-    for t in TIERS:  
-        # Check if the level is in the level range in each section
-        if gear_level in TIERS[t]['level_range']:
-            # If the level matches, then return that tier value
-            tier = TIERS[t]['gear_tier']
+    # Look up the tier of the level
+    tier = LOOKUPS['tier_by_level'][gear_level]
             
     return tier
 
 
+# The underscore functions below are the trusted versions of the public functions: they expect
+# inputs that have already been validated (stat ids as str, lower case names, levels in range)
+# and skip validation, so that validated inputs are not checked again in internal call chains.
+
+def _get_stat_value(stat_id, stat_type, gear_tier, gear_grade, rng=random):
+    """Trusted version of get_stat_value(), taking the gear tier instead of the gear level."""
+    var = STATS[stat_id]['vars'][stat_type]
+    if var['type'] == 'rand':
+        return get_alias_table(stat_id, stat_type, gear_grade, gear_tier).sample(rng)
+    return var['values'][gear_grade][gear_tier - 5]
+
+
+def _get_mod_value(stat_id, gear_level, rolled, mod_type, rng=random):
+    """Trusted version of get_mod_value()."""
+    values = STATS[stat_id]['mod_vals'][mod_type]
+    if gear_level <= 88:
+        return rng.choice(values[0][rolled])
+    elif gear_level == 90:
+        return rng.choice(values[1][rolled])
+    raise ValueError("Invalid gear level, cannot modify.")
+
+
+def _get_reforge_increase(stat_id, stat_type, rolled):
+    """Trusted version of get_reforge_increase()."""
+    return STATS[stat_id]['reforge'][stat_type][rolled]
+
+
+def _get_non_overlapping_stat_id(selected_stats, gear_type, stat_type='substat', rng=random):
+    """Trusted version of get_non_overlapping_stat_id()."""
+    available = get_available_stat_ids(selected_stats, gear_type, stat_type)
+    if not available:
+        raise ValueError("No stat is left that is not already in the selected stats.")
+    return rng.choice(available)
+
+
 def get_mod_value(stat_id, gear_level=85, 
-                  rolled=None, mod_type='greater'):
+                  rolled=None, mod_type='greater', rng=random):
     """
     Get the modification value of a stat based on its gear_level, rolled count, and mod_type.
     It chooses a random value from a range of values for the given criteria.
@@ -66,6 +108,7 @@ def get_mod_value(stat_id, gear_level=85,
         gear_level (int): level of gear, between 58 and 100 (default = 85)
         rolled (int): number of times a gear has been rolled when enhancing (default: None = 0)
         mod_type (str): type of modification stone used - 'greater' or 'lesser' (default: 'greater')
+        rng: random.Random instance or the random module (default: random)
 
     Returns:
         int : modified stat value
@@ -81,29 +124,13 @@ def get_mod_value(stat_id, gear_level=85,
     rolled = validate_rolled(rolled)
     mod_type = validate_mod_type(mod_type)
     
-    # Get the stat info
-    stat = STATS[stat_id]
-    # Get the appropriate mod value ranges
-    values = stat['mod_vals'][mod_type]
-
-    # If gear level is <= 88, use the first index values
-    if gear_level <= 88:
-        values_88 = values[0][rolled]
-        value = random.choice(values_88)
-
-    # For reforged items with gear level = 90
-    elif gear_level == 90:
-        values_90 = values[1][rolled]
-        value = random.choice(values_90)
-
-    else:
-        raise ValueError("Invalid gear level, cannot modify.")
-
-    return value
+    # Values for gear level <= 88 are in the first index, for reforged items with
+    # gear level = 90 in the second index
+    return _get_mod_value(stat_id, gear_level, rolled, mod_type, rng)
 
 
 def get_stat_value(stat_id, stat_type='mainstat',
-                   gear_level=85, gear_grade=None):
+                   gear_level=85, gear_grade=None, rng=random):
     """
     Get the value of a stat based on its stat_id, stat_type, gear_level, and gear_grade.
     It chooses a random value from a range of values for the given criteria.
@@ -111,6 +138,7 @@ def get_stat_value(stat_id, stat_type='mainstat',
         stat_id: valid stat_id of stat
         gear_level (int): level of gear, between 58 and 100 (default = 85)
         gear_grade (str): grade of gear
+        rng: random.Random instance or the random module (default: random)
 
     Returns:
         int : parsed stat value
@@ -125,27 +153,12 @@ def get_stat_value(stat_id, stat_type='mainstat',
     gear_level = validate_gear_level(gear_level)
     gear_grade = validate_gear_grade(gear_grade)
 
-    # Get gear tier (-5 to get proper index)
-    gear_tier = get_gear_tier(gear_level)
-
-    # Access information from the stat object
-    var = STATS[stat_id]['vars'][stat_type]
-    # Get value type
-    type_ = var['type']
-    # Get the value(s)
-    values = var['values'][gear_grade][gear_tier - 5]
-
-    # rand for substats usually
-    if type_ == 'rand':
-        # Corresponding Rates
-        rates = var['rates'][gear_grade][gear_tier - 5]
-        # Get a value based on the rates
-        value = random.choices(values, rates)[0]
-    # fixed for mainstats usually
-    elif type_ == 'fixed':
-        value = values
+    # Get gear tier
+    gear_tier = LOOKUPS['tier_by_level'][gear_level]
 
-    return value
+    # Random value from the rates for substats usually (precomputed alias table of the stat),
+    # fixed value for mainstats usually
+    return _get_stat_value(stat_id, stat_type, gear_tier, gear_grade, rng)
 
 
 def get_reforge_increase(stat_id, stat_type, rolled):
@@ -167,20 +180,21 @@ def get_reforge_increase(stat_id, stat_type, rolled):
     rolled = validate_rolled(rolled)
     
     # Get reforge_increase value
-    reforge_increase = STATS[stat_id]['reforge'][stat_type][rolled]
-    
-    return reforge_increase
+    return _get_reforge_increase(stat_id, stat_type, rolled)
 
 
-def get_random_set():
+def get_random_set(rng=random):
     """
     Returns a random gear set from sets.json
     Rates of choosing a particular grade can be edited in prep_data_GRADES.py
+
+    Args:
+        rng: random.Random instance or the random module (default: random)
     
     Returns:
         str 
     """
-    gear_set = random.choice(list(SETS.keys()))
+    gear_set = rng.choice(list(SETS.keys()))
                         
     return gear_set    
 
@@ -220,24 +234,59 @@ def convert_int_to_str(obj):
             "Invalid input type. Expected int, str, or list of integers/strings.")
         
         
-def get_random_gear_type():
+def get_random_gear_type(gear_types=None, rng=random):
     """
     Returns a random gear type ('weapon', 'helm', 'armor', 'necklace', 'ring', 'boots')
     
+    Args:
+        gear_types (list of str): gear types to choose from (default: None, all gear types)
+        rng: random.Random instance or the random module (default: random)
+
     Returns:
         str 
     """
-    gear_type = random.choice(list(TYPES.keys()))
+    if gear_types is None:
+        gear_types = list(TYPES.keys())
+
+    if not gear_types:
+        raise ValueError("No gear type can be chosen from the given gear types.")
+
+    gear_type = rng.choice(gear_types)
                               
     return gear_type    
+
+
+def get_feasible_gear_types(mainstat_id=None, substat_ids=None):
+    """
+    Get the gear types that allow the given mainstat and all the given substats.
+    Expects validated inputs.
+
+    Args:
+        mainstat_id (str): stat id of the mainstat (default: None, any mainstat)
+        substat_ids (list of str): stat id's of the substats (default: None, any substats)
+
+    Returns:
+        list of gear types (str)
+    """
+    masks = LOOKUPS['masks']
+    mainstat_mask = get_stat_mask([mainstat_id] if mainstat_id is not None else [])
+    substat_mask = get_stat_mask(substat_ids or [])
+    return [t for t in TYPES.keys()
+            if not mainstat_mask & ~masks[t]['mainstat'] and not substat_mask & ~masks[t]['substat']]
         
     
-def get_gear_type_from_subs(gear_type=None, substat_ids=None):
+def get_gear_type_from_subs(gear_type=None, substat_ids=None, rng=random):
     """
     Retrieves a gear type based on given substat_id's restriction.
     Gets a random gear type and if substat_ids is None or an empty list, returns the random gear_type.
-    If substat_id's are provided, it keeps rolling new gear_type until the provided id's are all in the 
-    pool of allowed substats for that gear type.
+    If substat_id's are provided, the provided gear_type is kept if it allows all of them, otherwise
+    a random gear type is chosen among the ones that allow them. Raises ValueError if no gear type
+    allows all of the substats.
+
+    Args:
+        gear_type (str): type of gear (default: None)
+        substat_ids (list of int or str): substat id's (default: None)
+        rng: random.Random instance or the random module (default: random)
     """
     from src.validation_utils import validate_gear_type, validate_substat_ids
 
@@ -245,31 +294,31 @@ def get_gear_type_from_subs(gear_type=None, substat_ids=None):
     gear_type = validate_gear_type(gear_type)
     substat_ids = validate_substat_ids(substat_ids)
 
-    # Get a random gear type if none provided
-    if gear_type is None:
-        gear_type = get_random_gear_type()
-
     if substat_ids is not None and substat_ids != []:
-        # Get the pool of allowed substats for the gear type
-        valid_substats = convert_int_to_str(TYPES[gear_type]['substat'])
+        # Keep the provided gear type if it allows all the substats
+        if gear_type is not None and not get_stat_mask(substat_ids) & ~LOOKUPS['masks'][gear_type]['substat']:
+            return gear_type
 
-        # loop to check if all the id's in the substat_ids list are
-        # present in the valid_substats list.
-        while not all(
-                substat_id in valid_substats for substat_id in substat_ids):
-            gear_type = get_random_gear_type()
-            valid_substats = convert_int_to_str(TYPES[gear_type]['substat'])
+        feasible = get_feasible_gear_types(substat_ids=substat_ids)
+        if not feasible:
+            raise ValueError("No gear type can have all of these substats.")
+        gear_type = get_random_gear_type(feasible, rng)
+
+    # Get a random gear type if none provided
+    elif gear_type is None:
+        gear_type = get_random_gear_type(rng=rng)
 
     return gear_type
 
 
-def get_random_stat_id(gear_type=None, stat_type='substat'):
+def get_random_stat_id(gear_type=None, stat_type='substat', rng=random):
     """
     Get a random stat_id from available pool of stat_ids based on gear_type.
     
     Args:
         gear_type (str): type of gear - 'weapon', 'helm', 'armor', 'necklace', 'ring', 'boots'
         stat_type (str): 'mainstat' or 'substat'
+        rng: random.Random instance or the random module (default: random)
         
     Returns:
         random stat_id (str)
@@ -296,20 +345,44 @@ def get_random_stat_id(gear_type=None, stat_type='substat'):
         return None
 
     # Choose a random ID from the pool and fetch the associated stat
-    random_stat_id = random.choice(pool)
+    random_stat_id = rng.choice(pool)
     
     return str(random_stat_id)
 
 
-def get_non_overlapping_stat_id(selected_stats = [], gear_type=None, stat_type='substat'):
+def get_available_stat_ids(selected_stats=[], gear_type=None, stat_type='substat'):
+    """
+    Get the pool of stat ids of a gear type without the already selected stats.
+    Expects validated inputs.
+
+    Args:
+        selected_stats (list): list of stat id's (str)
+        gear_type (str): type of gear, or None for all stats
+        stat_type (str): 'mainstat' or 'substat'
+
+    Returns:
+        list of available stat id's (str), in the order of the pool
+    """
+    if gear_type is None:
+        return [s for s in STATS.keys() if s not in selected_stats]
+
+    # Walk the pool rather than the bits of the mask, to keep the order of the pool
+    selected = get_stat_mask(selected_stats)
+    stat_bits = LOOKUPS['stat_bits']
+    return [s for s in LOOKUPS['pools'][gear_type][stat_type] if not stat_bits[s] & selected]
+
+
+def get_non_overlapping_stat_id(selected_stats = [], gear_type=None, stat_type='substat', rng=random):
     """
     Retrieves a new stat that is not already in the selected list of stats.
+    The stat is drawn directly from the remaining pool, with equal chance for each stat.
 
     Args:
         selected_stats (list): List containing valid stat id's (default: empty list [])
         stat_type (str): The type of stat - 'mainstat' or 'substat only' (default: 'substat')
         gear_type (str): The type of gear - 'weapon', 'helm', 'armor', 'necklace',
                 'ring', or 'boots' only. (default: None)
+        rng: random.Random instance or the random module (default: random)
     
     Returns:
         random stat_id (str)
@@ -321,15 +394,48 @@ def get_non_overlapping_stat_id(selected_stats = [], gear_type=None, stat_type='
     stat_type = validate_stat_type(stat_type)
     gear_type = validate_gear_type(gear_type)
 
-    # Get a random stat
-    random_stat_id = get_random_stat_id(gear_type, stat_type)
+    # Stats that are not selected yet
+    return _get_non_overlapping_stat_id(selected_stats, gear_type, stat_type, rng)
 
-    # If the random stat already exists in given selected stats
-    while random_stat_id in selected_stats:
-        # Get a new random stat while above condition is True
-        random_stat_id = get_random_stat_id(gear_type, stat_type)
 
-    return str(random_stat_id)
+def get_stat_mask(stat_ids):
+    """
+    Get the bitmask of a list of stat id's (bit i is set for stat id i).
+    Expects validated stat id's (str).
+
+    Args:
+        stat_ids (list of str): stat id's
+
+    Returns:
+        int bitmask
+    """
+    stat_bits = LOOKUPS['stat_bits']
+    mask = 0
+    for s in stat_ids:
+        mask |= stat_bits[s]
+    return mask
+
+
+def get_stat_ids_from_mask(mask):
+    """
+    Get the stat id's (str) whose bits are set in the given bitmask, in order of stat id.
+    """
+    return [s for s, bit in LOOKUPS['stat_bits'].items() if mask & bit]
+
+
+def get_allowed_substat_ids(gear_type, mainstat_id):
+    """
+    Get the substat id's allowed on a gear type next to the given mainstat.
+    Expects validated inputs.
+
+    Args:
+        gear_type (str): valid gear type
+        mainstat_id (str): stat id of a mainstat allowed on the gear type
+
+    Returns:
+        list of stat id's (str)
+    """
+    return get_stat_ids_from_mask(LOOKUPS['allowed_substats'][gear_type][mainstat_id])
 
 
 def check_valid_pool(gear_type=None, stat_type='mainstat', stat_ids=[]):
@@ -348,7 +454,6 @@ def check_valid_pool(gear_type=None, stat_type='mainstat', stat_ids=[]):
     else:
         gear_type = validate_gear_type(gear_type)
     
-    valid_pool = convert_int_to_str(TYPES[gear_type][stat_type])
-    
-    if any(s not in valid_pool for s in stat_ids):
+    # Any stat outside of the pool leaves a bit after masking out the pool
+    if get_stat_mask(stat_ids) & ~LOOKUPS['masks'][gear_type][stat_type]:
         raise ValueError(f"{gear_type} cannot have one or more of the {stat_type}(s) provided.")
@@ -1,13 +1,6 @@
-import json
 import random
 from src.utilities import *
-
-
-# Import data
-with open('data/types.json', 'r') as types_file:
-    TYPES = json.load(types_file)
-with open('data/stats.json', 'r') as stats_file:
-    STATS = json.load(stats_file)
+from src.registry import TYPES, STATS, LOOKUPS
     
     
 def validate_stat_id(stat_id):
@@ -23,7 +16,7 @@ def validate_stat_id(stat_id):
         raise ValueError("Stat ID cannot be None.")
 
     # Check if it's a string or integer in [0, 10]
-    if not isinstance(stat_id, (str, int)) or str(stat_id) not in [key for key in STATS.keys()]:
+    if not isinstance(stat_id, (str, int)) or str(stat_id) not in STATS:
         raise ValueError("Stat ID must be a string or integer in [0, 10].")
         
     return str(stat_id)
@@ -46,7 +39,7 @@ def validate_gear_type(gear_type, stat_id=None, stat_type=None):
             
     gear_type = gear_type.lower()
     
-    if gear_type not in [key.lower() for key in TYPES.keys()]:
+    if gear_type not in TYPES:
         raise ValueError(f"Invalid gear type '{gear_type}'. Valid gear types are: {', '.join(TYPES.keys())}")
         
     if stat_id is not None and stat_type is not None:
@@ -54,8 +47,7 @@ def validate_gear_type(gear_type, stat_id=None, stat_type=None):
         stat_id = validate_stat_id(stat_id)
         stat_type = validate_stat_type(stat_type)
         # Check the pool of stats for given stat_id and stat_type
-        pool = list(TYPES[gear_type][stat_type])
-        if int(stat_id) not in pool:
+        if not LOOKUPS['stat_bits'][stat_id] & LOOKUPS['masks'][gear_type][stat_type]:
             raise ValueError(f"The gear type {gear_type} cannot have {stat_id} stat as {stat_type}.")
 
     return gear_type
@@ -224,7 +216,7 @@ def validate_gear_grade_input(gear_grade):
     return gear_grade.lower()
 
 
-def validate_gear_grade(gear_grade=None, mainstat_id=None, substat_ids=None):
+def validate_gear_grade(gear_grade=None, mainstat_id=None, substat_ids=None, rng=random):
     """
     Validates gear_grade by checking if the grade is one of the values stored in GRADES.keys().
     Currently  ['normal', 'good', 'rare', 'heroic', 'epic'] 
@@ -236,6 +228,7 @@ def validate_gear_grade(gear_grade=None, mainstat_id=None, substat_ids=None):
         gear_grade (str): spcify gear grade
         mainstat_id (int or str): Valid stat id [0, 10]
         substat_id (int or list of int): List of valid substat id's, can take up to 4 substat_id's
+        rng: random.Random instance or the random module (default: random)
 
     Returns:
         gear_grade (str)
@@ -245,6 +238,19 @@ def validate_gear_grade(gear_grade=None, mainstat_id=None, substat_ids=None):
         substat_ids = validate_substat_ids(
             substat_ids=substat_ids, mainstat_id=mainstat_id)
         no_of_subs = len(substat_ids)
+    else:
+        no_of_subs = None
+
+    return _validate_gear_grade(gear_grade, no_of_subs, rng)
+
+
+def _validate_gear_grade(gear_grade=None, no_of_subs=None, rng=random):
+    """
+    Trusted part of validate_gear_grade() for internal use, taking the number of already
+    validated substats (None if no substats were provided).
+    """
+    # If substat_id is provided
+    if no_of_subs is not None:
 
         # If gear_grade is provided
         if gear_grade is not None:
@@ -258,14 +264,11 @@ def validate_gear_grade(gear_grade=None, mainstat_id=None, substat_ids=None):
 
         # If gear_grade is not provided:
         else:
-            gear_grade = get_random_grade()
-            starting_substats = GRADES[gear_grade]['starting_substats']
-            
-            # Keep rolling until we get a gear_grade that satisfies the
-            # starting_substats criteria
-            while starting_substats < no_of_subs:
-                gear_grade = get_random_grade()
-                starting_substats = GRADES[gear_grade]['starting_substats']
+            # Choose among the grades that allow this many starting substats
+            feasible = get_feasible_grades(no_of_subs)
+            if not feasible:
+                raise ValueError(f"No gear grade can have {no_of_subs} starting substats.")
+            gear_grade = get_random_grade(feasible, rng)
     
     # If substat_id is not provided:
     else:
@@ -276,7 +279,7 @@ def validate_gear_grade(gear_grade=None, mainstat_id=None, substat_ids=None):
                 
         # If gear_grade is not provided:
         else:
-            gear_grade = get_random_grade()
+            gear_grade = get_random_grade(rng=rng)
 
     return gear_grade
 
@@ -300,19 +303,20 @@ def validate_gear_level(gear_level):
         
     return gear_level
 
-def validate_gear_set(gear_set):
+def validate_gear_set(gear_set, rng=random):
     """
     Validates gear_set by checking if the input is a str and if it is one of the
     sets from the sets.json file
     
     Args:
         gear_set (str): Set name
+        rng: random.Random instance or the random module (default: random)
         
     Returns:
         gear_set (str)
     """
     if gear_set is None:
-        gear_set = get_random_set()
+        gear_set = get_random_set(rng)
     
     if not isinstance(gear_set, str) or gear_set.lower() not in list(SETS.keys()):
         raise ValueError("Gear set must be a str and one of the values from sets.json")
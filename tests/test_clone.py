@@ -0,0 +1,82 @@
+from set_directory_function import set_directory
+set_directory()
+
+import unittest
+import copy
+from deepdiff import DeepDiff
+from src.gear import Gear
+from src.stats import Stat
+
+
+class TestClone(unittest.TestCase):
+    """
+    Test the clone methods of the Gear() class in src/gear.py and the Stat() class in src/stats.py
+    """
+
+    def test_clone_equal(self):
+        """
+        A clone should have the same attributes as a deep copy
+        """
+        for i in range(50):
+            gear = Gear().create_gear()
+            for _ in range(i % 16):
+                gear.enhance_gear(quiet=True)
+            self.assertFalse(DeepDiff(gear.clone(), copy.deepcopy(gear)))
+        self.assertFalse(DeepDiff(Gear().clone(), Gear()))
+
+
+    def test_clone_independent(self):
+        """
+        Changing a clone should not change the original gear
+        """
+        gear = Gear().create_gear(gear_type='boots', gear_grade='epic', mainstat_id=10,
+                                  substat_ids=[6, 7, 9, 2]).enhance_gear_max(quiet=True)
+        original = copy.deepcopy(gear)
+
+        first = gear.clone().modify_gear(stat_index=1, mod_stat_id=8, quiet=True)
+        second = gear.clone().modify_gear(stat_index=2, mod_stat_id=8, quiet=True).reforge_gear(quiet=True)
+        self.assertFalse(DeepDiff(gear, original))
+        self.assertTrue(first.substats[0].modded)
+        self.assertTrue(second.substats[1].modded)
+        self.assertFalse(first.is_reforged)
+
+        rare = Gear().create_gear(gear_grade='rare')
+        clone = rare.clone().enhance_gear_max(quiet=True)
+        self.assertEqual(len(rare.substats), 2)
+        self.assertEqual(len(rare.substat_ids), 2)
+        self.assertEqual(len(clone.substat_ids), 4)
+
+
+    def test_clone_stat(self):
+        """
+        A cloned stat should be a separate object sharing the same StatInfo
+        """
+        stat = Gear().create_gear().mainstat
+        clone = stat.clone()
+        self.assertIsNot(clone, stat)
+        self.assertIs(clone.info, stat.info)
+        self.assertFalse(DeepDiff(clone, stat))
+        clone.enhance_stat(0)
+        self.assertNotEqual(clone.value, stat.value)
+        self.assertIsInstance(clone, Stat)
+
+
+    def test_clone_instance_attributes(self):
+        """
+        Cloning should keep the class of a Gear subclass and copy its other attributes
+        """
+        class NamedGear(Gear):
+            pass
+
+        gear = NamedGear().create_gear()
+        gear.note = 'keep'
+        clone = gear.clone()
+        self.assertIsInstance(clone, NamedGear)
+        self.assertEqual(clone.note, 'keep')
+        self.assertEqual(clone.get_gear_score(), gear.get_gear_score())
+        clone.note = 'sell'
+        self.assertEqual(gear.note, 'keep')
+
+
+if __name__ == '__main__':
+    unittest.main()
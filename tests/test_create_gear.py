@@ -0,0 +1,88 @@
+from set_directory_function import set_directory
+set_directory()
+
+import unittest
+import json
+from unittest.mock import patch
+from src.gear import Gear
+import src.stats
+
+TYPES = json.loads(open('data/types.json', 'r').read())
+GRADES = json.loads(open('data/grades.json', 'r').read())
+
+
+class TestCreateGear(unittest.TestCase):
+    """
+    Test the create_gear method of the Gear() class in src/gear.py, which validates its inputs
+    once and builds the gear with the trusted methods
+    """
+
+    def test_create_gear_valid(self):
+        """
+        Created gears should follow the gear restrictions
+        """
+        for i in range(500):
+            gear = Gear().create_gear()
+            self.assertIn(int(gear.mainstat_id), TYPES[gear.gear_type]['mainstat'])
+            self.assertTrue(all(int(s) in TYPES[gear.gear_type]['substat'] for s in gear.substat_ids))
+            self.assertNotIn(gear.mainstat_id, gear.substat_ids)
+            self.assertEqual(len(set(gear.substat_ids)), len(gear.substat_ids))
+            self.assertEqual(len(gear.substats), GRADES[gear.gear_grade]['starting_substats'])
+            self.assertEqual([s.stat_id for s in gear.substats], gear.substat_ids)
+            self.assertEqual(gear.mainstat.stat_type, 'mainstat')
+            self.assertEqual(gear.mainstat.gear_type, gear.gear_type)
+
+
+    def test_create_gear_specified(self):
+        """
+        Provided attributes should be kept
+        """
+        gear = Gear().create_gear(gear_type='Boots', gear_grade='heroic', gear_set='speed', gear_level=90,
+                                  mainstat_id=10, substat_ids=[6, 7])
+        self.assertEqual(gear.gear_type, 'boots')
+        self.assertEqual(gear.gear_tier, 7)
+        self.assertEqual(gear.mainstat_id, '10')
+        self.assertEqual(gear.substat_ids[:2], ['6', '7'])
+        self.assertEqual(len(gear.substat_ids), 3)
+
+
+    def test_create_gear_invalid(self):
+        """
+        Invalid inputs should still raise errors at the public boundary
+        """
+        with self.assertRaisesRegex(ValueError, "Stat ID must be"):
+            Gear().create_gear(mainstat_id=11)
+        with self.assertRaisesRegex(ValueError, "Invalid gear type"):
+            Gear().create_gear(gear_type='shield')
+        with self.assertRaisesRegex(ValueError, "Mainstat and substat cannot have same stats."):
+            Gear().create_gear(mainstat_id=10, substat_ids=[10])
+        with self.assertRaisesRegex(ValueError, "cannot have 4 starting substats"):
+            Gear().create_gear(gear_grade='rare', substat_ids=[0, 1, 2, 3])
+        with self.assertRaisesRegex(ValueError, "weapon cannot have 10 as mainstat."):
+            Gear().create_gear(gear_type='weapon', mainstat_id=10)
+        with self.assertRaises(ValueError):
+            Gear().create_gear(gear_level=101)
+
+
+    @patch('builtins.print')
+    def test_no_revalidation(self, mock_print):
+        """
+        Stats should not validate their inputs again when created or enhanced by the gear
+        """
+        validators = ['validate_gear_grade', 'validate_gear_level', 'validate_rolled', 'validate_mod',
+                      'validate_mod_type', 'validate_enhance_level', 'validate_stat_id']
+        patches = [patch.object(src.stats, name, side_effect=AssertionError(name)) for name in validators]
+        for p in patches:
+            p.start()
+        try:
+            gear = Gear().create_gear(gear_grade='rare').enhance_gear_max()
+        finally:
+            for p in patches:
+                p.stop()
+
+        self.assertEqual(gear.enhance_level, 15)
+        self.assertEqual(len(gear.substats), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
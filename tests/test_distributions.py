@@ -0,0 +1,322 @@
+from set_directory_function import set_directory
+set_directory()
+
+import unittest
+import json
+import math
+import os
+import shutil
+import tempfile
+import numpy as np
+import time
+from fractions import Fraction
+from src.distributions import get_roll_distribution, get_enhance_schedule, get_gear_score_distribution, \
+    get_substat_distribution, clear_cache, GSCORE_MAX_DENOMINATOR
+from src.distributions import _get_outcomes, _ScoreEngine, _calculate_score_distribution, _get_precomputed
+from src.registry import set_data_dir
+from src.batch import GearBatch
+from src.gear import Gear
+from unittest.mock import patch
+
+STATS = json.loads(open('data/stats.json', 'r').read())
+
+
+class TestRollDistribution(unittest.TestCase):
+    """
+    Test the get_roll_distribution function in distributions.py
+    """
+
+    def test_roll_distribution(self):
+        """
+        Roll values and probabilities should follow the substat rates of the stat
+        """
+        distribution = get_roll_distribution(10, 'epic', 85)
+        expected = STATS['10']['vars']['substat']
+        self.assertEqual(list(distribution.keys()), expected['values']['epic'][1])
+        self.assertAlmostEqual(sum(distribution.values()), 1)
+        for p, rate in zip(distribution.values(), expected['rates']['epic'][1]):
+            self.assertAlmostEqual(p, rate, places=2)
+
+
+    def test_roll_distribution_invalid(self):
+        """
+        Invalid inputs should raise errors
+        """
+        with self.assertRaises(ValueError):
+            get_roll_distribution(11, 'epic')
+        with self.assertRaises(ValueError):
+            get_roll_distribution(10, 'legendary')
+
+
+
+class TestEnhanceSchedule(unittest.TestCase):
+    """
+    Test the get_enhance_schedule function in distributions.py
+    """
+
+    def test_schedule(self):
+        """
+        Each grade should get 5 substat events from +0, with new substats for Rare and Heroic
+        """
+        self.assertEqual(get_enhance_schedule('epic'), ['roll'] * 5)
+        self.assertEqual(get_enhance_schedule('heroic'), ['roll'] * 3 + ['add', 'roll'])
+        self.assertEqual(get_enhance_schedule('rare'), ['roll'] * 2 + ['add', 'add', 'roll'])
+
+
+    def test_schedule_partial(self):
+        """
+        Only the events left after the current enhance level should be returned
+        """
+        self.assertEqual(get_enhance_schedule('rare', 9), ['add', 'roll'])
+        self.assertEqual(get_enhance_schedule('epic', 15), [])
+
+
+
+class TestGearScoreDistribution(unittest.TestCase):
+    """
+    Test the get_gear_score_distribution function in distributions.py
+    """
+
+    def test_single_roll(self):
+        """
+        With known substats the distribution should match a hand calculation
+        """
+        # Epic boots with Speed main and 4 known substats: every roll of the 5 rolls lands on any
+        # substat with equal chance, so the expected score is the sum of the expected substat scores
+        substat_ids = [6, 7, 8, 9]
+        pmf, reforged_pmf = get_gear_score_distribution('boots', 'epic', 85, 10, substat_ids)
+
+        self.assertAlmostEqual(sum(pmf.values()), 1)
+        self.assertAlmostEqual(sum(reforged_pmf.values()), 1)
+
+        expected_mean = 0
+        for s in substat_ids:
+            roll = get_roll_distribution(s, 'epic', 85)
+            mean_roll = sum(value * p for value, p in roll.items())
+            expected_mean += mean_roll * (1 + 5 / 4) * STATS[str(s)]['gscore']
+        mean = sum(score * p for score, p in pmf.items())
+        # Rounding the final score shifts the mean by less than 0.5
+        self.assertAlmostEqual(mean, expected_mean, delta=0.5)
+
+
+    def test_matches_simulation(self):
+        """
+        The distribution should match the gear scores of many simulated gears
+        """
+        for gear_type, gear_grade in [('boots', 'epic'), ('ring', 'rare')]:
+            with self.subTest(gear_type=gear_type, gear_grade=gear_grade):
+                pmf, reforged_pmf = get_gear_score_distribution(gear_type, gear_grade)
+                batch = GearBatch.create(100000, gear_type=gear_type, gear_grade=gear_grade, rng=1)
+                scores = batch.enhance_gear_max(rng=2).get_gear_scores()
+
+                for distribution, simulated in [(pmf, scores[:, 0]), (reforged_pmf, scores[:, 1])]:
+                    mean = sum(score * p for score, p in distribution.items())
+                    self.assertAlmostEqual(simulated.mean(), mean, delta=0.1)
+                    # Every simulated score should be possible
+                    self.assertTrue(set(np.unique(simulated).tolist()) <= set(distribution.keys()))
+                    # Compare the cumulative distributions
+                    for score in range(int(simulated.min()), int(simulated.max()), 5):
+                        cdf = sum(p for s, p in distribution.items() if s <= score)
+                        self.assertAlmostEqual((simulated <= score).mean(), cdf, delta=0.01)
+
+
+    def test_cache(self):
+        """
+        Repeated queries should be answered from the cache, with results that can be changed safely
+        """
+        clear_cache()
+        pmf, reforged_pmf = get_gear_score_distribution('ring', 'heroic', mainstat_id=1)
+        pmf.clear()
+
+        start = time.perf_counter()
+        cached, cached_reforged = get_gear_score_distribution('ring', 'heroic', mainstat_id=1)
+        self.assertLess(time.perf_counter() - start, 0.01)
+        self.assertEqual(cached_reforged, reforged_pmf)
+        self.assertAlmostEqual(sum(cached.values()), 1)
+
+        clear_cache()
+        self.assertEqual(get_gear_score_distribution('ring', 'heroic', mainstat_id=1), [cached, cached_reforged])
+
+
+    def test_cache_cleared_on_reset(self):
+        """
+        Results should be calculated again from the new data when the registry loads another data folder
+        """
+        pmf, _ = get_gear_score_distribution('weapon', 'rare')
+
+        data_dir = tempfile.mkdtemp()
+        try:
+            for name in ['types', 'sets', 'tiers', 'grades', 'stats']:
+                shutil.copy(os.path.join('data', f'{name}.json'), data_dir)
+            stats = json.loads(open(os.path.join(data_dir, 'stats.json'), 'r').read())
+            for stat in stats.values():
+                stat['gscore'] *= 2
+            with open(os.path.join(data_dir, 'stats.json'), 'w') as json_file:
+                json.dump(stats, json_file)
+
+            set_data_dir(data_dir)
+            doubled, _ = get_gear_score_distribution('weapon', 'rare')
+        finally:
+            set_data_dir()
+            shutil.rmtree(data_dir)
+
+        mean = sum(score * p for score, p in pmf.items())
+        doubled_mean = sum(score * p for score, p in doubled.items())
+        self.assertAlmostEqual(doubled_mean, 2 * mean, delta=0.5)
+        self.assertEqual(get_gear_score_distribution('weapon', 'rare')[0], pmf)
+
+
+    def test_precomputed(self):
+        """
+        Precomputed distributions should match the calculated ones, and be used for queries without substats
+        """
+        precomputed = _get_precomputed()
+        self.assertEqual(len(precomputed), 6 * 3 * 3)
+
+        for gear_type, gear_grade, mainstat_ids in [('ring', 'rare', ['1']), ('necklace', 'epic', ['6', '7'])]:
+            with self.subTest(gear_type=gear_type, gear_grade=gear_grade):
+                clear_cache()
+                start = time.perf_counter()
+                distributions = get_gear_score_distribution(gear_type, gear_grade, 80, mainstat_ids[0])
+                self.assertLess(time.perf_counter() - start, 0.5)
+
+                calculated = _calculate_score_distribution(gear_type, gear_grade, 80, mainstat_ids[:1], [])
+                for distribution, expected in zip(distributions, calculated):
+                    self.assertEqual(distribution.keys(), expected.keys())
+                    for score, p in expected.items():
+                        self.assertAlmostEqual(distribution[score], p)
+
+
+    def test_score_resolution(self):
+        """
+        Adding up flat stat scores on the SCORE_RESOLUTION lattice should only move a small part of
+        the probability to other scores, compared to adding up the exact scores
+        """
+        gscores = [Fraction(stat['gscore']).limit_denominator(GSCORE_MAX_DENOMINATOR) for stat in STATS.values()]
+        exact_resolution = math.lcm(*(gscore.denominator for gscore in gscores))
+
+        # Necklace with the 3 flat stats as substats, 2 rolls left
+        substats = [(s, None) for s in ['0', '2', '4', '10']]
+        outcomes = _get_outcomes('necklace', '1', substats, get_enhance_schedule('epic', 9))
+        engine = _ScoreEngine('epic', 85)
+        exact_engine = _ScoreEngine('epic', 85, exact_resolution)
+        tree = engine.get_tree(outcomes)
+
+        for reforged in [False, True]:
+            with self.subTest(reforged=reforged):
+                pmf = engine.score_distribution(tree, reforged)
+                exact = exact_engine.score_distribution(tree, reforged)
+                moved = sum(abs(pmf.get(score, 0) - exact.get(score, 0)) for score in set(pmf) | set(exact)) / 2
+                self.assertLess(moved, 0.001)
+                self.assertEqual(set(pmf), set(exact))
+
+
+    def test_invalid(self):
+        """
+        Missing or impossible inputs should raise errors
+        """
+        with self.assertRaises(ValueError):
+            get_gear_score_distribution(gear_grade='epic')
+        with self.assertRaises(ValueError):
+            get_gear_score_distribution('boots')
+        with self.assertRaises(ValueError):
+            get_gear_score_distribution('weapon', 'epic', mainstat_id=10)
+
+
+
+class TestSubstatDistribution(unittest.TestCase):
+    """
+    Test the get_substat_distribution function in distributions.py
+    """
+
+    def simulate(self, gear, stat_id, size=100000):
+        """
+        Helper to get the final values of a substat over many copies of the gear enhanced to +15
+        """
+        batch = GearBatch.from_gears([gear] * size).enhance_gear_max(rng=1)
+        found = batch.substat_ids == stat_id
+        values = (batch.substat_values * found).sum(axis=1)
+        return values
+
+
+    def check_simulation(self, gear, stat_id):
+        """
+        Helper to compare the distribution against simulated values
+        """
+        distribution = get_substat_distribution(gear, stat_id)
+        simulated = self.simulate(gear, stat_id)
+
+        self.assertAlmostEqual(sum(distribution.values()), 1)
+        self.assertTrue(set(np.unique(simulated).tolist()) <= set(distribution.keys()))
+        for value, p in distribution.items():
+            with self.subTest(value=value):
+                self.assertAlmostEqual((simulated == value).mean(), p, delta=0.01)
+
+
+    def test_existing_substat(self):
+        """
+        A substat already on the gear should keep its value and add its rolls
+        """
+        gear = Gear().create_gear(gear_type='boots', gear_grade='epic', mainstat_id=1,
+                                  substat_ids=[10, 6, 7, 8])
+        self.check_simulation(gear, 10)
+
+        distribution = get_substat_distribution(gear, 10)
+        self.assertEqual(min(distribution), gear.substats[0].value)
+        self.assertNotIn(0, distribution)
+
+
+    @patch('builtins.print')
+    def test_partially_enhanced(self, mock_print):
+        """
+        Enhance levels already reached should not be rolled again
+        """
+        gear = Gear().create_gear(gear_type='ring', gear_grade='heroic', mainstat_id=1,
+                                  substat_ids=[10, 6, 7])
+        for _ in range(6):
+            gear.enhance_gear()
+        self.check_simulation(gear, 10)
+
+
+    def test_new_substat(self):
+        """
+        A substat that is not on the gear yet may be added when enhancing
+        """
+        gear = Gear().create_gear(gear_type='boots', gear_grade='rare', mainstat_id=1,
+                                  substat_ids=[6, 7])
+        distribution = get_substat_distribution(gear, 10)
+        # Two substats are added from the 8 remaining in the pool
+        self.assertAlmostEqual(distribution[0], (7 / 8) * (6 / 7))
+        self.check_simulation(gear, 10)
+
+
+    @patch('builtins.print')
+    def test_max_enhanced(self, mock_print):
+        """
+        A +15 gear should keep its current values, and the reforge increase should be added once
+        """
+        gear = Gear().create_gear(gear_type='boots', gear_grade='epic', mainstat_id=1,
+                                  substat_ids=[10, 6, 7, 8]).enhance_gear_max()
+        speed = gear.substats[0]
+        self.assertEqual(get_substat_distribution(gear, 10), {speed.value: 1.0})
+        self.assertEqual(get_substat_distribution(gear, 10, reforged=True),
+                         {speed.value + speed.reforge_increase: 1.0})
+        self.assertEqual(get_substat_distribution(gear, 9), {0: 1.0})
+
+        gear.reforge_gear()
+        self.assertEqual(get_substat_distribution(gear, 10, reforged=True), {speed.value: 1.0})
+
+
+    def test_invalid(self):
+        """
+        Substats that are not allowed on the gear type should raise errors
+        """
+        gear = Gear().create_gear(gear_type='weapon', gear_grade='epic')
+        with self.assertRaises(ValueError):
+            get_substat_distribution(gear, 4)
+        with self.assertRaises(ValueError):
+            get_substat_distribution(Gear(), 10)
+
+
+if __name__ == '__main__':
+    unittest.main()
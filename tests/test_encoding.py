@@ -0,0 +1,132 @@
+from set_directory_function import set_directory
+set_directory()
+
+import unittest
+import numpy as np
+from unittest.mock import patch
+from src.encoding import encode_gear, decode_gear, encode_gears, decode_gears, encode_batch, \
+    decode_batch, get_layout
+from src.batch import GearBatch
+from src.gear import Gear
+
+
+class TestEncoding(unittest.TestCase):
+    """
+    Test the gear encoding functions in encoding.py
+    """
+
+    def assertSameGear(self, gear, decoded):
+        """
+        Helper to compare the attributes of two gears and their stats
+        """
+        for attr in ['gear_type', 'gear_grade', 'gear_set', 'gear_level', 'gear_tier', 'enhance_level',
+                     'is_reforged', 'mainstat_id']:
+            self.assertEqual(getattr(gear, attr), getattr(decoded, attr), attr)
+        self.assertEqual(decoded.substat_ids, [s.stat_id for s in gear.substats])
+        self.assertEqual(len(gear.substats), len(decoded.substats))
+        for stat, decoded_stat in zip([gear.mainstat] + gear.substats, [decoded.mainstat] + decoded.substats):
+            for attr in ['stat_id', 'stat_type', 'gear_type', 'gear_grade', 'value', 'rolled',
+                         'reforge_increase', 'modded']:
+                self.assertEqual(getattr(stat, attr), getattr(decoded_stat, attr), attr)
+        self.assertEqual(gear.get_gear_score(), decoded.get_gear_score())
+
+
+    def test_layout(self):
+        """
+        Fields should not overlap or cross the 64-bit words
+        """
+        used = [0, 0]
+        for name, slot, word, shift, bits in get_layout():
+            mask = ((1 << bits) - 1) << shift
+            self.assertEqual(used[word] & mask, 0)
+            self.assertLessEqual(shift + bits, 64)
+            used[word] |= mask
+
+
+    @patch('builtins.print')
+    def test_round_trip(self, mock_print):
+        """
+        Decoding an encoded gear should give back the same gear
+        """
+        for i in range(300):
+            gear = Gear().create_gear(gear_level=int(np.random.randint(58, 100)))
+            for _ in range(i % 16):
+                gear.enhance_gear()
+            with self.subTest(i=i):
+                self.assertSameGear(gear, decode_gear(encode_gear(gear)))
+
+
+    @patch('builtins.print')
+    def test_reforged_modded(self, mock_print):
+        """
+        Reforged and modded gears should keep their values and modded flags
+        """
+        gear = Gear().create_gear(gear_type='boots', gear_grade='epic', mainstat_id=10,
+                                  substat_ids=[2, 6, 7, 8]).enhance_gear_max()
+        gear.modify_gear(stat_index=1, mod_stat_id=9)
+        gear.reforge_gear()
+        decoded = decode_gear(encode_gear(gear))
+        self.assertTrue(decoded.is_reforged)
+        self.assertTrue(decoded.substats[0].modded)
+        self.assertSameGear(gear, decoded)
+
+
+    def test_arrays(self):
+        """
+        Arrays of encoded gears should round trip, and equal gears should have equal rows
+        """
+        gears = [Gear().create_gear() for _ in range(50)]
+        codes = encode_gears(gears + gears[:5])
+        self.assertEqual(codes.shape, (55, 2))
+        self.assertEqual(codes.dtype, np.uint64)
+        self.assertEqual(len(np.unique(codes, axis=0)), len(np.unique(codes[:50], axis=0)))
+        for gear, decoded in zip(gears, decode_gears(codes)):
+            self.assertSameGear(gear, decoded)
+
+
+    def test_batch(self):
+        """
+        Encoding a GearBatch should match encoding its gears one at a time
+        """
+        batch = GearBatch.create(200, rng=1).enhance_gear_max(rng=2)
+        codes = encode_batch(batch)
+        np.testing.assert_array_equal(codes, encode_gears(batch.to_gears()))
+
+        decoded = decode_batch(codes)
+        for column in ['gear_type', 'gear_grade', 'gear_set', 'gear_level', 'gear_tier', 'enhance_level',
+                       'is_reforged', 'mainstat_id', 'mainstat_value', 'substat_ids', 'substat_values',
+                       'substat_rolled', 'substat_modded']:
+            np.testing.assert_array_equal(getattr(decoded, column), getattr(batch, column))
+
+
+    @patch('builtins.print')
+    def test_batch_reforged_modded(self, mock_print):
+        """
+        Reforged and modded gears should be encoded the same way by both encoders, and come back
+        equal from a GearBatch
+        """
+        gear = Gear().create_gear(gear_type='boots', gear_grade='epic', gear_level=85, mainstat_id=10,
+                                  substat_ids=[2, 6, 7, 8]).enhance_gear_max()
+        gear.modify_gear(stat_index=1, mod_stat_id=9)
+        gear.reforge_gear()
+        gears = [gear, Gear().create_gear(gear_level=88).enhance_gear_max()]
+        gears[1].reforge_gear()
+
+        batch = GearBatch.from_gears(gears)
+        np.testing.assert_array_equal(encode_batch(batch), encode_gears(gears))
+        for original, decoded in zip(gears, batch.to_gears()):
+            self.assertSameGear(original, decoded)
+        for original, decoded in zip(gears, decode_batch(encode_batch(batch)).to_gears()):
+            self.assertSameGear(original, decoded)
+
+
+    def test_invalid(self):
+        """
+        Gears that are not created should raise errors
+        """
+        with self.assertRaises(ValueError):
+            encode_gear(Gear())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,6 +4,7 @@ set_directory()
 import unittest
 import json
 import random
+import unittest.mock
 from src.stats import Stat
 from src.validation_utils import *
 from src.utilities import *
@@ -235,6 +236,45 @@ class TestFormatMainStat(unittest.TestCase):
         
         self.assertFalse(missing_vals, f"The following values were not selected: {missing_vals}")
         self.assertFalse(extra_vals, f"The following extra values were selected: {extra_vals}")  
-        
+
+
+class TestLazyFormatStat(unittest.TestCase):
+    """
+    Test that text_formatted is only formatted when read, and formatted again after the stat changes
+    """
+
+    def test_not_formatted_until_read(self):
+        """
+        Enhancing should not format the text, reading it should format it once
+        """
+        stat = Stat()
+        stat.get_stat_by_id(10, stat_type='substat')
+        stat.parse_stat(gear_grade='epic')
+        with unittest.mock.patch.object(Stat, 'format_stat', autospec=True,
+                                        side_effect=Stat.format_stat) as mock_format:
+            for i in range(5):
+                stat.enhance_stat(3 * i + 2)
+            self.assertEqual(mock_format.call_count, 0)
+            text = stat.text_formatted
+            self.assertEqual(text, f'{stat.value} Speed')
+            stat.text_formatted
+            self.assertEqual(mock_format.call_count, 1)
+
+
+    def test_formatted_after_change(self):
+        """
+        The cached text should be dropped when the stat is enhanced or reforged
+        """
+        stat = Stat()
+        stat.get_stat_by_id(0, stat_type='mainstat')
+        stat.parse_stat(gear_grade='epic')
+        self.assertEqual(stat.text_formatted, '100 Attack')
+        stat.enhance_stat(0)
+        self.assertEqual(stat.text_formatted, '120 Attack')
+        stat.reforge_stat()
+        self.assertEqual(stat.text_formatted, f'{stat.reforge_increase} Attack')
+        self.assertIsNone(Stat().text_formatted)
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
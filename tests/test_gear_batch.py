@@ -0,0 +1,291 @@
+from set_directory_function import set_directory
+set_directory()
+
+import unittest
+import json
+import numpy as np
+from src.batch import GearBatch, EMPTY_STAT, get_tables, get_gear_scores
+from unittest.mock import patch
+from src.gear import Gear
+from src.registry import reset
+
+STATS = json.loads(open('data/stats.json', 'r').read())
+TYPES = json.loads(open('data/types.json', 'r').read())
+GRADES = json.loads(open('data/grades.json', 'r').read())
+
+
+class TestGearBatchCreate(unittest.TestCase):
+    """
+    Test the create method in GearBatch() class
+    """
+
+    def check_rules(self, batch):
+        """
+        Helper to check that every gear in the batch follows the gear restrictions
+        """
+        tables = get_tables()
+        for i in range(len(batch)):
+            gear_type = tables['gear_types'][batch.gear_type[i]]
+            gear_grade = tables['gear_grades'][batch.gear_grade[i]]
+            mainstat_id = int(batch.mainstat_id[i])
+            subs = [int(s) for s in batch.substat_ids[i] if s != EMPTY_STAT]
+
+            self.assertIn(mainstat_id, TYPES[gear_type]['mainstat'])
+            self.assertTrue(all(s in TYPES[gear_type]['substat'] for s in subs))
+            self.assertNotIn(mainstat_id, subs)
+            self.assertEqual(len(subs), len(set(subs)))
+            self.assertEqual(len(subs), GRADES[gear_grade]['starting_substats'])
+            self.assertEqual(batch.mainstat_value[i],
+                             STATS[str(mainstat_id)]['vars']['mainstat']['values'][gear_grade][1])
+
+            for s, value in zip(subs, batch.substat_values[i]):
+                self.assertIn(value, STATS[str(s)]['vars']['substat']['values'][gear_grade][1])
+
+
+    def test_create_random(self):
+        """
+        Random gears should follow all gear restrictions
+        """
+        batch = GearBatch.create(2000, rng=1)
+        self.assertEqual(len(batch), 2000)
+        self.assertTrue((batch.gear_level == 85).all())
+        self.assertTrue((batch.enhance_level == 0).all())
+        self.check_rules(batch)
+
+
+    def test_create_specified(self):
+        """
+        Provided attributes should be applied to every gear
+        """
+        batch = GearBatch.create(500, gear_type='boots', gear_grade='heroic', gear_set='speed',
+                                 gear_level=90, mainstat_id=10, substat_ids=[6, 7], rng=2)
+
+        self.assertEqual(set(batch.get_gear_types()), {'boots'})
+        self.assertEqual(set(batch.get_gear_grades()), {'heroic'})
+        self.assertEqual(set(batch.get_gear_sets()), {'speed'})
+        self.assertTrue((batch.gear_level == 90).all())
+        self.assertTrue((batch.mainstat_id == 10).all())
+        self.assertTrue((batch.mainstat_value == 9).all())
+        self.assertTrue((batch.substat_ids[:, :2] == [6, 7]).all())
+        self.assertTrue((batch.substat_ids[:, 2] != EMPTY_STAT).all())
+        self.assertTrue((batch.substat_ids[:, 3] == EMPTY_STAT).all())
+
+
+    def test_create_constrained_type(self):
+        """
+        When only stats are provided, only gear types allowing them should be chosen
+        """
+        batch = GearBatch.create(2000, mainstat_id=1, substat_ids=[10], rng=3)
+        self.assertEqual(set(batch.get_gear_types()), {'necklace', 'ring', 'boots'})
+        self.check_rules(batch)
+
+
+    def test_create_constrained_grade(self):
+        """
+        Grades that cannot start with the provided number of substats should never be chosen
+        """
+        batch = GearBatch.create(2000, substat_ids=[6, 7, 10], rng=4)
+        self.assertEqual(set(batch.get_gear_grades()), {'heroic', 'epic'})
+
+
+    def test_create_invalid(self):
+        """
+        Invalid or impossible inputs should raise errors
+        """
+        with self.assertRaises(ValueError):
+            GearBatch.create(10, gear_type='weapon', mainstat_id=10)
+        with self.assertRaises(ValueError):
+            GearBatch.create(10, gear_grade='rare', substat_ids=[6, 7, 10])
+        with self.assertRaises(ValueError):
+            GearBatch.create(10, mainstat_id=10, substat_ids=[10])
+        with self.assertRaises(ValueError):
+            GearBatch.create(-1)
+
+
+    def test_create_reproducible(self):
+        """
+        The same seed should give the same batch
+        """
+        batch_1 = GearBatch.create(100, rng=5)
+        batch_2 = GearBatch.create(100, rng=5)
+        self.assertTrue((batch_1.substat_values == batch_2.substat_values).all())
+        self.assertTrue((batch_1.mainstat_id == batch_2.mainstat_id).all())
+
+
+    def test_create_distribution(self):
+        """
+        Grades, types and substat values should follow the same rates as create_gear()
+        """
+        size = 200000
+        batch = GearBatch.create(size, gear_type='boots', mainstat_id=10, substat_ids=[6], rng=6)
+
+        # Grade weights
+        weights = np.bincount(batch.gear_grade, minlength=5) / size
+        self.assertTrue(np.allclose(weights, [0, 0, 0.35, 0.53, 0.12], atol=0.01))
+
+        # Crit Chance values on epic gear
+        epic = batch.gear_grade == 4
+        values = batch.substat_values[epic, 0]
+        expected = STATS['6']['vars']['substat']
+        for value, rate in zip(expected['values']['epic'][1], expected['rates']['epic'][1]):
+            with self.subTest(value=value):
+                self.assertAlmostEqual((values == value).mean(), rate, delta=0.01)
+
+        # Substats added to the gear should be spread evenly over the remaining pool
+        added = batch.substat_ids[:, 1]
+        counts = np.bincount(added[added != EMPTY_STAT], minlength=11)
+        pool = [0, 1, 2, 3, 4, 5, 7, 8, 9]
+        shares = counts[pool] / counts.sum()
+        self.assertTrue(np.allclose(shares, 1 / len(pool), atol=0.01))
+        self.assertEqual(counts[6] + counts[10], 0)
+
+
+    def test_to_gears(self):
+        """
+        Gears converted to Gear objects should hold the same attributes
+        """
+        batch = GearBatch.create(20, rng=7)
+        gears = batch.to_gears()
+
+        self.assertEqual(len(gears), 20)
+        for i, gear in enumerate(gears):
+            self.assertIsInstance(gear, Gear)
+            self.assertEqual(gear.gear_type, batch.get_gear_types()[i])
+            self.assertEqual(gear.mainstat.value, batch.mainstat_value[i])
+            self.assertEqual([s.value for s in gear.substats],
+                             [v for s, v in zip(batch.substat_ids[i], batch.substat_values[i])
+                              if s != EMPTY_STAT])
+
+
+
+class TestGearBatchEnhance(unittest.TestCase):
+    """
+    Test the enhance_gear_max method in GearBatch() class
+    """
+
+    def test_enhance_epic(self):
+        """
+        Epic gear should roll 5 times in total and keep its 4 substats
+        """
+        batch = GearBatch.create(1000, gear_grade='epic', rng=1)
+        before = batch.substat_values.copy()
+        batch.enhance_gear_max(rng=2)
+
+        self.assertTrue((batch.enhance_level == 15).all())
+        self.assertTrue((batch.substat_rolled.sum(axis=1) == 5).all())
+        self.assertTrue((batch.substat_ids != EMPTY_STAT).all())
+        # Every roll adds a positive value
+        self.assertTrue(((batch.substat_values > before) == (batch.substat_rolled > 0)).all())
+
+
+    def test_enhance_rare_heroic(self):
+        """
+        Rare gear should get 2 new substats and 3 rolls, Heroic gear 1 new substat and 4 rolls
+        """
+        for gear_grade, rolls in [('rare', 3), ('heroic', 4)]:
+            with self.subTest(gear_grade=gear_grade):
+                batch = GearBatch.create(1000, gear_grade=gear_grade, rng=3).enhance_gear_max(rng=4)
+                self.assertTrue((batch.substat_ids != EMPTY_STAT).all())
+                self.assertTrue((batch.substat_rolled.sum(axis=1) == rolls).all())
+                for ids, mainstat_id in zip(batch.substat_ids, batch.mainstat_id):
+                    self.assertEqual(len(set(ids) | {mainstat_id}), 5)
+
+
+    def test_enhance_mainstat(self):
+        """
+        Mainstat should end at 5 times its base value
+        """
+        batch = GearBatch.create(100, gear_type='boots', mainstat_id=10, rng=5).enhance_gear_max(rng=6)
+        self.assertTrue((batch.mainstat_value == 40).all())
+
+        batch = GearBatch.create(100, gear_type='weapon', gear_level=90, rng=5).enhance_gear_max(rng=6)
+        self.assertTrue((batch.mainstat_value == 515).all())
+
+
+    def test_enhance_partial(self):
+        """
+        Gears should only get their remaining enhance steps, and +15 gears should be left as is
+        """
+        batch = GearBatch.create(1000, gear_grade='epic', rng=7)
+        batch.enhance_level[:500] = 9
+        batch.enhance_level[500:] = 15
+        before = batch.substat_values.copy()
+        batch.enhance_gear_max(rng=8)
+
+        self.assertTrue((batch.substat_rolled[:500].sum(axis=1) == 2).all())
+        self.assertTrue((batch.substat_values[500:] == before[500:]).all())
+        self.assertTrue((batch.substat_rolled[500:] == 0).all())
+
+
+    def test_enhance_distribution(self):
+        """
+        Rolls should be spread over the substats in the same way as enhance_gear()
+        """
+        batch = GearBatch.create(100000, gear_grade='rare', rng=9).enhance_gear_max(rng=10)
+        mean_rolled = batch.substat_rolled.mean(axis=0)
+
+        # Rare gear: rolls at +3 and +6 among 2 substats, at +15 among 4 substats
+        self.assertTrue(np.allclose(mean_rolled, [1.25, 1.25, 0.25, 0.25], atol=0.02))
+
+        # Added substats follow the substat roll rates
+        speed = (batch.substat_ids[:, 2] == 10) & (batch.substat_rolled[:, 2] == 0)
+        values = batch.substat_values[speed, 2]
+        expected = STATS['10']['vars']['substat']
+        for value, rate in zip(expected['values']['rare'][1], expected['rates']['rare'][1]):
+            with self.subTest(value=value):
+                self.assertAlmostEqual((values == value).mean(), rate, delta=0.02)
+
+
+
+class TestGearBatchScores(unittest.TestCase):
+    """
+    Test the vectorized gear score functions in batch.py
+    """
+
+    def test_scores_match_gear(self):
+        """
+        Batch gear scores should match get_gear_score() of the same gears
+        """
+        batch = GearBatch.create(2000, rng=1)
+        batch.enhance_gear_max(rng=2)
+        scores = batch.get_gear_scores()
+
+        for gear, score in zip(batch.to_gears(), scores):
+            self.assertEqual(gear.get_gear_score(), list(score))
+
+
+    @patch('builtins.print')
+    def test_from_gears(self, mock_print):
+        """
+        Scores of a batch made from Gear objects should match get_gear_score()
+        """
+        gears = [Gear().create_gear().enhance_gear_max() for _ in range(100)]
+        batch = GearBatch.from_gears(gears)
+
+        self.assertTrue((batch.enhance_level == 15).all())
+        for gear, score in zip(gears, batch.get_gear_scores()):
+            self.assertEqual(gear.get_gear_score(), list(score))
+
+
+    def test_empty_slots(self):
+        """
+        Empty substat slots should not add to the score
+        """
+        scores = get_gear_scores([[10, 6, EMPTY_STAT, EMPTY_STAT]], [[4, 5, 0, 0]], [[0, 1, 0, 0]])
+        self.assertEqual(list(scores[0]), [16, 19])
+
+
+    def test_tables_rebuilt_after_reset(self):
+        """
+        The lookup arrays should be rebuilt once the registry drops its data
+        """
+        tables = get_tables()
+        self.assertIs(get_tables(), tables)
+        reset()
+        rebuilt = get_tables()
+        self.assertIsNot(rebuilt, tables)
+        self.assertTrue(np.array_equal(rebuilt['gscore'], tables['gscore']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+from set_directory_function import set_directory
+set_directory()
+
+import unittest
+from src.gear import Gear
+from src.events import GearEvent, get_refusals
+
+
+class TestGearEvents(unittest.TestCase):
+    """
+    Test the GearEvent records appended by the Gear() methods in src/gear.py
+    """
+
+    def test_enhance_events(self):
+        """
+        Enhance events should add up to the final values of the stats
+        """
+        for grade in ['rare', 'heroic', 'epic']:
+            with self.subTest(grade=grade):
+                events = []
+                gear = Gear().create_gear(gear_grade=grade)
+                mainstat_start = gear.mainstat.value
+                starting = [s.value for s in gear.substats]
+                gear.enhance_gear_max(quiet=True, events=events)
+
+                self.assertEqual(len([e for e in events if e.op == 'enhance']), 15)
+                self.assertEqual(len([e for e in events if e.op in ['add', 'roll']]), 5)
+                self.assertEqual(mainstat_start + sum(e.delta for e in events if e.op == 'enhance'),
+                                 gear.mainstat.value)
+
+                values = starting + [0] * (4 - len(starting))
+                for e in events:
+                    if e.op in ['add', 'roll']:
+                        values[e.stat_index] += e.delta
+                        self.assertEqual(e.stat_id, gear.substats[e.stat_index].stat_id)
+                self.assertEqual(values, [s.value for s in gear.substats])
+
+                last_rolls = {e.stat_index: e.rolled for e in events if e.op in ['add', 'roll']}
+                for index, rolled in last_rolls.items():
+                    self.assertEqual(gear.substats[index].rolled, rolled)
+                self.assertEqual(get_refusals(events), [])
+
+
+    def test_reforge_modify_events(self):
+        """
+        Reforge and modify events should hold the changes of each stat
+        """
+        gear = Gear().create_gear(gear_type='boots', gear_grade='epic', mainstat_id=10,
+                                  substat_ids=[2, 6, 7, 8]).enhance_gear_max(quiet=True)
+        before = [s.value for s in gear.substats]
+        events = []
+        gear.reforge_gear(quiet=True, events=events)
+        self.assertEqual(len(events), 5)
+        self.assertEqual(events[0].stat_index, None)
+        for e in events[1:]:
+            self.assertEqual(e.op, 'reforge')
+            self.assertEqual(before[e.stat_index] + e.delta, gear.substats[e.stat_index].value)
+
+        events = []
+        old_value = gear.substats[0].value
+        gear.modify_gear(stat_index=1, mod_stat_id=9, quiet=True, events=events)
+        self.assertEqual(events, [GearEvent('modify', 0, '9', gear.substats[0].value - old_value,
+                                            gear.substats[0].rolled, None)])
+
+
+    def test_refusals(self):
+        """
+        Refused operations should append an event with the reason and leave the gear unchanged
+        """
+        gear = Gear().create_gear(gear_grade='epic', gear_level=85)
+        events = []
+        gear.reforge_gear(quiet=True, events=events)
+        gear.modify_gear(stat_index=1, mod_stat_id=0, quiet=True, events=events)
+        gear.enhance_gear_max(quiet=True)
+        gear.enhance_gear(quiet=True, events=events)
+        gear.modify_gear(stat_index=1, mod_stat_id=gear.substat_ids[1], quiet=True, events=events)
+
+        self.assertEqual(get_refusals(events), events)
+        self.assertEqual([e.op for e in events], ['reforge', 'modify', 'enhance', 'modify'])
+        self.assertEqual(events[0].reason, "Cannot reforge a gear that has not been enhanced to +15 yet.")
+        self.assertEqual(events[3].stat_index, 0)
+        self.assertEqual(events[3].reason, "Cannot add a substat that already exists on the gear.")
+
+
+if __name__ == '__main__':
+    unittest.main()
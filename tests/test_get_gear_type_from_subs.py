@@ -3,7 +3,7 @@ set_directory()
 
 import unittest
 import json
-from src.utilities import get_gear_type_from_subs 
+from src.utilities import get_gear_type_from_subs, get_feasible_gear_types
 
 with open('data/types.json', 'r') as types_file:
     TYPES = json.load(types_file)
@@ -192,6 +192,40 @@ class TestGetGearTypeFromSubs(unittest.TestCase):
         self.assertFalse(missing, f"The following values were not selected: {missing}")
         self.assertFalse(extra, f"The following extra values were selected: {extra}")
         
+
+
+    def test_keep_valid_gear_type(self):
+        """
+        A provided gear_type that allows the substats should be kept
+        """
+        for i in range(100):
+            self.assertEqual(get_gear_type_from_subs(gear_type='armor', substat_ids=[2, 3]), 'armor')
+
+
+    def test_feasible_gear_types(self):
+        """
+        Only gear types allowing the mainstat and all the substats should be feasible
+        """
+        self.assertEqual(get_feasible_gear_types(substat_ids=['0', '4']), ['helm', 'necklace', 'ring', 'boots'])
+        self.assertEqual(get_feasible_gear_types(mainstat_id='10'), ['boots'])
+        self.assertEqual(get_feasible_gear_types('1', ['10']), ['necklace', 'ring', 'boots'])
+        self.assertEqual(get_feasible_gear_types(), list(TYPES.keys()))
+
+
+    def test_uniform_feasible_gear_types(self):
+        """
+        Each feasible gear type should be picked with equal chance
+        """
+        counts = {}
+        for i in range(30000):
+            gear_type = get_gear_type_from_subs(substat_ids=[2, 3])
+            counts[gear_type] = counts.get(gear_type, 0) + 1
+
+        # Helm does not allow flat Health substats
+        self.assertEqual(set(counts.keys()), {'weapon', 'armor', 'necklace', 'ring', 'boots'})
+        for count in counts.values():
+            self.assertAlmostEqual(count / 30000, 1 / len(counts), delta=0.02)
+        
                 
 if __name__ == '__main__':
     unittest.main()
@@ -4,7 +4,10 @@ set_directory()
 import unittest
 import json
 import random
-from src.utilities import get_random_stat_id, convert_int_to_str, get_non_overlapping_stat_id
+from unittest.mock import patch
+from src.utilities import get_random_stat_id, convert_int_to_str, get_non_overlapping_stat_id, \
+    get_available_stat_ids
+from src.registry import LOOKUPS
 
 with open('data/types.json', 'r') as types_file:
     TYPES = json.load(types_file)
@@ -233,6 +236,38 @@ class TestGetNonOverlappingStatID(unittest.TestCase):
         """
         with self.assertRaises(ValueError):
             get_non_overlapping_stat_id([1, 2, 3, 4, -1])
+
+
+    def test_get_non_overlapping_stat_id_uniform(self):
+        """
+        Each remaining stat should be drawn with equal chance
+        """
+        selected_stats = ['1', '2', '3', '6', '7']
+        counts = {}
+        for i in range(30000):
+            stat_id = get_non_overlapping_stat_id(selected_stats=selected_stats, gear_type='weapon')
+            counts[stat_id] = counts.get(stat_id, 0) + 1
+
+        self.assertEqual(set(counts.keys()), {'8', '9', '10'})
+        for stat_id, count in counts.items():
+            self.assertAlmostEqual(count / 30000, 1 / 3, delta=0.02)
+
+
+    def test_get_non_overlapping_stat_id_exhausted(self):
+        """
+        A pool without any stat left should raise ValueError instead of looping forever
+        """
+        with self.assertRaises(ValueError):
+            get_non_overlapping_stat_id([0, 1, 2, 3, 6, 7, 8, 9, 10], gear_type='weapon')
+
+
+    def test_get_available_stat_ids_pool_order(self):
+        """
+        Available stats should be returned in the order of the pool, even if the pool is not sorted
+        """
+        self.assertEqual(get_available_stat_ids(['2', '6'], 'weapon'), ['1', '3', '7', '8', '9', '10'])
+        with patch.dict(LOOKUPS['pools']['weapon'], {'substat': ['10', '9', '8', '7', '6', '3', '2', '1']}):
+            self.assertEqual(get_available_stat_ids(['2', '6'], 'weapon'), ['10', '9', '8', '7', '3', '1'])
         
         
 if __name__ == '__main__':
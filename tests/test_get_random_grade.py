@@ -68,5 +68,17 @@ class TestGetRandomGrade(unittest.TestCase):
         self.assertAlmostEqual(epic_rates, actual_epic_rates, delta=0.02, msg="Epic rate not within tolerance")
 
 
+    def test_get_random_grade_from_list(self):
+        """
+        Only the given grades should be picked, and grades without a rate cannot be picked
+        """
+        for i in range(100):
+            self.assertIn(get_random_grade(['heroic', 'epic']), ['heroic', 'epic'])
+        with self.assertRaises(ValueError):
+            get_random_grade(['normal', 'good'])
+        with self.assertRaises(ValueError):
+            get_random_grade([])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,164 @@
+from set_directory_function import set_directory
+set_directory()
+
+import unittest
+import random
+import numpy as np
+from src.registry import STATS
+from src.inventory import Inventory
+from src.stream import iter_gears
+
+
+def scan(gears, gear_set=None, gear_type=None, mainstat_id=None, substats=None, min_score=None,
+         max_score=None, min_reforged_score=None):
+    """Helper to filter the gears by looping over the Gear objects"""
+    result = []
+    for gear in gears:
+        score, reforged = gear.get_gear_score()
+        values = {s.stat_id: s.value for s in gear.substats}
+        if gear_set is not None and gear.gear_set != gear_set:
+            continue
+        if gear_type is not None and gear.gear_type != gear_type:
+            continue
+        if mainstat_id is not None and gear.mainstat_id != str(mainstat_id):
+            continue
+        if any(str(s) not in values or values[str(s)] < v for s, v in (substats or {}).items()):
+            continue
+        if min_score is not None and score < min_score:
+            continue
+        if max_score is not None and score > max_score:
+            continue
+        if min_reforged_score is not None and reforged < min_reforged_score:
+            continue
+        result.append(gear)
+    return result
+
+
+def weighted_score(gear, weights):
+    """Helper to add up the weighted substats of a gear, in the order of the weights"""
+    values = {int(s.stat_id): s.value for s in gear.substats}
+    score = 0.0
+    for stat_id, weight in weights.items():
+        score += weight * values.get(stat_id, 0)
+    return score
+
+
+class TestInventory(unittest.TestCase):
+    """
+    Test the Inventory class in src/inventory.py
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        rng = random.Random(1)
+        cls.gears = [g.enhance_gear_max(quiet=True, rng=rng) for g in iter_gears(seed=1, count=3000)]
+
+
+    def setUp(self):
+        self.inventory = Inventory(capacity=16)
+        self.ids = self.inventory.add_gears(self.gears)
+
+
+    def test_add_get(self):
+        """
+        Gears should be stored by id
+        """
+        self.assertEqual(len(self.inventory), 3000)
+        self.assertEqual(self.ids, list(range(3000)))
+        self.assertIs(self.inventory.get(5), self.gears[5])
+
+
+    def test_filter(self):
+        """
+        Queries should match filtering the Gear objects one by one
+        """
+        queries = [
+            {'gear_set': 'speed', 'gear_type': 'boots', 'substats': {6: 12}, 'min_score': 60},
+            {'gear_type': 'Ring', 'mainstat_id': 7},
+            {'substats': {10: 10, 7: 0}},
+            {'min_score': 55, 'max_score': 65},
+            {'gear_set': 'attack', 'min_reforged_score': 70},
+            {'max_score': 20},
+            {},
+        ]
+        for query in queries:
+            with self.subTest(query=query):
+                self.assertEqual(self.inventory.filter(**query), scan(self.gears, **query))
+
+
+    def test_remove_update(self):
+        """
+        Removed gears should not be found, and updated gears should be found with their new values
+        """
+        boots = self.inventory.filter_ids(gear_type='boots')
+        removed = self.inventory.remove(int(boots[0]))
+        self.assertEqual(len(self.inventory), 2999)
+        self.assertNotIn(removed, self.inventory.filter(gear_type='boots'))
+        self.assertNotIn(removed, self.inventory.filter(min_score=0))
+        with self.assertRaises(ValueError):
+            self.inventory.get(int(boots[0]))
+        with self.assertRaises(ValueError):
+            self.inventory.remove(int(boots[0]))
+
+        gear = self.inventory.get(int(boots[1]))
+        gear.reforge_gear(quiet=True)
+        self.inventory.update(int(boots[1]))
+        remaining = [g for g in self.gears if g is not removed]
+        query = {'gear_type': 'boots', 'min_score': 50}
+        self.assertEqual(self.inventory.filter(**query), scan(remaining, **query))
+        self.assertEqual(self.inventory.filter(min_score=50), scan(remaining, min_score=50))
+
+
+    def test_top_k(self):
+        """
+        Top k gears should match scoring and sorting every gear, with ties by increasing id
+        """
+        queries = [
+            ({10: 2, 6: 1, 7: 1}, 10, {}),
+            ({int(stat_id): STATS[stat_id]['gscore'] for stat_id in STATS}, 25, {}),
+            ({10: 1, 0: -0.5}, 5, {}),
+            ({6: 1, 7: 1}, 3, {'gear_type': 'boots', 'mainstat_id': 10}),
+            ({8: 1}, 2000, {}),
+        ]
+        for weights, k, conditions in queries:
+            with self.subTest(weights=weights, k=k, conditions=conditions):
+                gears = scan(self.gears, **conditions)
+                expected = sorted(((weighted_score(g, weights), -i)
+                                   for i, g in enumerate(self.gears) if any(g is x for x in gears)),
+                                  reverse=True)[:k]
+                ids, scores = self.inventory.top_k_ids(weights, k, **conditions)
+                self.assertEqual(ids.tolist(), [-i for _, i in expected])
+                self.assertEqual(scores.tolist(), [score for score, _ in expected])
+
+        result = self.inventory.top_k({10: 1}, 3)
+        self.assertEqual(len(result), 3)
+        self.assertIs(result[0][0], self.inventory.get(int(self.inventory.top_k_ids({10: 1}, 1)[0][0])))
+
+
+    def test_top_k_update(self):
+        """
+        Top k should not return removed gears
+        """
+        ids, _ = self.inventory.top_k_ids({10: 1}, 5)
+        self.inventory.remove(int(ids[0]))
+        new_ids, _ = self.inventory.top_k_ids({10: 1}, 5)
+        self.assertEqual(new_ids[:4].tolist(), ids[1:].tolist())
+        self.assertNotIn(ids[0], new_ids)
+
+
+    def test_invalid(self):
+        """
+        Invalid queries should raise errors
+        """
+        with self.assertRaises(ValueError):
+            self.inventory.filter(gear_type='shield')
+        with self.assertRaises(ValueError):
+            self.inventory.filter(substats={11: 5})
+        with self.assertRaises(ValueError):
+            self.inventory.top_k({10: 1}, 0)
+        with self.assertRaises(ValueError):
+            self.inventory.top_k({10: 'high'})
+
+
+if __name__ == '__main__':
+    unittest.main()
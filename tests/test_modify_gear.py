@@ -267,7 +267,6 @@ class TestModifyGear(unittest.TestCase):
 
                 # Set enhance_level to +15 so we may reforge
                 gear.enhance_level = 15
-                gear.is_refoged = True
 
                 # Enhance 5 substats, these should change their rolled value and reforge_increase value
                 gear.substats[0].enhance_stat()
@@ -346,7 +345,6 @@ class TestModifyGear(unittest.TestCase):
 
                 # Set enhance_level to +15 so we may reforge
                 gear.enhance_level = 15
-                gear.is_refoged = True
 
                 # Enhance 5 substats, these should change their rolled value and reforge_increase value
                 gear.substats[0].enhance_stat()
@@ -0,0 +1,86 @@
+from set_directory_function import set_directory
+set_directory()
+
+import unittest
+import random
+from src.montecarlo import simulate, run_trials, validate_steps, merge_results
+from src.distributions import get_gear_score_distribution
+
+
+class TestMonteCarlo(unittest.TestCase):
+    """
+    Test the Monte Carlo runner in src/montecarlo.py
+    """
+
+    def test_counts(self):
+        """
+        Counts should add up to the number of trials
+        """
+        result = simulate(500, {'gear_type': 'weapon', 'gear_grade': 'epic'}, ['enhance_gear_max'],
+                          seed=1, processes=1, shards=3)
+        self.assertEqual(result['trials'], 500)
+        self.assertEqual(sum(result['gear_score'].values()), 500)
+        self.assertEqual(sum(result['reforged_score'].values()), 500)
+        for stat_id, counts in result['substats'].items():
+            self.assertEqual(sum(counts.values()), 500)
+        # Weapons cannot have flat defense as a substat
+        self.assertEqual(result['substats']['4'], {0: 500})
+
+
+    def test_reproducible(self):
+        """
+        The same seed and shards should give the same results with any number of processes
+        """
+        args = (300, {'gear_grade': 'rare', 'gear_level': 85}, ['enhance_gear_max', 'reforge_gear'])
+        first = simulate(*args, seed=5, processes=1, shards=4)
+        second = simulate(*args, seed=5, processes=2, shards=4)
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, simulate(*args, seed=6, processes=1, shards=4))
+
+
+    def test_default_shards(self):
+        """
+        The default shards should not depend on the number of processes, and the global random state
+        should be left as it is
+        """
+        args = (200, {'gear_type': 'boots'}, ['enhance_gear_max'])
+        random.seed(7)
+        state = random.getstate()
+        first = simulate(*args, seed=2, processes=1)
+        self.assertEqual(random.getstate(), state)
+        self.assertEqual(first, simulate(*args, seed=2, processes=3))
+
+
+    def test_matches_distribution(self):
+        """
+        Simulated gear scores should follow the exact distribution
+        """
+        pmf, reforged_pmf = get_gear_score_distribution('ring', 'heroic')
+        result = simulate(20000, {'gear_type': 'ring', 'gear_grade': 'heroic'}, ['enhance_gear_max'],
+                          seed=3, processes=2)
+        for distribution, counts in [(pmf, result['gear_score']), (reforged_pmf, result['reforged_score'])]:
+            mean = sum(score * p for score, p in distribution.items())
+            simulated = sum(score * c for score, c in counts.items()) / result['trials']
+            self.assertAlmostEqual(simulated, mean, delta=0.3)
+
+
+    def test_steps(self):
+        """
+        Steps with arguments should be applied to every gear, and invalid steps should raise errors
+        """
+        steps = ['enhance_gear_max', ('modify_gear', {'stat_index': 1, 'mod_stat_id': 10})]
+        result = run_trials(50, {'gear_type': 'boots', 'mainstat_id': 1, 'substat_ids': [2, 6, 7, 8]}, steps, rng=1)
+        self.assertEqual(sum(result['substats']['10'].values()), 50)
+        self.assertNotIn(0, result['substats']['10'])
+        self.assertEqual(merge_results([result, result])['trials'], 100)
+
+        with self.assertRaises(ValueError):
+            validate_steps(['sell_gear'])
+        with self.assertRaises(ValueError):
+            validate_steps([('enhance_gear', {'rng': 1})])
+        with self.assertRaises(ValueError):
+            simulate(10, {'gear_type': 'shield'}, processes=1)
+
+
+if __name__ == '__main__':
+    unittest.main()
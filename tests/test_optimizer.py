@@ -0,0 +1,124 @@
+from set_directory_function import set_directory
+set_directory()
+
+import unittest
+import random
+import itertools
+import numpy as np
+from src.gear import Gear
+from src.inventory import Inventory
+from src.optimizer import optimize_build, validate_set_requirements, get_gear_stats
+from src.registry import TYPES
+
+
+class TestOptimizeBuild(unittest.TestCase):
+    """
+    Test the optimize_build() function in src/optimizer.py
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        rng = random.Random(3)
+        cls.inventory = Inventory()
+        for gear_type in TYPES.keys():
+            for _ in range(5):
+                gear = Gear().create_gear(gear_type=gear_type, gear_set=rng.choice(['speed', 'critical', 'attack']),
+                                          gear_grade='epic', rng=rng)
+                cls.inventory.add(gear.enhance_gear_max(quiet=True, rng=rng))
+
+
+    def brute_force(self, weights, sets=None, floors=None, mainstats=None):
+        """Helper to get the best score by trying every build"""
+        w = np.zeros(self.inventory.substat_values.shape[1])
+        for stat_id, weight in weights.items():
+            w[stat_id] = weight
+        ids = [self.inventory.filter_ids(gear_type=gear_type, mainstat_id=(mainstats or {}).get(gear_type))
+               for gear_type in TYPES.keys()]
+        stats = {i: get_gear_stats(self.inventory, np.array([i]))[0] for i in np.concatenate(ids).tolist()}
+
+        best = None
+        for build in itertools.product(*[i.tolist() for i in ids]):
+            totals = sum(stats[i] for i in build)
+            gear_sets = [self.inventory.get(i).gear_set for i in build]
+            if any(totals[stat_id] < minimum for stat_id, minimum in (floors or {}).items()):
+                continue
+            if any(gear_sets.count(gear_set) < pieces for gear_set, pieces in (sets or {}).items()):
+                continue
+            if best is None or totals @ w > best:
+                best = totals @ w
+        return best
+
+
+    def test_best_build(self):
+        """
+        The best build should have the same score as the best of all builds, and meet the constraints
+        """
+        queries = [
+            {'weights': {6: 1, 7: 1, 10: 2}, 'sets': {'speed': 4, 'critical': 2}},
+            {'weights': {6: 1, 7: 1, 10: 2, 0: -0.01}, 'sets': {'critical': 2}, 'floors': {10: 15, 6: 10}},
+            {'weights': {1: 1, 2: 0.1}},
+            {'weights': {6: 1}, 'sets': {'critical': 2}, 'mainstats': {'boots': 1, 'ring': 1}},
+        ]
+        for query in queries:
+            with self.subTest(query=query):
+                result = optimize_build(self.inventory, **query)
+                expected = self.brute_force(**query)
+                self.assertTrue(result['complete'])
+                if expected is None:
+                    self.assertIsNone(result['gear_ids'])
+                    continue
+                self.assertAlmostEqual(result['score'], expected)
+                self.assertEqual(list(result['gears']), list(TYPES.keys()))
+                for gear_type, gear in result['gears'].items():
+                    self.assertEqual(gear.gear_type, gear_type)
+                gear_sets = [gear.gear_set for gear in result['gears'].values()]
+                for gear_set, pieces in query.get('sets', {}).items():
+                    self.assertGreaterEqual(gear_sets.count(gear_set), pieces)
+                for stat_id, minimum in query.get('floors', {}).items():
+                    self.assertGreaterEqual(result['stats'][str(stat_id)], minimum)
+
+
+    def test_no_build(self):
+        """
+        No build should be returned when the constraints cannot be met
+        """
+        result = optimize_build(self.inventory, {6: 1}, floors={6: 1000})
+        self.assertIsNone(result['gear_ids'])
+        self.assertIsNone(result['score'])
+
+
+    def test_early_cutoff(self):
+        """
+        The search should stop after max_nodes, and gap should return a build close to the best one
+        """
+        result = optimize_build(self.inventory, {6: 1, 7: 1, 10: 2}, max_nodes=3)
+        self.assertFalse(result['complete'])
+        self.assertLessEqual(result['nodes'], 3)
+
+        best = optimize_build(self.inventory, {6: 1, 7: 1, 10: 2}, floors={10: 15})
+        close = optimize_build(self.inventory, {6: 1, 7: 1, 10: 2}, floors={10: 15}, gap=0.1)
+        self.assertGreaterEqual(close['score'], best['score'] / 1.1)
+        self.assertLessEqual(close['nodes'], best['nodes'])
+
+
+    def test_invalid(self):
+        """
+        Invalid arguments should raise errors
+        """
+        self.assertEqual(validate_set_requirements({'Speed': 4, 'critical': 2}), {'speed': 4, 'critical': 2})
+        with self.assertRaises(ValueError):
+            validate_set_requirements({'speed': 2})
+        with self.assertRaises(ValueError):
+            validate_set_requirements({'speed': 4, 'critical': 4})
+        with self.assertRaises(ValueError):
+            validate_set_requirements({'shield': 2})
+        with self.assertRaises(ValueError):
+            optimize_build(self.inventory, {6: 'high'})
+        with self.assertRaises(ValueError):
+            optimize_build(self.inventory, {6: 1}, max_nodes=0)
+        with self.assertRaises(ValueError):
+            optimize_build(self.inventory, {6: 1}, gap=-1)
+
+
+if __name__ == '__main__':
+    unittest.main()
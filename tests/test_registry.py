@@ -0,0 +1,281 @@
+from set_directory_function import set_directory
+set_directory()
+
+import unittest
+import json
+import os
+import pickle
+import shutil
+import subprocess
+import sys
+import tempfile
+import src.registry as registry
+from src.registry import DataTable, TYPES, SETS, TIERS, GRADES, STATS, LOOKUPS
+
+
+class TestRegistry(unittest.TestCase):
+    """
+    Test the shared, lazily loaded data tables in registry.py
+    """
+
+    def test_table_is_lazy(self):
+        """
+        A new table should not parse its file until it is accessed
+        """
+        table = DataTable('types')
+        self.assertIsNone(table._data)
+
+        table['weapon']
+        self.assertIsNotNone(table._data)
+
+
+    def test_table_loaded_once(self):
+        """
+        Repeated access should return the same parsed object
+        """
+        table = DataTable('stats')
+        self.assertIs(table.load(), table.load())
+
+
+    def test_tables_match_json(self):
+        """
+        Each shared table should hold the same contents as its json file
+        """
+        tables = {'types': TYPES, 'sets': SETS, 'tiers': TIERS, 'grades': GRADES, 'stats': STATS}
+
+        for name, table in tables.items():
+            with self.subTest(table=name):
+                expected = json.loads(open(f'data/{name}.json', 'r').read())
+                self.assertEqual(dict(table), expected)
+
+
+    def test_modules_share_tables(self):
+        """
+        Every module should read from the same table objects
+        """
+        import src.utilities
+        import src.validation_utils
+        import src.stats
+        import src.gear
+
+        for module in [src.utilities, src.validation_utils, src.stats, src.gear]:
+            with self.subTest(module=module.__name__):
+                self.assertIs(module.STATS, STATS)
+                self.assertIs(module.TYPES, TYPES)
+
+
+    def test_pool_masks(self):
+        """
+        Bitmasks of the pools should hold exactly the stats of each pool in types.json
+        """
+        for gear_type, type_data in TYPES.items():
+            for stat_type in ['mainstat', 'substat']:
+                with self.subTest(gear_type=gear_type, stat_type=stat_type):
+                    mask = LOOKUPS['masks'][gear_type][stat_type]
+                    expected = sum(1 << s for s in type_data[stat_type])
+                    self.assertEqual(mask, expected)
+
+
+    def test_allowed_substats(self):
+        """
+        Allowed substats should be the substat pool without the mainstat
+        """
+        from src.utilities import get_allowed_substat_ids
+
+        self.assertEqual(get_allowed_substat_ids('boots', '10'), [str(s) for s in range(10)])
+        self.assertEqual(get_allowed_substat_ids('weapon', '0'), ['1', '2', '3', '6', '7', '8', '9', '10'])
+        for gear_type, type_data in TYPES.items():
+            for mainstat_id in type_data['mainstat']:
+                with self.subTest(gear_type=gear_type, mainstat_id=mainstat_id):
+                    expected = [str(s) for s in type_data['substat'] if s != mainstat_id]
+                    self.assertEqual(get_allowed_substat_ids(gear_type, str(mainstat_id)), expected)
+
+
+class TestSnapshot(unittest.TestCase):
+    """
+    Test loading the tables from the compiled snapshot in registry.py
+    """
+
+    def setUp(self):
+        # Work on a copy of the json files so the real data folder is left untouched
+        self.data_dir = tempfile.mkdtemp()
+        for name in ['types', 'sets', 'tiers', 'grades', 'stats']:
+            shutil.copy(os.path.join('data', f'{name}.json'), self.data_dir)
+        registry.set_data_dir(self.data_dir)
+
+
+    def tearDown(self):
+        registry.set_data_dir()
+        shutil.rmtree(self.data_dir)
+
+
+    def test_snapshot_used(self):
+        """
+        A snapshot newer than the json files should fill every table at once
+        """
+        registry.write_snapshot()
+        registry.reset()
+
+        self.assertTrue(registry._load_snapshot())
+        for table in list(registry.TABLES.values()) + [LOOKUPS]:
+            with self.subTest(table=table.name):
+                self.assertIsNotNone(table._data)
+
+        expected = json.loads(open(os.path.join(self.data_dir, 'stats.json'), 'r').read())
+        self.assertEqual(dict(STATS), expected)
+
+
+    def test_snapshot_older_than_json(self):
+        """
+        A snapshot older than one of the json files should be ignored
+        """
+        snapshot_path = registry.write_snapshot()
+        snapshot_mtime = os.path.getmtime(snapshot_path)
+        os.utime(os.path.join(self.data_dir, 'types.json'), (snapshot_mtime + 10, snapshot_mtime + 10))
+        registry.reset()
+
+        self.assertFalse(registry._load_snapshot())
+        self.assertEqual(TYPES['weapon']['mainstat'], [0])
+
+
+    def test_damaged_snapshot(self):
+        """
+        A snapshot that cannot be read should be rebuilt from the json files and rewritten
+        """
+        snapshot_path = os.path.join(self.data_dir, registry.SNAPSHOT_FILE)
+        damaged = {
+            'missing class': b'\x80\x04c__main__\nMissingClass\n.',
+            'missing module': b'\x80\x04cno_such_module\nMissingClass\n.',
+            'truncated': b'\x80\x04',
+            'missing tables': pickle.dumps({'version': registry.SNAPSHOT_VERSION}),
+            'not a dict': pickle.dumps([1, 2]),
+            'old version': pickle.dumps({'version': registry.SNAPSHOT_VERSION - 1}),
+        }
+        for name, content in damaged.items():
+            with self.subTest(snapshot=name):
+                with open(snapshot_path, 'wb') as snapshot_file:
+                    snapshot_file.write(content)
+                registry.reset()
+
+                self.assertEqual(TYPES['weapon']['mainstat'], [0])
+                self.assertEqual(LOOKUPS['tier_by_level'][85], 6)
+                with open(snapshot_path, 'rb') as snapshot_file:
+                    self.assertEqual(pickle.load(snapshot_file)['tables']['TYPES'], dict(TYPES))
+
+
+    def test_no_snapshot(self):
+        """
+        Without a snapshot the tables and lookups should be built from the json files
+        """
+        self.assertFalse(registry._load_snapshot())
+        self.assertEqual(LOOKUPS['tier_by_level'][85], 6)
+        self.assertEqual(LOOKUPS['pools']['weapon']['mainstat'], ['0'])
+
+
+
+class TestDataDir(unittest.TestCase):
+    """
+    Test locating the data folder independently of the working directory
+    """
+
+    def tearDown(self):
+        registry.set_data_dir()
+
+
+    def test_package_data_dir(self):
+        """
+        By default the data folder next to /src should be used
+        """
+        expected = os.path.join(os.path.dirname(os.path.abspath(registry.__file__)), '..', 'data')
+        self.assertEqual(os.path.abspath(registry.PACKAGE_DATA_DIR), os.path.abspath(expected))
+
+
+    def test_any_working_directory(self):
+        """
+        The tables should load regardless of the current working directory
+        """
+        cwd = os.getcwd()
+        other_dir = tempfile.mkdtemp()
+        try:
+            os.chdir(other_dir)
+            registry.reset()
+            self.assertEqual(TYPES['weapon']['mainstat'], [0])
+        finally:
+            os.chdir(cwd)
+            shutil.rmtree(other_dir)
+
+
+    def test_set_data_dir(self):
+        """
+        set_data_dir() should point the tables at another folder and reload them
+        """
+        data_dir = tempfile.mkdtemp()
+        try:
+            for name in ['types', 'sets', 'tiers', 'grades', 'stats']:
+                shutil.copy(os.path.join(registry.PACKAGE_DATA_DIR, f'{name}.json'), data_dir)
+            # Alternate data with a single set
+            with open(os.path.join(data_dir, 'sets.json'), 'w') as sets_file:
+                json.dump({'speed': SETS['speed']}, sets_file)
+
+            registry.set_data_dir(data_dir)
+            self.assertEqual(list(SETS.keys()), ['speed'])
+
+            # Relative folders are resolved when they are set
+            cwd = os.getcwd()
+            try:
+                os.chdir(os.path.dirname(data_dir))
+                registry.set_data_dir(os.path.basename(data_dir))
+            finally:
+                os.chdir(cwd)
+            self.assertEqual(registry.DATA_DIR, data_dir)
+            self.assertEqual(list(SETS.keys()), ['speed'])
+
+            registry.set_data_dir()
+            self.assertIn('health', SETS)
+        finally:
+            shutil.rmtree(data_dir)
+
+
+    def test_set_data_dir_invalid(self):
+        """
+        A folder that does not exist should raise ValueError
+        """
+        with self.assertRaises(ValueError):
+            registry.set_data_dir('no/such/folder')
+
+
+    def test_environment_variable(self):
+        """
+        The E7_DATA_DIR environment variable should select the data folder at import time
+        """
+        root_dir = os.path.dirname(registry.PACKAGE_DATA_DIR)
+        other_dir = tempfile.mkdtemp()
+        try:
+            env = dict(os.environ, E7_DATA_DIR=other_dir, PYTHONPATH=root_dir)
+            code = 'import src.registry as r; print(r.DATA_DIR)'
+            output = subprocess.run([sys.executable, '-c', code], cwd=other_dir, env=env,
+                                    capture_output=True, text=True, check=True).stdout
+            self.assertEqual(output.strip(), other_dir)
+        finally:
+            shutil.rmtree(other_dir)
+
+
+    def test_relative_environment_variable(self):
+        """
+        A relative E7_DATA_DIR should be resolved once, against the working directory at import time
+        """
+        root_dir = os.path.dirname(registry.PACKAGE_DATA_DIR)
+        other_dir = tempfile.mkdtemp()
+        try:
+            env = dict(os.environ, E7_DATA_DIR='data', PYTHONPATH=root_dir)
+            code = ('import os; import src.registry as r; os.chdir(%r); '
+                    'print(r.DATA_DIR); print(len(r.TYPES))' % other_dir)
+            output = subprocess.run([sys.executable, '-c', code], cwd=root_dir, env=env,
+                                    capture_output=True, text=True, check=True).stdout
+            self.assertEqual(output.split(), [os.path.join(root_dir, 'data'), str(len(TYPES))])
+        finally:
+            shutil.rmtree(other_dir)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+from set_directory_function import set_directory
+set_directory()
+
+import unittest
+import random
+import numpy as np
+from src.rng import get_rng, get_np_rng, spawn_seeds, spawn_rngs
+from src.gear import Gear
+from src.batch import GearBatch
+from src.encoding import encode_gear, encode_batch
+
+
+def make_gear(rng):
+    """Creates a gear, enhances it to +15, then reforges and modifies it with the given rng"""
+    gear = Gear().create_gear(gear_level=85, rng=rng).enhance_gear_max(quiet=True, rng=rng)
+    gear.reforge_gear(quiet=True)
+    stat_id = [s for s in ['10', '6', '7', '8', '9', '1'] if s not in gear.substat_ids + [gear.mainstat_id]]
+    gear.modify_gear(stat_index=1, mod_stat_id=stat_id[0], quiet=True, rng=rng)
+    return gear
+
+
+class TestRng(unittest.TestCase):
+    """
+    Test the seeded random generators in src/rng.py and the rng arguments of the Gear() methods
+    """
+
+    def test_reproducible(self):
+        """
+        The same seed should create the same gears, without using the global random state
+        """
+        state = random.getstate()
+        first = [encode_gear(make_gear(get_rng(42))) for _ in range(20)]
+        second = [encode_gear(make_gear(get_rng(42))) for _ in range(20)]
+        self.assertEqual(random.getstate(), state)
+        self.assertEqual(first, second)
+        self.assertEqual(len(set(encode_gear(make_gear(get_rng(i))) for i in range(20))), 20)
+
+
+    def test_spawn(self):
+        """
+        Child streams should be reproducible and independent of each other
+        """
+        first = [rng.random() for rng in spawn_rngs(7, 4)]
+        second = [rng.random() for rng in spawn_rngs(7, 4)]
+        self.assertEqual(first, second)
+        self.assertEqual(len(set(first)), 4)
+
+        seeds = spawn_seeds(7, 4)
+        self.assertEqual([get_rng(s).random() for s in seeds], first)
+        # Children can be split again, e.g. one stream per gear within a worker
+        grandchildren = spawn_seeds(seeds[0], 3)
+        self.assertEqual(len(set(get_rng(s).random() for s in grandchildren)), 3)
+
+
+    def test_get_rng(self):
+        """
+        Generators and the random module should be returned as they are
+        """
+        rng = random.Random(1)
+        self.assertIs(get_rng(rng), rng)
+        self.assertIs(get_rng(random), random)
+        self.assertIsInstance(get_rng(), random.Random)
+
+
+    def test_batch(self):
+        """
+        Child seeds should also seed GearBatch
+        """
+        seeds = spawn_seeds(3, 2)
+        first = encode_batch(GearBatch.create(100, rng=get_np_rng(seeds[0])))
+        second = encode_batch(GearBatch.create(100, rng=seeds[0]))
+        other = encode_batch(GearBatch.create(100, rng=seeds[1]))
+        np.testing.assert_array_equal(first, second)
+        self.assertFalse(np.array_equal(first, other))
+
+
+if __name__ == '__main__':
+    unittest.main()
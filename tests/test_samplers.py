@@ -0,0 +1,135 @@
+from set_directory_function import set_directory
+set_directory()
+
+import unittest
+import json
+import random
+import numpy as np
+from src.samplers import AliasTable, get_alias_tables, get_alias_table
+from src.registry import reset
+
+STATS = json.loads(open('data/stats.json', 'r').read())
+
+
+def implied_rates(table):
+    """
+    Helper to get the chance of every value of an alias table
+    """
+    rates = list(table.prob)
+    for i, alias in enumerate(table.alias):
+        rates[alias] += 1 - table.prob[i]
+    return [rate / len(table) for rate in rates]
+
+
+class TestAliasTable(unittest.TestCase):
+    """
+    Test the AliasTable() class in samplers.py
+    """
+
+    def test_implied_rates(self):
+        """
+        The columns of the table should add up to the normalized rates
+        """
+        table = AliasTable(['a', 'b', 'c', 'd'], [0.1, 0.2, 0.3, 0.4])
+        for p, rate in zip(implied_rates(table), [0.1, 0.2, 0.3, 0.4]):
+            self.assertAlmostEqual(p, rate)
+
+        # Rates that do not add up to 1
+        table = AliasTable([1, 2, 3], [5, 0, 15])
+        for p, rate in zip(implied_rates(table), [0.25, 0, 0.75]):
+            self.assertAlmostEqual(p, rate)
+
+
+    def test_sample(self):
+        """
+        Scalar draws should follow the rates
+        """
+        table = AliasTable(['a', 'b', 'c'], [0.5, 0.3, 0.2])
+        rng = random.Random(1)
+        draws = [table.sample(rng) for _ in range(100000)]
+        for value, rate in zip(['a', 'b', 'c'], [0.5, 0.3, 0.2]):
+            self.assertAlmostEqual(draws.count(value) / len(draws), rate, delta=0.01)
+
+
+    def test_sample_array(self):
+        """
+        Vectorized draws should follow the rates and have the requested shape
+        """
+        table = AliasTable([4, 5, 6], [0.6, 0.1, 0.3])
+        draws = table.sample_array((1000, 100), rng=2)
+        self.assertEqual(draws.shape, (1000, 100))
+        for value, rate in zip([4, 5, 6], [0.6, 0.1, 0.3]):
+            self.assertAlmostEqual((draws == value).mean(), rate, delta=0.01)
+
+
+    def test_single_value(self):
+        """
+        A table with one value should always return it
+        """
+        table = AliasTable([7], [1])
+        self.assertEqual({table.sample() for _ in range(100)}, {7})
+
+
+    def test_invalid(self):
+        """
+        Empty, mismatched or negative rates should raise errors
+        """
+        with self.assertRaises(ValueError):
+            AliasTable([], [])
+        with self.assertRaises(ValueError):
+            AliasTable([1, 2], [1])
+        with self.assertRaises(ValueError):
+            AliasTable([1, 2], [1, -1])
+
+
+
+class TestStatAliasTables(unittest.TestCase):
+    """
+    Test the alias tables built from stats.json in samplers.py
+    """
+
+    def test_tables_match_rates(self):
+        """
+        Every substat roll should have a table following the rates of stats.json
+        """
+        tables = get_alias_tables()
+        for stat_id, stat in STATS.items():
+            var = stat['vars']['substat']
+            for gear_grade in ['rare', 'heroic', 'epic']:
+                for t, gear_tier in enumerate([5, 6, 7]):
+                    with self.subTest(stat_id=stat_id, gear_grade=gear_grade, gear_tier=gear_tier):
+                        table = tables[(stat_id, 'substat', gear_grade, gear_tier)]
+                        rates = np.array(var['rates'][gear_grade][t], dtype=float)
+                        self.assertEqual(table.values, var['values'][gear_grade][t])
+                        self.assertTrue(np.allclose(implied_rates(table), rates / rates.sum()))
+
+
+    def test_fixed_values_skipped(self):
+        """
+        Mainstats have fixed values and no tables
+        """
+        self.assertNotIn(('10', 'mainstat', 'epic', 6), get_alias_tables())
+
+
+    def test_tables_built_once(self):
+        """
+        Repeated access should return the same tables
+        """
+        self.assertIs(get_alias_tables(), get_alias_tables())
+        self.assertIs(get_alias_table('10', 'substat', 'epic', 6), get_alias_table('10', 'substat', 'epic', 6))
+
+
+    def test_tables_rebuilt_after_reset(self):
+        """
+        Tables should be rebuilt once the registry drops its data
+        """
+        table = get_alias_table('10', 'substat', 'epic', 6)
+        reset()
+        rebuilt = get_alias_table('10', 'substat', 'epic', 6)
+        self.assertIsNot(rebuilt, table)
+        self.assertEqual(rebuilt.values, table.values)
+        self.assertEqual(rebuilt.prob, table.prob)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+from set_directory_function import set_directory
+set_directory()
+
+import unittest
+from unittest.mock import patch
+import src.gear
+from src.gear import Gear, set_quiet
+
+
+class TestSetQuiet(unittest.TestCase):
+    """
+    Test the quiet mode of the Gear() methods in src/gear.py, set per call or with set_quiet()
+    """
+
+    def tearDown(self):
+        set_quiet(False)
+
+
+    @patch('builtins.print')
+    def test_default(self, mock_print):
+        """
+        Status messages should still be printed by default
+        """
+        gear = Gear().create_gear().enhance_gear_max()
+        mock_print.assert_called_with("Gear has been fully enhanced to +15!")
+
+
+    @patch('builtins.print')
+    def test_quiet_call(self, mock_print):
+        """
+        quiet=True should not print any status message
+        """
+        gear = Gear().create_gear(gear_level=85).enhance_gear_max(quiet=True)
+        gear.enhance_gear(quiet=True)
+        gear.reforge_gear(quiet=True)
+        gear.reforge_gear(quiet=True)
+        gear.modify_gear(stat_index=1, mod_stat_id=gear.substat_ids[1], quiet=True)
+        mock_print.assert_not_called()
+
+
+    @patch('builtins.print')
+    def test_set_quiet(self, mock_print):
+        """
+        set_quiet() should turn printing off for all calls, unless a call asks otherwise
+        """
+        set_quiet()
+        gear = Gear().create_gear().enhance_gear_max()
+        gear.enhance_gear()
+        mock_print.assert_not_called()
+
+        gear.enhance_gear(quiet=False)
+        mock_print.assert_called_once_with("Gear is already at maximum enhancement level!")
+
+        set_quiet(False)
+        self.assertFalse(src.gear._quiet)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+from set_directory_function import set_directory
+set_directory()
+
+import unittest
+import json
+from src.stats import Stat, StatInfo, get_stat_info
+from src.gear import Gear
+from src.registry import reset
+
+STATS = json.loads(open('data/stats.json', 'r').read())
+
+
+class TestStatInfo(unittest.TestCase):
+    """
+    Test the shared StatInfo objects and the slotted Stat and Gear classes
+    """
+
+    def test_stat_info(self):
+        """
+        StatInfo should hold the static data of the stat from stats.json
+        """
+        for stat_id, stat in STATS.items():
+            for stat_type in ['mainstat', 'substat']:
+                with self.subTest(stat_id=stat_id, stat_type=stat_type):
+                    info = get_stat_info(stat_id, stat_type)
+                    self.assertIsInstance(info, StatInfo)
+                    self.assertEqual(info.stat_key, stat['key_stat'])
+                    self.assertEqual(info.text, stat['text'])
+                    self.assertEqual(info.value_key, stat['vars'][stat_type]['key'])
+                    self.assertEqual(info.gscore, stat['gscore'])
+
+
+    def test_stat_info_shared(self):
+        """
+        Stats with the same id and type should share one StatInfo
+        """
+        gears = [Gear().create_gear(gear_type='boots', mainstat_id=10, substat_ids=[6]) for _ in range(10)]
+        infos = {id(g.substats[0].info) for g in gears}
+        self.assertEqual(len(infos), 1)
+        self.assertIs(gears[0].mainstat.info, get_stat_info('10', 'mainstat'))
+
+
+    def test_stat_info_rebuilt_after_reset(self):
+        """
+        StatInfo objects should be built again once the registry drops its data
+        """
+        info = get_stat_info('6', 'substat')
+        reset()
+        rebuilt = get_stat_info('6', 'substat')
+        self.assertIsNot(rebuilt, info)
+        self.assertEqual(rebuilt.text, info.text)
+
+
+    def test_stat_attributes(self):
+        """
+        Static attributes of a parsed stat should be read from its StatInfo
+        """
+        stat = Stat()
+        self.assertIsNone(stat.stat_key)
+        self.assertIsNone(stat.text)
+        self.assertIsNone(stat.value_key)
+
+        stat.get_stat_by_id(6, 'substat')
+        self.assertEqual(stat.stat_key, 'crit_rate')
+        stat.parse_stat('substat', 'boots', 'epic', 85)
+        self.assertEqual(stat.text, STATS['6']['text'])
+        self.assertEqual(stat.value_key, STATS['6']['vars']['substat']['key'])
+
+
+    def test_slots(self):
+        """
+        Stats and gears should not carry a per-instance dict
+        """
+        gear = Gear().create_gear()
+        self.assertFalse(hasattr(gear.mainstat, '__dict__'))
+        with self.assertRaises(AttributeError):
+            gear.mainstat.other = 1
+        self.assertFalse(hasattr(gear, '__dict__'))
+        with self.assertRaises(AttributeError):
+            gear.other = 1
+
+
+if __name__ == '__main__':
+    unittest.main()
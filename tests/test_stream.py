@@ -0,0 +1,57 @@
+from set_directory_function import set_directory
+set_directory()
+
+import unittest
+import itertools
+import numpy as np
+from src.stream import iter_gears, iter_batches
+from src.encoding import encode_gear, encode_batch
+
+
+class TestStream(unittest.TestCase):
+    """
+    Test the gear generators in src/stream.py
+    """
+
+    def test_iter_gears(self):
+        """
+        Gears should follow the specification, and the same seed should yield the same gears
+        """
+        gears = list(iter_gears({'gear_type': 'boots', 'gear_grade': 'epic'}, seed=1, count=20))
+        self.assertEqual(len(gears), 20)
+        self.assertTrue(all(g.gear_type == 'boots' and g.gear_grade == 'epic' for g in gears))
+
+        again = [encode_gear(g) for g in iter_gears({'gear_type': 'boots', 'gear_grade': 'epic'}, seed=1, count=20)]
+        self.assertEqual([encode_gear(g) for g in gears], again)
+
+
+    def test_unbounded(self):
+        """
+        Without a count, the stream should not end
+        """
+        stream = iter_gears(seed=2)
+        self.assertEqual(len(list(itertools.islice(stream, 100))), 100)
+        batches = iter_batches(10, seed=2)
+        self.assertEqual([len(b) for b in itertools.islice(batches, 5)], [10] * 5)
+
+
+    def test_iter_batches(self):
+        """
+        Chunks should have the chunk size, with the remainder last, and be reproducible
+        """
+        seed = np.random.SeedSequence(3)
+        chunks = list(iter_batches(40, {'gear_type': 'ring'}, seed=seed, count=100))
+        self.assertEqual([len(c) for c in chunks], [40, 40, 20])
+        self.assertTrue(all(t == 'ring' for c in chunks for t in c.get_gear_types()))
+
+        again = list(iter_batches(40, {'gear_type': 'ring'}, seed=seed, count=100))
+        for chunk, other in zip(chunks, again):
+            np.testing.assert_array_equal(encode_batch(chunk), encode_batch(other))
+        self.assertFalse(np.array_equal(encode_batch(chunks[0]), encode_batch(chunks[1])))
+
+        with self.assertRaises(ValueError):
+            next(iter_batches(0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -191,6 +191,16 @@ class TestValidateGearGrade(unittest.TestCase):
                 with self.subTest(substat_id = substat_id):
                     self.assertIn(validate_gear_grade(None, substat_ids = substat_id), expected_gear_grades[i])
 
+
+    def test_validate_gear_grade_feasible_rates(self):
+        """Grades that fit the substats should keep their relative rates"""
+        counts = {'heroic': 0, 'epic': 0}
+        for i in range(20000):
+            counts[validate_gear_grade(None, substat_ids=[0, 1, 2])] += 1
+
+        self.assertAlmostEqual(counts['heroic'] / 20000, 0.53 / 0.65, delta=0.02)
+        self.assertEqual(counts['epic'] + counts['heroic'], 20000)
+
                 
 if __name__ == '__main__':
     unittest.main()